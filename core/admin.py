@@ -1,5 +1,5 @@
 from django.contrib import admin
-from core.models import User, Task, TaskAssignment, Team, TeamRoles
+from core.models import User, Task, TaskAssignment, Team, TeamRoles, coalesce_status_updates
 
 class TaskAssignmentInline(admin.TabularInline):
     model = TaskAssignment
@@ -11,6 +11,17 @@ class TaskAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     inlines = [TaskAssignmentInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text search instead of ILIKE over `search_fields`
+        if not search_term.strip():
+            return queryset, False
+        return Task.search(queryset, search_term), False
+
+    def save_related(self, request, form, formsets, change):
+        # Recompute the task's status once for the whole inline formset
+        with coalesce_status_updates():
+            super().save_related(request, form, formsets, change)
+
 class UserTeamInline(admin.TabularInline):
     model = TeamRoles
     extra = 1
@@ -1,3 +1,4 @@
 from .task import *
 from .team import *
-from .user import *
\ No newline at end of file
+from .user import *
+from .metrics import metrics, SQLStatsView
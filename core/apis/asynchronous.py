@@ -0,0 +1,125 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from core.renderers import FastJSONRenderer
+
+
+async def authenticate(request, allow_query_token=False):
+    """
+    Returns the user of the JWT sent as `Authorization: Bearer ...` (or `?access_token=`
+    when `allow_query_token`), or None if missing or invalid.
+    """
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header:
+        raw_token = auth.get_raw_token(header)
+    else:
+        raw_token = request.GET.get('access_token', '').encode() if allow_query_token else None
+    if not raw_token:
+        return None
+    try:
+        return await sync_to_async(auth.get_user)(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def streaming_content(request, content, batch_size=500):
+    """
+    `content`, a sync iterator of strings, made fit for a `StreamingHttpResponse` to `request`.
+
+    Under ASGI, Django would read a sync iterator whole into a list before sending anything.
+    It is iterated instead by an async generator, `batch_size` strings per trip to the sync
+    thread, the one the view ran in, so it keeps using the same database connection and cursor.
+    """
+    if not isinstance(getattr(request, '_request', request), ASGIRequest):
+        return content
+    return iterate_in_thread(iter(content), batch_size)
+
+
+async def iterate_in_thread(iterator, batch_size):
+    next_batch = sync_to_async(lambda: ''.join(islice(iterator, batch_size)))
+    while batch := await next_batch():
+        yield batch
+
+
+class AsyncReadView(View):
+    """
+    Async list and retrieve for ASGI deployments, a DB call waits on the event loop
+    instead of holding a worker.
+
+    Mirrors `viewset_class`: same queryset, filters, permissions, pagination,
+    `?fields=`, conditional GET and output, rendered through its `fast_reader`.
+    Only the rows are read differently, through the async ORM.
+    """
+    viewset_class = None
+    renderer = FastJSONRenderer()
+
+    async def get(self, request, pk=None):
+        user = await authenticate(request)
+        drf_request = Request(request)
+        drf_request.user = user
+        drf_request.accepted_renderer, drf_request.accepted_media_type = self.renderer, self.renderer.media_type
+        viewset = self.viewset_class(
+            request=drf_request, args=(), kwargs={} if pk is None else {'pk': pk},
+            action='list' if pk is None else 'retrieve', format_kwarg=None, headers={},
+        )
+        try:
+            if user is None:
+                raise NotAuthenticated()
+            await sync_to_async(viewset.check_permissions)(drf_request)
+            if pk is None:
+                response = await self.list(viewset)
+            else:
+                response = await self.retrieve(viewset, pk)
+        except (APIException, Http404) as exc:
+            error = exception_handler(exc, {'view': viewset, 'request': drf_request})
+            return self.render(error.data, status=error.status_code)
+        return response
+
+    async def retrieve(self, viewset, pk):
+        queryset = viewset.get_queryset()
+        not_modified = await viewset.aconditional_response(queryset, pk=pk)
+        if not_modified is not None:
+            return viewset.apply_validators(not_modified)
+
+        reader = viewset.fast_reader
+        fields, required = viewset.fast_fields()
+        try:
+            row = await reader.values(queryset, fields, required).aget(pk=pk)
+        except ObjectDoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404  # As DRF's get_object_or_404 does for a malformed pk
+        await sync_to_async(viewset.check_object_permissions)(viewset.request, reader.stub(row))
+        data = (await reader.arepresent([row], fields))[0]
+        return viewset.apply_validators(self.render(data))
+
+    async def list(self, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        not_modified = await viewset.aconditional_response(queryset)
+        if not_modified is not None:
+            return viewset.apply_validators(not_modified)
+
+        reader = viewset.fast_reader
+        fields, required = viewset.fast_fields()
+        rows = reader.values(queryset, fields, required)
+        paginator = viewset.paginator
+        if paginator is None:
+            data = await reader.arepresent([row async for row in rows.aiterator()], fields)
+        else:
+            rows = await paginator.apaginate_queryset(rows, viewset.request, view=viewset)
+            data = paginator.get_paginated_response(await reader.arepresent(rows, fields)).data
+        return viewset.apply_validators(self.render(data))
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), content_type=self.renderer.media_type, status=status)
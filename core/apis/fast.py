@@ -0,0 +1,217 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from core.models import (
+    Task, TaskSerializer, TaskAssignment, TaskAssignmentSerializer,
+    Team, TeamSerializer, TeamRoles, TeamRolesSerializer, User, UserSerializer
+)
+from core.renderers import FastJSONRenderer
+
+# DRF's own datetime formatting (timezone conversion, `Z` suffix), minus the per-field dispatch
+_datetime = serializers.DateTimeField()
+
+
+def readable_fields(serializer_class, exclude=()):
+    """
+    The output fields of a ModelSerializer, in order, so the fast readers can't drift from it.
+    """
+    meta = serializer_class.Meta
+    write_only = {name for name, kwargs in getattr(meta, 'extra_kwargs', {}).items() if kwargs.get('write_only')}
+    return [name for name in meta.fields if name not in write_only and name not in exclude]
+
+
+class FastReader:
+    """
+    Renders the same shape as a ModelSerializer straight from `.values()` rows.
+
+    Subclasses list the plain model fields to read in `fields` and attach
+    nested lists in `attach`, with one query per relation for the whole page.
+    """
+    model = None
+    fields = ()
+    nested = ()
+
+    def __init__(self):
+        self.columns = list(self.fields) if 'id' in self.fields else ['id', *self.fields]
+        self.datetime_fields = [
+            name for name in self.fields
+            if isinstance(self.model._meta.get_field(name), models.DateTimeField)
+        ]
+        self.foreign_keys = [
+            name for name in self.fields
+            if isinstance(self.model._meta.get_field(name), models.ForeignKey)
+        ]
+
+    def values(self, queryset, fields=None, required=()):
+        """
+        The `.values()` queryset for `fields` (None for all). Foreign keys and
+        `required` columns (which may be annotations) are always read, `represent`
+        drops them if unwanted.
+        """
+        annotations = [name for name in required if name in queryset.query.annotations]
+        if fields is None:
+            return queryset.values(*self.columns, *annotations)
+        return queryset.values('id', *annotations, *(
+            name for name in self.fields
+            if name != 'id' and (name in fields or name in required or name in self.foreign_keys)
+        ))
+
+    def represent(self, rows, fields=None):
+        """
+        Converts `.values()` rows to their serialized form, in place.
+        """
+        output = self.output(fields)
+        self.format(rows)
+        self.attach(rows, output)
+        return self.trim(rows, output)
+
+    async def arepresent(self, rows, fields=None):
+        """
+        `represent` reading the nested lists through the async ORM.
+        """
+        output = self.output(fields)
+        self.format(rows)
+        await self.aattach(rows, output)
+        return self.trim(rows, output)
+
+    def output(self, fields):
+        return set(self.fields) | set(self.nested) if fields is None else set(fields)
+
+    def format(self, rows):
+        to_representation = _datetime.to_representation
+        for row in rows:
+            for name in self.datetime_fields:
+                value = row.get(name)
+                if value is not None:
+                    row[name] = to_representation(value)
+
+    @staticmethod
+    def trim(rows, output):
+        if rows:
+            extra = [name for name in rows[0] if name not in output]
+            for row in rows:
+                for name in extra:
+                    del row[name]
+        return rows
+
+    def attach(self, rows, output):
+        """
+        Adds the nested lists named in `output` to `rows`.
+        """
+        for name in self.nested:
+            if name in output:
+                self.nest(name, rows, list(self.nested_query(name, rows)))
+
+    async def aattach(self, rows, output):
+        for name in self.nested:
+            if name in output:
+                self.nest(name, rows, [values async for values in self.nested_query(name, rows)])
+
+    def nested_query(self, name, rows):
+        """
+        The `.values_list()` queryset reading the nested list `name` for the whole page.
+        """
+        raise NotImplementedError
+
+    def nest(self, name, rows, results):
+        """
+        Distributes the results of `nested_query` to `rows`.
+        """
+        raise NotImplementedError
+
+    def stub(self, row):
+        """
+        An unsaved instance carrying the row's keys, enough for object permission checks.
+        """
+        return self.model(id=row['id'], **{f'{name}_id': row[name] for name in self.foreign_keys})
+
+
+class UserReader(FastReader):
+    model = User
+    fields = readable_fields(UserSerializer)
+
+
+class TaskReader(FastReader):
+    model = Task
+    fields = readable_fields(TaskSerializer, exclude=('assigned_users',))
+    nested = ('assigned_users',)
+    user_fields = UserReader.fields
+
+    def nested_query(self, name, rows):
+        lookups = [f'user__{name}' for name in self.user_fields]
+        return (TaskAssignment.objects.filter(task_id__in=[row['id'] for row in rows])
+                .order_by('user_id').values_list('task_id', *lookups))
+
+    def nest(self, name, rows, results):
+        assigned_users = defaultdict(list)
+        for task_id, *values in results:
+            assigned_users[task_id].append(dict(zip(self.user_fields, values)))
+        for row in rows:
+            row['assigned_users'] = assigned_users[row['id']]
+
+
+class TaskAssignmentReader(FastReader):
+    model = TaskAssignment
+    fields = readable_fields(TaskAssignmentSerializer)
+
+
+class TeamReader(FastReader):
+    model = Team
+    fields = readable_fields(TeamSerializer, exclude=('members',))
+    nested = ('members',)
+    member_fields = readable_fields(TeamRolesSerializer)
+
+    def nested_query(self, name, rows):
+        return (TeamRoles.objects.filter(team_id__in=[row['id'] for row in rows])
+                .order_by('id').values_list(*self.member_fields))
+
+    def nest(self, name, rows, results):
+        members = defaultdict(list)
+        team_index = self.member_fields.index('team')
+        for values in results:
+            members[values[team_index]].append(dict(zip(self.member_fields, values)))
+        for row in rows:
+            row['members'] = members[row['id']]
+
+
+class FastReadMixin:
+    """
+    Opt-in read path: when `API_FAST_READS` is on, list and retrieve render
+    through `fast_reader` instead of the DRF serializer, and JSON through
+    `FastJSONRenderer`. The output is the same.
+    """
+    fast_reader = None
+
+    def use_fast_reads(self):
+        return self.fast_reader is not None and getattr(settings, 'API_FAST_READS', False)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if not self.use_fast_reads():
+            return renderers
+        return [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
+
+    def fast_fields(self):
+        fields = self.sparse_fields() if hasattr(self, 'sparse_fields') else None
+        required = self.required_columns() if hasattr(self, 'required_columns') else ()
+        return fields, required
+
+    def fast_retrieve(self, queryset):
+        fields, required = self.fast_fields()
+        row = get_object_or_404(self.fast_reader.values(queryset, fields, required), pk=self.kwargs.get('pk'))
+        self.check_object_permissions(self.request, self.fast_reader.stub(row))
+        return Response(self.fast_reader.represent([row], fields)[0])
+
+    def fast_list(self, queryset):
+        fields, required = self.fast_fields()
+        rows = self.fast_reader.values(queryset, fields, required)
+        if self.paginator is None:
+            return Response(self.fast_reader.represent(list(rows), fields))
+        rows = self.paginate_queryset(rows)
+        return self.get_paginated_response(self.fast_reader.represent(rows, fields))
@@ -0,0 +1,129 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from core.models import Task, TaskAssignment
+from core.models.sparse import split_param
+from core.models.task.model import TaskStatus
+
+
+class TaskFilter(BaseFilterBackend):
+    """
+    Narrows task lists with query parameters, comma separated values match any of them:
+    - `status`, `task_type`: choice values
+    - `created_by`, `assignee`: user ids, `assignment_status` narrows `assignee` to
+      assignments in the given statuses
+    - `team`: team ids, matches tasks assigned to a member of the team
+    - `created_after`, `created_before`, `completed_after`, `completed_before`:
+      ISO 8601 dates or datetimes, `after` is inclusive and `before` exclusive
+    """
+    choice_params = {
+        'status': TaskStatus.values,
+        'task_type': Task.TaskTypes.values,
+    }
+    range_params = {
+        'created_after': 'created_at__gte',
+        'created_before': 'created_at__lt',
+        'completed_after': 'completed_at__gte',
+        'completed_before': 'completed_at__lt',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        errors = {}
+
+        for param, choices in self.choice_params.items():
+            values = split_param(params.get(param))
+            if not values:
+                continue
+            invalid = sorted(set(values) - set(choices))
+            if invalid:
+                errors[param] = [f'Invalid choice: {", ".join(invalid)}.']
+            else:
+                queryset = queryset.filter(**{f'{param}__in': values})
+
+        for param, lookup in self.range_params.items():
+            if param not in params:
+                continue
+            value = self.parse_moment(params[param])
+            if value is None:
+                errors[param] = ['Expected an ISO 8601 date or datetime.']
+            else:
+                queryset = queryset.filter(**{lookup: value})
+
+        created_by = self.parse_ids(params, 'created_by', errors)
+        if created_by:
+            queryset = queryset.filter(created_by__in=created_by)
+
+        assignee = self.parse_ids(params, 'assignee', errors)
+        assignment_status = split_param(params.get('assignment_status'))
+        if assignment_status and not assignee:
+            errors['assignment_status'] = ['Only valid together with assignee.']
+        elif set(assignment_status) - set(TaskStatus.values):
+            invalid = sorted(set(assignment_status) - set(TaskStatus.values))
+            errors['assignment_status'] = [f'Invalid choice: {", ".join(invalid)}.']
+        elif assignee:
+            assignments = TaskAssignment.objects.filter(user__in=assignee)
+            if assignment_status:
+                assignments = assignments.filter(status__in=assignment_status)
+            queryset = queryset.filter(id__in=assignments.values('task_id'))
+
+        team = self.parse_ids(params, 'team', errors)
+        if team:
+            assignments = TaskAssignment.objects.filter(user__teamroles__team__in=team)
+            queryset = queryset.filter(id__in=assignments.values('task_id'))
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset
+
+    @staticmethod
+    def parse_ids(params, param, errors):
+        try:
+            return [int(value) for value in split_param(params.get(param))]
+        except ValueError:
+            errors[param] = ['Expected a comma separated list of ids.']
+            return []
+
+    @staticmethod
+    def parse_moment(value):
+        """
+        Parses an ISO 8601 datetime, or a date meaning its midnight, in the current time zone when naive.
+        """
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                date = parse_date(value)
+                moment = date and datetime.combine(date, time.min)
+        except ValueError:
+            return None
+        if moment is not None and timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def get_schema_operation_parameters(self, view):
+        params = [*self.choice_params, 'created_by', 'assignee', 'assignment_status', 'team', *self.range_params]
+        return [
+            {'name': name, 'required': False, 'in': 'query', 'schema': {'type': 'string'}}
+            for name in params
+        ]
+
+
+class TaskSearchFilter(BaseFilterBackend):
+    """
+    `?search=` full-text search over task names and descriptions, see `Task.search`.
+    Results are annotated with `search_rank`, which `TaskPagination` orders by.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return Task.search(queryset, text)
+
+    def get_schema_operation_parameters(self, view):
+        return [{'name': self.search_param, 'required': False, 'in': 'query', 'schema': {'type': 'string'}}]
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.metrics import registry
+from core.profiling import is_staff, jwt_user
+
+SQL_STATS_ORDERINGS = ('total', 'count', 'max', 'n_plus_one')
+
+
+@require_GET
+def metrics(request):
+    """
+    Request metrics of this process in the Prometheus text format, for scrapers sending `METRICS_TOKEN`
+    as `Authorization: Bearer <token>` and for staff users. Nobody else, even when no token is set.
+    """
+    if not (has_metrics_token(request) or is_staff(request.user)):
+        user = jwt_user(request)
+        if not is_staff(user):
+            return HttpResponse(status=403 if user is not None or request.user.is_authenticated else 401)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    return bool(token) and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+class SQLStatsView(APIView):
+    """
+    The SQL fingerprints this process has run, aggregated by view, for staff users.
+    Filter with `?view=<view name>`, order with `?ordering=total|count|max|n_plus_one`, cut with `?limit=`.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        ordering = request.query_params.get('ordering', 'total')
+        if ordering not in SQL_STATS_ORDERINGS:
+            raise ValidationError({'ordering': f"Must be one of {', '.join(SQL_STATS_ORDERINGS)}."})
+        try:
+            limit = max(int(request.query_params.get('limit', 50)), 0)
+        except ValueError:
+            raise ValidationError({'limit': "Must be an integer."})
+        rows = registry.sql_summary(request.query_params.get('view'), ordering)
+        return Response({
+            'n_plus_one_threshold': settings.SQL_N_PLUS_ONE_THRESHOLD,
+            'count': len(rows),
+            'results': rows[:limit],
+        })
@@ -0,0 +1,206 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db import models
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination over `(keyset_field, id)`, newest first.
+
+    Every page is a range scan starting right after the last row of the
+    previous page, so fetching page 1000 costs the same as fetching page 1.
+
+    `?ordering=` picks another keyset among `ordering_fields` (`-` for descending).
+    Only non-nullable fields can be listed there, NULLs have no place in a keyset.
+    """
+    keyset_field = 'created_at'
+    ordering_fields = ()
+    ordering_query_param = 'ordering'
+    cursor_query_param = 'cursor'
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        `paginate_queryset` reading the page through the async ORM.
+        """
+        return self.finish_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """
+        The slice of `queryset` holding the requested page, plus one row to learn whether there is another.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field, descending = self.get_ordering(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        self.has_cursor = cursor is not None
+        self.reverse = cursor is not None and cursor[2]
+
+        if cursor is not None:
+            value, pk, reverse = cursor
+            op = 'lt' if descending != reverse else 'gt'
+            queryset = queryset.filter(
+                models.Q(**{f'{field}__{op}': value}) |
+                models.Q(**{field: value, f'id__{op}': pk})
+            )
+        if descending != self.reverse:
+            ordering = (f'-{field}', '-id')
+        else:
+            ordering = (field, 'id')
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def finish_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        # Capture the cursor positions now, callers may render the rows in place
+        self.page = results
+        self.first_position = self.position(results[0]) if results else None
+        self.last_position = self.position(results[-1]) if results else None
+        if self.reverse:
+            self.has_next = self.has_cursor
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.has_cursor
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request):
+        """
+        Returns the `(field, descending)` keyset requested with `?ordering=`.
+        """
+        ordering = request.query_params.get(self.ordering_query_param)
+        if not ordering:
+            return self.get_default_ordering(request)
+        field = ordering.removeprefix('-')
+        if field != self.keyset_field and field not in self.ordering_fields:
+            allowed = ', '.join([self.keyset_field, *self.ordering_fields])
+            raise ValidationError({self.ordering_query_param: [f'Cannot order by "{field}", choose one of: {allowed}.']})
+        return field, ordering.startswith('-')
+
+    def get_default_ordering(self, request):
+        return self.keyset_field, True
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def position(self, obj):
+        """
+        Returns the `(keyset value, id)` of a row, either a model instance or a `.values()` dict.
+        """
+        field = self.get_ordering(self.request)[0]
+        if isinstance(obj, dict):
+            return obj[field], obj['id']
+        return getattr(obj, field), obj.pk
+
+    def encode_cursor(self, position, reverse):
+        value, pk = position
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        # The cursor records its keyset, so it cannot be replayed under another `?ordering=`.
+        token = json.dumps([int(reverse), self.get_ordering(self.request)[0], value, pk])
+        encoded = base64.urlsafe_b64encode(token.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            token = base64.urlsafe_b64decode(encoded.encode()).decode()
+            reverse, field, value, pk = json.loads(token)
+            if field != self.get_ordering(request)[0]:
+                raise ValueError(field)
+            # The keyset may also be an annotation, which is never a datetime here.
+            model_field = next((f for f in model._meta.concrete_fields if f.name == field), None)
+            if isinstance(model_field, models.DateTimeField):
+                value = datetime.fromisoformat(value)
+            return value, int(pk), bool(int(reverse))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.ordering_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string'},
+            },
+        ]
+
+
+class TaskPagination(KeysetPagination):
+    keyset_field = 'created_at'
+    ordering_fields = ('name', 'status', 'task_type')
+    search_query_param = 'search'
+
+    def get_default_ordering(self, request):
+        # Search results come best match first, `TaskSearchFilter` annotates the rank.
+        if request.query_params.get(self.search_query_param, '').strip():
+            return 'search_rank', True
+        return super().get_default_ordering(request)
+
+
+class TaskAssignmentPagination(KeysetPagination):
+    keyset_field = 'assigned_at'
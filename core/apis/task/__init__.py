@@ -1 +1,2 @@
-from .view import TaskViewSet, TaskAssignmentViewSet
\ No newline at end of file
+from .events import task_events
+from .view import TaskViewSet, TaskAssignmentViewSet, TaskReadView, TaskAssignmentReadView
\ No newline at end of file
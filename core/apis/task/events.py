@@ -0,0 +1,81 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from core.events import build_events, get_broker
+from core.models import Change
+from ..asynchronous import authenticate
+
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+REPLAY_LIMIT = 1000
+
+
+def format_event(name, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {name}', f'data: {json.dumps(data)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+@require_GET
+async def task_events(request):
+    """
+    Server-Sent Events stream of the task, assignment and team role changes of the user,
+    with the current status of tasks and assignments. Must be served under ASGI.
+
+    Event ids are delta sync tokens: on reconnect the changes after `Last-Event-ID` are
+    replayed first. Like `next` on `/api/tasks/changes/`, they never pass `Change.horizon()`,
+    so changes committing late still come after a reconnect (possibly again). When that is
+    too far behind, or the client reads too slowly, a `resync` event asks it to catch up
+    through `/api/tasks/changes/` instead.
+    """
+    # Browsers' `EventSource` cannot set headers, the token may come as `?access_token=`
+    user = await authenticate(request, allow_query_token=True)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    try:
+        last_seq = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_seq = None
+
+    response = StreamingHttpResponse(stream(user.id, last_seq), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Keep proxies from buffering the stream
+    return response
+
+
+async def stream(user_id, last_seq):
+    yield f'retry: {RETRY_MILLISECONDS}\n\n'
+    replayed = set()
+    # Subscribe before replaying, so nothing committed in between is missed
+    async with get_broker().subscribe(user_id) as subscription:
+        if last_seq is not None:
+            horizon = await sync_to_async(Change.horizon)()
+            changes = [
+                (seq, user_id, kind, object_id) async for seq, kind, object_id in
+                Change.objects.filter(user=user_id, id__gt=last_seq).order_by('id')
+                .values_list('id', 'kind', 'object_id')[:REPLAY_LIMIT + 1]
+            ]
+            if len(changes) > REPLAY_LIMIT:
+                yield format_event('resync', {})
+            else:
+                for _, token, event in await sync_to_async(build_events)(changes, horizon):
+                    yield format_event(event['kind'], event, token)
+                    replayed.add(event['seq'])
+
+        while True:
+            event = await subscription.get(KEEPALIVE_SECONDS)
+            if subscription.overflowed:
+                subscription.overflowed = False
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                yield format_event('resync', {})
+            elif event is None:
+                yield ': keepalive\n\n'
+            else:
+                token, event = event
+                # Changes committed between subscribing and replaying come both ways
+                if event['seq'] not in replayed:
+                    yield format_event(event['kind'], event, token)
@@ -1,30 +1,59 @@
-from django.db import models
+import csv
+import json
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework import status
 
 from core.models import (
-    Task, TaskSerializer,
-    TaskAssignment, TaskAssignmentSerializer,
-    IsManagerOrOwnerOrSelf
+    Change, Task, TaskSerializer, TaskVisibility,
+    TaskAssignment, TaskAssignmentSerializer, TaskAssignmentBulkSerializer,
+    TaskAssignmentStatusSerializer, TeamRoles, TeamRolesSyncSerializer, TeamTaskStats, User,
+    IsManagerOrOwnerOrSelf, TaskImporter, defer_status_update
 )
+from core.models.task.model import TaskStatus
+from ..asynchronous import AsyncReadView, streaming_content
+from ..filters import TaskFilter, TaskSearchFilter
+from ..fast import FastReadMixin, TaskReader, TaskAssignmentReader
+from ..mixins import ConditionalGetMixin, QueryPlanMixin
+from ..pagination import TaskPagination, TaskAssignmentPagination
+from core.renderers import CSVRenderer, NDJSONRenderer
+
+
+class Echo:
+    """
+    File-like object whose `write` returns the value, so `csv.writer` can feed a generator.
+    """
+
+    def write(self, value):
+        return value
 
 
-class TaskViewSet(ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, FastReadMixin, QueryPlanMixin, ModelViewSet):
     """
     ViewSet to manage tasks
     """
     serializer_class = TaskSerializer
     permission_classes = [IsManagerOrOwnerOrSelf]
+    pagination_class = TaskPagination
+    filter_backends = [TaskFilter, TaskSearchFilter]
+    prefetch_related = (Prefetch('assigned_users', queryset=User.objects.order_by('id')),)
+    fast_reader = TaskReader()
 
     def get_queryset(self):
         user_id = self.request.user.id
-        return (Task.objects.filter(models.Q(created_by=user_id) | models.Q(assignments__user=user_id))
-                .distinct())
+        visible_task_ids = TaskVisibility.objects.filter(user=user_id).values('task_id')
+        # `search_vector` is only ever read by the database
+        return Task.objects.filter(id__in=visible_task_ids).defer('search_vector')
 
     def get_object(self):
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         obj = get_object_or_404(queryset, pk=self.kwargs.get('pk'))
         self.check_object_permissions(self.request, obj)
         return obj
@@ -33,20 +62,23 @@ class TaskViewSet(ModelViewSet):
         """
         Returns the details of a task.
         """
+        not_modified = self.conditional_response(self.get_queryset(), pk=self.kwargs.get('pk'))
+        if not_modified is not None:
+            return not_modified
+        if self.use_fast_reads():
+            return self.fast_retrieve(self.get_queryset())
         task = self.get_object()  # No need to pass `pk`
-        serializer = self.serializer_class(task)
+        serializer = self.serializer_class(task, fields=self.sparse_fields())
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         """
         Creates a new task.
         """
-        # add created_by automatically
-        data = request.data.copy()
-        data['created_by'] = request.user
-        serializer = self.serializer_class(data=data)
+        serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            # created_by is not a serializer field, it is always the caller
+            serializer.save(created_by=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -67,29 +99,167 @@ class TaskViewSet(ModelViewSet):
         """
         task = self.get_object()
         task.delete()
-        return Response({"message": "Task deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     def list(self, request, *args, **kwargs):
         """
-        Returns a list of all tasks.
+        Returns a page of tasks, newest first (best match first with `?search=`)
+        unless `?ordering=` says otherwise. See `TaskFilter` for the supported filters.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        not_modified = self.conditional_response(queryset)
+        if not_modified is not None:
+            return not_modified
+        if self.use_fast_reads():
+            return self.fast_list(queryset)
+        tasks = self.paginate_queryset(self.plan_queryset(queryset))
+        serializer = self.serializer_class(tasks, many=True, fields=self.sparse_fields())
+        return self.get_paginated_response(serializer.data)
+
+    sync_page_size = 1000
+
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request, *args, **kwargs):
+        """
+        Delta sync: the tasks, assignments and team roles of the user that changed since `?since=<token>`.
+
+        Without `since`, only returns the current token: take it before a full fetch, then sync from it.
+        Each call reads at most `sync_page_size` changes, call again with `next` while `has_more`.
+        Changes past `Change.horizon()` are left for a later call, so none committing late is skipped.
+        Objects are returned once in their current state, the ids of those deleted or no longer
+        visible are listed under `deleted`.
+        """
+        since = request.query_params.get('since')
+        if since is None:
+            return Response({'next': str(Change.horizon()), 'has_more': False})
+        try:
+            since = int(since)
+        except ValueError:
+            return Response({'since': ['Expected a token returned by this endpoint.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        changes = list(
+            Change.committed().filter(user=request.user.id, id__gt=since).order_by('id')
+            .values_list('id', 'kind', 'object_id')[:self.sync_page_size + 1]
+        )
+        has_more = len(changes) > self.sync_page_size
+        changes = changes[:self.sync_page_size]
+        changed = {kind: set() for kind in Change.Kinds.values}
+        for _, kind, object_id in changes:
+            changed[kind].add(object_id)
+
+        tasks = self.changed_objects(self.plan_queryset(self.get_queryset()), changed[Change.Kinds.TASK])
+        assignments = self.changed_objects(TaskAssignment.objects.filter(user=request.user.id),
+                                           changed[Change.Kinds.ASSIGNMENT])
+        team_roles = self.changed_objects(TeamRoles.objects.filter(user=request.user.id),
+                                          changed[Change.Kinds.TEAM_ROLE])
+        data = {
+            'next': str(changes[-1][0] if changes else since),
+            'has_more': has_more,
+            'tasks': TaskSerializer(tasks, many=True, fields=self.sparse_fields()).data,
+            'assignments': TaskAssignmentSerializer(assignments, many=True).data,
+            'team_roles': TeamRolesSyncSerializer(team_roles, many=True).data,
+            'deleted': {
+                'tasks': sorted(changed[Change.Kinds.TASK] - {obj.id for obj in tasks}),
+                'assignments': sorted(changed[Change.Kinds.ASSIGNMENT] - {obj.id for obj in assignments}),
+                'team_roles': sorted(changed[Change.Kinds.TEAM_ROLE] - {obj.id for obj in team_roles}),
+            },
+        }
+        return Response(data)
+
+    @staticmethod
+    def changed_objects(queryset, ids):
+        return list(queryset.filter(id__in=ids).order_by('id')) if ids else []
+
+    export_chunk_size = 2000
+    export_columns = [
+        'id', 'name', 'description', 'created_at', 'task_type', 'task_type_other',
+        'completed_at', 'status', 'assignees', 'assignment_statuses'
+    ]
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request, *args, **kwargs):
+        """
+        Streams every task visible to the user, narrowed by the list filters, as CSV (default) or NDJSON (`?format=ndjson`),
+        with assignee usernames and assignment statuses.
+        Rows are read through a server-side cursor, so memory use is independent of the number of tasks,
+        under WSGI and ASGI alike.
+        """
+        tasks = (
+            self.filter_queryset(self.get_queryset())
+            .order_by('id')
+            .prefetch_related(Prefetch(
+                'assignments',
+                queryset=TaskAssignment.objects.select_related('user').only('task_id', 'status', 'user__username')
+            ))
+            .iterator(chunk_size=self.export_chunk_size)
+        )
+        rows = (self.export_row(task) for task in tasks)
+
+        if request.accepted_renderer.format == 'ndjson':
+            content = (json.dumps(row) + '\n' for row in rows)
+            content_type, extension = NDJSONRenderer.media_type, 'ndjson'
+        else:
+            content = self.export_csv(rows)
+            content_type, extension = CSVRenderer.media_type, 'csv'
+
+        response = StreamingHttpResponse(streaming_content(request, content), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tasks.{extension}"'
+        return response
+
+    @staticmethod
+    def export_row(task):
+        assignments = task.assignments.all()
+        return {
+            'id': task.id,
+            'name': task.name,
+            'description': task.description,
+            'created_at': task.created_at.isoformat(),
+            'task_type': task.task_type,
+            'task_type_other': task.task_type_other,
+            'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+            'status': task.status,
+            'assignees': [assignment.user.username for assignment in assignments],
+            'assignment_statuses': [assignment.status for assignment in assignments],
+        }
+
+    def export_csv(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.export_columns)
+        for row in rows:
+            row['assignees'] = ';'.join(row['assignees'])
+            row['assignment_statuses'] = ';'.join(row['assignment_statuses'])
+            yield writer.writerow([row[column] for column in self.export_columns])
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_tasks(self, request, *args, **kwargs):
+        """
+        Imports tasks from an NDJSON request body, one task per line.
+        Each line may list `assignees` by username. Returns the number of
+        created tasks and the errors of every rejected line.
         """
-        tasks = self.get_queryset()
-        serializer = self.serializer_class(tasks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        stream = request.stream
+        if stream is None:
+            return Response({"detail": "Expected an NDJSON request body."}, status=status.HTTP_400_BAD_REQUEST)
+        report = TaskImporter(created_by=request.user).run(stream)
+        return Response(report, status=status.HTTP_200_OK)
 
-class TaskAssignmentViewSet(ModelViewSet):
+class TaskAssignmentViewSet(ConditionalGetMixin, FastReadMixin, QueryPlanMixin, ModelViewSet):
     """
     ViewSet to manage task assignments
     """
     serializer_class = TaskAssignmentSerializer
     permission_classes = [IsManagerOrOwnerOrSelf]
+    pagination_class = TaskAssignmentPagination
+    fast_reader = TaskAssignmentReader()
+    bulk_max_items = 1000
 
     def get_queryset(self):
         user_id = self.request.user.id
         return TaskAssignment.objects.filter(user_id=user_id)
 
     def get_object(self):
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         obj = get_object_or_404(queryset, pk=self.kwargs.get('pk'))
         self.check_object_permissions(self.request, obj)
         return obj
@@ -98,15 +268,20 @@ class TaskAssignmentViewSet(ModelViewSet):
         """
         Returns the details of a task assignment.
         """
+        not_modified = self.conditional_response(self.get_queryset(), pk=self.kwargs.get('pk'))
+        if not_modified is not None:
+            return not_modified
+        if self.use_fast_reads():
+            return self.fast_retrieve(self.get_queryset())
         task_assignment = self.get_object()  # No need to pass `pk`
-        serializer = self.serializer_class(task_assignment)
+        serializer = self.serializer_class(task_assignment, fields=self.sparse_fields())
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         """
         Creates a new task assignment.
         """
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(data=request.data, context=self.get_serializer_context())
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -117,7 +292,8 @@ class TaskAssignmentViewSet(ModelViewSet):
         Updates an existing task assignment.
         """
         task_assignment = self.get_object()
-        serializer = self.serializer_class(task_assignment, data=request.data, partial=True)
+        serializer = self.serializer_class(task_assignment, data=request.data, partial=True,
+                                           context=self.get_serializer_context())
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -129,12 +305,129 @@ class TaskAssignmentViewSet(ModelViewSet):
         """
         task_assignment = self.get_object()
         task_assignment.delete()
-        return Response({"message": "Task assignment deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     def list(self, request, *args, **kwargs):
         """
-        Returns a list of all task assignments.
+        Returns a page of task assignments, newest first.
+        """
+        not_modified = self.conditional_response(self.get_queryset())
+        if not_modified is not None:
+            return not_modified
+        if self.use_fast_reads():
+            return self.fast_list(self.get_queryset())
+        task_assignments = self.paginate_queryset(self.plan_queryset(self.get_queryset()))
+        serializer = self.serializer_class(task_assignments, many=True, fields=self.sparse_fields())
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_assign(self, request, *args, **kwargs):
+        """
+        Assigns a task to many users at once.
+        Returns one result per requested user: `assigned`, `already_assigned` or `forbidden`.
+        """
+        serializer = TaskAssignmentBulkSerializer(data=request.data, context=self.get_serializer_context())
+        if not serializer.is_valid():
+            if any(error.code == 'does_not_exist' for error in serializer.errors.get('task', ())):
+                # Same answer for a task hidden from the caller as for a missing one
+                return Response({"detail": "No Task matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        task = serializer.validated_data['task']
+        user_ids = list(dict.fromkeys(serializer.validated_data['users']))
+
+        allowed_ids = IsManagerOrOwnerOrSelf.manageable_user_ids(request.user, user_ids, request)
+        with transaction.atomic():
+            # Concurrent bulk assigns to the task wait here, so each sees the others' rows and
+            # never counts one whose insert was skipped as a conflict
+            Task.objects.select_for_update().filter(pk=task.pk).exists()
+            existing_ids = set(
+                TaskAssignment.objects.filter(task=task, user_id__in=allowed_ids).values_list('user_id', flat=True)
+            )
+            new_ids = [user_id for user_id in user_ids if user_id in allowed_ids and user_id not in existing_ids]
+            if new_ids:
+                # bulk_create skips save() and signals, so keep visibility and status in step here
+                TaskAssignment.objects.bulk_create(
+                    [TaskAssignment(task=task, user_id=user_id) for user_id in new_ids],
+                    ignore_conflicts=True
+                )
+                TaskVisibility.grant(TaskVisibility.Reasons.ASSIGNEE, [(user_id, task.id) for user_id in new_ids])
+                TeamTaskStats.shift([(user_id, TaskStatus.PENDING, 1) for user_id in new_ids])
+                Change.record(Change.Kinds.ASSIGNMENT, TaskAssignment.objects.filter(task=task, user_id__in=new_ids)
+                              .values_list('user_id', 'id'))
+                defer_status_update(task.id)
+
+        results = []
+        for user_id in user_ids:
+            if user_id not in allowed_ids:
+                result = 'forbidden'
+            elif user_id in existing_ids:
+                result = 'already_assigned'
+            else:
+                result = 'assigned'
+            results.append({'user': user_id, 'status': result})
+        return Response({'task': task.id, 'results': results}, status=status.HTTP_200_OK)
+
+    @bulk_assign.mapping.patch
+    def bulk_update_status(self, request, *args, **kwargs):
+        """
+        Updates the status of many of the caller's task assignments at once.
+        Expects `[{"id": ..., "status": ...}, ...]` and returns one result per item:
+        `updated`, `unchanged`, `not_found` or `invalid`.
         """
-        task_assignments = self.get_queryset()
-        serializer = self.serializer_class(task_assignments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        if not isinstance(request.data, list) or len(request.data) > self.bulk_max_items:
+            return Response({"detail": f"Expected a list of at most {self.bulk_max_items} items."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(request.data)
+        changes = {}
+        for index, item in enumerate(request.data):
+            serializer = TaskAssignmentStatusSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {'id': item.get('id') if isinstance(item, dict) else None,
+                                  'status': 'invalid', 'errors': serializer.errors}
+            elif serializer.validated_data['id'] in changes:
+                results[index] = {'id': serializer.validated_data['id'], 'status': 'invalid',
+                                  'errors': {'id': ['Duplicate item.']}}
+            else:
+                changes[serializer.validated_data['id']] = (index, serializer.validated_data['status'])
+
+        with transaction.atomic():
+            assignments = self.get_queryset().select_for_update().filter(id__in=changes).only('id', 'task_id', 'status')
+            updated = []
+            stats_deltas = []
+            now = timezone.now()
+            for assignment in assignments:
+                index, new_status = changes.pop(assignment.id)
+                if assignment.status == new_status:
+                    results[index] = {'id': assignment.id, 'status': 'unchanged'}
+                    continue
+                stats_deltas += [(request.user.id, assignment.status, -1), (request.user.id, new_status, 1)]
+                assignment.status = new_status
+                assignment.updated_at = now
+                updated.append(assignment)
+                results[index] = {'id': assignment.id, 'status': 'updated'}
+
+            if updated:
+                TaskAssignment.objects.bulk_update(updated, ['status', 'updated_at'])
+                TeamTaskStats.shift(stats_deltas)
+                Change.record(Change.Kinds.ASSIGNMENT, [(request.user.id, assignment.id) for assignment in updated])
+                for task_id in {assignment.task_id for assignment in updated}:
+                    defer_status_update(task_id)
+
+        for assignment_id, (index, _) in changes.items():
+            results[index] = {'id': assignment_id, 'status': 'not_found'}
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class TaskReadView(AsyncReadView):
+    """
+    Async reads of tasks, see `AsyncReadView`.
+    """
+    viewset_class = TaskViewSet
+
+
+class TaskAssignmentReadView(AsyncReadView):
+    """
+    Async reads of task assignments, see `AsyncReadView`.
+    """
+    viewset_class = TaskAssignmentViewSet
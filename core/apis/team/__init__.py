@@ -1 +1 @@
-from .view import TeamViewSet, TeamRolesViewSet
\ No newline at end of file
+from .view import TeamViewSet, TeamRolesViewSet, TeamReadView
\ No newline at end of file
@@ -1,19 +1,32 @@
 from django.db import models
+from django.db.models import Prefetch
+from django.http import Http404
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 
-from core.models import Team, TeamSerializer, TeamRoles, TeamRolesSerializer, IsTeamOwnerOrManager
+from core.models import (
+    Team, TeamSerializer, TeamRoles, TeamRolesSerializer, TeamTaskStats, IsTeamOwnerOrManager,
+    MANAGING_ROLES, NO_ROLE, resolve_team_role
+)
+from core.models.task.model import TaskStatus
+from ..asynchronous import AsyncReadView
+from ..fast import FastReadMixin, TeamReader
+from ..mixins import ConditionalGetMixin, QueryPlanMixin
 
 
-class TeamViewSet(ModelViewSet):
+class TeamViewSet(ConditionalGetMixin, FastReadMixin, QueryPlanMixin, ModelViewSet):
     """
     ViewSet to manage teams.
     """
     serializer_class = TeamSerializer
     permission_classes = (IsTeamOwnerOrManager,)
+    prefetch_related = (Prefetch('teamroles_set', queryset=TeamRoles.objects.order_by('id')),)
+    required_fields = ('owner',)  # Read by IsTeamOwnerOrManager
+    fast_reader = TeamReader()
 
     def get_queryset(self):
         """
@@ -26,7 +39,7 @@ class TeamViewSet(ModelViewSet):
         """
         Retrieves a single team object, ensuring user has access.
         """
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         obj = get_object_or_404(queryset, pk=self.kwargs.get('pk'))
         self.check_object_permissions(self.request, obj)
         return obj
@@ -35,8 +48,13 @@ class TeamViewSet(ModelViewSet):
         """
         Returns the details of a team.
         """
+        not_modified = self.conditional_response(self.get_queryset(), pk=self.kwargs.get('pk'))
+        if not_modified is not None:
+            return not_modified
+        if self.use_fast_reads():
+            return self.fast_retrieve(self.get_queryset())
         team = self.get_object()
-        serializer = self.serializer_class(team)
+        serializer = self.serializer_class(team, fields=self.sparse_fields())
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
@@ -68,18 +86,55 @@ class TeamViewSet(ModelViewSet):
         """
         team = self.get_object()
         team.delete()
-        return Response({"message": "Team deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     def list(self, request, *args, **kwargs):
         """
         Returns a list of all teams the user has access to.
         """
-        teams = self.get_queryset()
-        serializer = self.serializer_class(teams, many=True)
+        not_modified = self.conditional_response(self.get_queryset())
+        if not_modified is not None:
+            return not_modified
+        if self.use_fast_reads():
+            return self.fast_list(self.get_queryset())
+        teams = self.plan_queryset(self.get_queryset())
+        serializer = self.serializer_class(teams, many=True, fields=self.sparse_fields())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """
+        Returns the team's assignment counts by status, overall and per member.
+        Read from the `TeamTaskStats` rollup, so the cost does not grow with the team's tasks.
+        Only team managers or owners can see them.
+        """
+        role = resolve_team_role(request.user.id, pk, request)
+        if role == NO_ROLE:
+            raise Http404
+        if role not in MANAGING_ROLES:
+            return Response({"detail": "Only team managers or owners can see team stats."},
+                            status=status.HTTP_403_FORBIDDEN)
 
-class TeamRolesViewSet(ModelViewSet):
+        rows = (TeamTaskStats.objects.filter(team=pk).order_by('user__username', 'user_id')
+                .values_list('user_id', 'user__username', 'status', 'count'))
+        counts = dict.fromkeys(TaskStatus.values, 0)
+        members = {}
+        for user_id, username, task_status, count in rows:
+            member = members.setdefault(user_id, {
+                'user': user_id, 'username': username, 'counts': dict.fromkeys(TaskStatus.values, 0), 'total': 0,
+            })
+            member['counts'][task_status] = count
+            member['total'] += count
+            counts[task_status] += count
+        return Response({
+            'team': int(pk),
+            'counts': counts,
+            'total': sum(counts.values()),
+            'members': list(members.values()),
+        }, status=status.HTTP_200_OK)
+
+
+class TeamRolesViewSet(QueryPlanMixin, ModelViewSet):
     """
     ViewSet to manage team roles.
     """
@@ -96,7 +151,7 @@ class TeamRolesViewSet(ModelViewSet):
         """
         Retrieves a single team role object, ensuring user has access.
         """
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset())
         obj = get_object_or_404(queryset, pk=self.kwargs.get('pk'))
         self.check_object_permissions(self.request, obj)
         return obj
@@ -115,10 +170,9 @@ class TeamRolesViewSet(ModelViewSet):
         Only managers or owners can add members.
         """
         data = request.data
-        team = get_object_or_404(Team, pk=data.get('team'))
         # Check if request user is manager or owner
-        if not (team.owner == request.user or TeamRoles.objects.filter(team=team, user=request.user.id,
-                                                                       role=TeamRoles.Roles.MANAGER).exists()):
+        if resolve_team_role(request.user.id, data.get('team'), request) not in MANAGING_ROLES:
+            get_object_or_404(Team, pk=data.get('team'))
             return Response({"detail": "Only team managers or owners can assign roles."},
                             status=status.HTTP_403_FORBIDDEN)
 
@@ -136,8 +190,7 @@ class TeamRolesViewSet(ModelViewSet):
         team_role = self.get_object()
 
         # Ensure only owners or managers can change roles
-        if not (team_role.team.owner == request.user or TeamRoles.objects.filter(team=team_role.team, user=request.user,
-                                                                                 role=TeamRoles.Roles.MANAGER).exists()):
+        if resolve_team_role(request.user.id, team_role.team_id, request) not in MANAGING_ROLES:
             return Response({"detail": "Only team managers or owners can update roles."},
                             status=status.HTTP_403_FORBIDDEN)
 
@@ -155,18 +208,24 @@ class TeamRolesViewSet(ModelViewSet):
         team_role = self.get_object()
 
         # Ensure only managers or owners can remove members
-        if not (team_role.team.owner == request.user or TeamRoles.objects.filter(team=team_role.team, user=request.user,
-                                                                                 role=TeamRoles.Roles.MANAGER).exists()):
+        if resolve_team_role(request.user.id, team_role.team_id, request) not in MANAGING_ROLES:
             return Response({"detail": "Only team managers or owners can remove members."},
                             status=status.HTTP_403_FORBIDDEN)
 
         team_role.delete()
-        return Response({"message": "User removed from team successfully"}, status=status.HTTP_204_NO_CONTENT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     def list(self, request, *args, **kwargs):
         """
         Returns a list of all team roles for teams the user is part of.
         """
-        team_roles = self.get_queryset()
+        team_roles = self.plan_queryset(self.get_queryset())
         serializer = self.serializer_class(team_roles, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class TeamReadView(AsyncReadView):
+    """
+    Async reads of teams, see `AsyncReadView`.
+    """
+    viewset_class = TeamViewSet
@@ -4,15 +4,17 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework import status
 
 from core.models import User, UserSerializer
+from ..fast import FastReadMixin, UserReader
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(FastReadMixin, ModelViewSet):
     """
     ViewSet to manage tasks
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    fast_reader = UserReader()
 
     def get_permissions(self):
         if self.action == 'create':
@@ -23,10 +25,20 @@ class UserViewSet(ModelViewSet):
         """
         Returns the details of a user
         """
+        if self.use_fast_reads():
+            return self.fast_retrieve(self.get_queryset())
         user = self.get_object()
         serializer = self.serializer_class(user)
         return Response(serializer.data)
 
+    def list(self, request, *args, **kwargs):
+        """
+        Returns a list of users
+        """
+        if self.use_fast_reads():
+            return self.fast_list(self.get_queryset())
+        return super().list(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         """
         Creates a new user
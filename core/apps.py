@@ -5,4 +5,6 @@ class CoreConfig(AppConfig):
     name = "core"
 
     def ready(self):
-        pass
\ No newline at end of file
+        from core import metrics  # noqa: F401, times the SQL queries of every connection
+        from core.models.task import signals as task_signals  # noqa: F401
+        from core.models.team import signals as team_signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,362 @@
+import asyncio
+import io
+import json
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.db import connection
+
+
+def wsgi_get(application, path, headers=None):
+    """
+    Runs a GET through a WSGI `application` in this thread and returns `(status, body)`.
+    """
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+    status = []
+    result = application(environ, lambda line, response_headers, exc_info=None: status.append(line))
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return int(status[0].split()[0]), body
+
+
+async def asgi_get(application, path, headers=None):
+    """
+    Runs a GET through an ASGI `application` on the running loop and returns `(status, body)`.
+    """
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')] + [
+            (name.lower().encode(), value.encode()) for name, value in (headers or {}).items()
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects, the handler cancels this once it has responded
+        await asyncio.Future()
+
+    status, chunks = None, []
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await application(scope, receive, send)
+    return status, b''.join(chunks)
+
+
+class Timings:
+    """
+    Latencies (in seconds), statuses and SQL query counts of a run of requests, and how long the run took.
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = []
+        self.queries = []
+        self.elapsed = 0.0
+
+    def add(self, started, status, queries=None):
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses.append(status)
+        if queries is not None:
+            self.queries.append(queries)
+
+    @property
+    def errors(self):
+        return sum(1 for status in self.statuses if not 200 <= status < 400)
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        """
+        The `p`th percentile latency, in milliseconds.
+        """
+        if len(self.latencies) < 2:
+            return self.latencies[0] * 1000 if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method='inclusive')[p - 1] * 1000
+
+    def summary(self):
+        return {
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'throughput': round(self.throughput, 1),
+            'p50': round(self.percentile(50), 2),
+            'p95': round(self.percentile(95), 2),
+            'p99': round(self.percentile(99), 2),
+            'queries': round(statistics.fmean(self.queries), 2) if self.queries else None,
+        }
+
+
+def run_sync(application, path, requests, concurrency, headers=None):
+    """
+    Sends `requests` GETs to a WSGI `application` from `concurrency` threads, as a threaded WSGI server would.
+    """
+    timings = Timings()
+
+    def one(_):
+        started = time.perf_counter()
+        status, _ = wsgi_get(application, path, headers)
+        timings.add(started, status)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    timings.elapsed = time.perf_counter() - started
+    return timings
+
+
+def run_async(application, path, requests, concurrency, headers=None):
+    """
+    Sends `requests` GETs to an ASGI `application`, `concurrency` at a time on one event loop.
+    """
+    timings = Timings()
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                status, _ = await asgi_get(application, path, headers)
+                timings.add(started, status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        timings.elapsed = time.perf_counter() - started
+
+    asyncio.run(main())
+    return timings
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class ClientTransport:
+    """
+    Sends requests through the Django test client in this process, counting the SQL queries of each.
+    """
+    name = 'in-process'
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+        self.queries = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        body = {'data': json.dumps(data), 'content_type': 'application/json'} if data is not None else {}
+        self.queries = 0
+        with connection.execute_wrapper(self.count_query):
+            response = self.client.generic(method, path, headers=headers, **body)
+        is_json = response.get('Content-Type', '').startswith('application/json') and response.content
+        return response.status_code, response.json() if is_json else None, self.queries
+
+
+class HTTPTransport:
+    """
+    Sends requests to a running server. Its SQL queries cannot be counted from here.
+    """
+    name = 'http'
+
+    def __init__(self, base_url):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self.session.request(method, self.base_url + path, json=data, headers=headers)
+        is_json = response.headers.get('Content-Type', '').startswith('application/json') and response.content
+        return response.status_code, response.json() if is_json else None, None
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Scenarios:
+    """
+    The API flows the benchmark drives, as `username`, who must manage a team.
+
+    Each scenario method runs one iteration and measures each of its requests
+    under its own `scenario.step` label. Everything goes through the API, so the
+    same scenarios run in process and against a server.
+    """
+    names = ('login', 'list_tasks', 'bulk_assign', 'status_flip', 'team_members')
+
+    def __init__(self, transport, username, password):
+        self.transport = transport
+        self.username = username
+        self.password = password
+        self.token = None
+        self.results = defaultdict(Timings)
+        self.recording = True
+
+    def call(self, method, path, data=None, expect=(200,), auth=True):
+        """
+        Sends a request without measuring it, for setup.
+        """
+        status, body, _ = self.transport.request(method, path, data, self.token if auth else None)
+        if status not in expect:
+            raise BenchmarkError(f"{method} {path} answered {status}: {body}")
+        return body
+
+    def step(self, label, method, path, data=None, expect=(200,), auth=True):
+        started = time.perf_counter()
+        status, body, queries = self.transport.request(method, path, data, self.token if auth else None)
+        if self.recording:
+            timings = self.results[label]
+            timings.add(started, status, queries)
+            timings.elapsed += timings.latencies[-1]
+        if status not in expect:
+            raise StepFailed(label, status, body)
+        return body
+
+    def setup(self):
+        self.token = self.call('POST', '/api/token/', {'username': self.username, 'password': self.password},
+                               auth=False)['access']
+        roles = self.call('GET', '/api/teams/members/')
+        managed = [role for role in roles if role['role'] == 'manager']
+        if not managed:
+            raise BenchmarkError(f"{self.username} does not manage any team.")
+        self.user_id, self.team_id = managed[0]['user'], managed[0]['team']
+        members = [member['user'] for member in self.call('GET', f'/api/teams/{self.team_id}/')['members']]
+        self.assignees = list(dict.fromkeys([self.user_id, *members]))[:5]
+        self.since = None
+
+        # Assignments of the caller's own to flip
+        self.recording = False
+        try:
+            self.bulk_assign()
+        except StepFailed as exc:
+            raise BenchmarkError(f"Could not assign a task to {self.username}: {exc}")
+        self.assignment_ids = [assignment['id'] for assignment in
+                               self.call('GET', '/api/tasks/assign/?page_size=10')['results']]
+        self.next_status = 'completed'
+
+    def run(self, names, iterations, warmup=0):
+        for name in names:
+            scenario = getattr(self, name)
+            self.recording = False
+            for _ in range(warmup):
+                self.attempt(scenario)
+            self.recording = True
+            for _ in range(iterations):
+                self.attempt(scenario)
+        return {label: timings.summary() for label, timings in self.results.items()}
+
+    @staticmethod
+    def attempt(scenario):
+        try:
+            scenario()
+        except StepFailed:
+            pass  # Counted as an error of the step, the rest of the iteration depends on it
+
+    def login(self):
+        self.token = self.step('login', 'POST', '/api/token/',
+                               {'username': self.username, 'password': self.password}, auth=False)['access']
+
+    def list_tasks(self):
+        page = self.step('list_tasks.first_page', 'GET', '/api/tasks/?page_size=20')
+        if page['next']:
+            next_link = urlsplit(page['next'])
+            self.step('list_tasks.next_page', 'GET', f'{next_link.path}?{next_link.query}')
+
+    def bulk_assign(self):
+        task = self.step('bulk_assign.create_task', 'POST', '/api/tasks/',
+                         {'name': 'Benchmark task', 'description': 'Created by the benchmark.', 'task_type': 'goal',
+                          'user_id': self.user_id},
+                         expect=(201,))
+        self.step('bulk_assign.assign', 'POST', '/api/tasks/assign/bulk/',
+                  {'task': task['id'], 'users': self.assignees})
+
+    def status_flip(self):
+        self.step('status_flip.flip', 'PATCH', '/api/tasks/assign/bulk/',
+                  [{'id': assignment_id, 'status': self.next_status} for assignment_id in self.assignment_ids])
+        self.next_status = 'in_progress' if self.next_status == 'completed' else 'completed'
+
+    def team_members(self):
+        # Roles are only reachable through /api/teams/members/ by their own user, so the
+        # caller adds, edits and removes a role of their own. Only the change feed gives its id.
+        if self.since is None:
+            self.since = self.call('GET', '/api/tasks/changes/')['next']
+        self.step('team_members.add', 'POST', '/api/teams/members/',
+                  {'team': self.team_id, 'user': self.user_id, 'role': 'manager'}, expect=(201,))
+        changes = self.step('team_members.sync', 'GET', f'/api/tasks/changes/?since={self.since}')
+        self.since = changes['next']
+        role_id = max(role['id'] for role in changes['team_roles'] if role['team'] == self.team_id)
+        self.step('team_members.update', 'PATCH', f'/api/teams/members/{role_id}/', {'role': 'manager'})
+        self.step('team_members.view_team', 'GET', f'/api/teams/{self.team_id}/')
+        self.step('team_members.remove', 'DELETE', f'/api/teams/members/{role_id}/', expect=(204,))
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the regressions of `results` against `baseline` (both `Timings.summary()` by label):
+    more SQL queries per request, or a p95 latency more than `tolerance` (a fraction) slower.
+    """
+    regressions = []
+    for label, current in results.items():
+        previous = baseline.get(label)
+        if previous is None:
+            continue
+        if current['queries'] is not None and previous['queries'] is not None \
+                and current['queries'] > previous['queries'] + 0.5:
+            regressions.append(f"{label}: {current['queries']} queries per request, was {previous['queries']}")
+        if current['p95'] > previous['p95'] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {current['p95']} ms, was {previous['p95']} ms")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{label}: {current['errors']} errors, was {previous['errors']}")
+    return regressions
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class BaseBroker:
+    """
+    Pub/sub of per-user events between the code that changes data and the SSE streams.
+
+    `publish_changes` is called from synchronous code once the changes are committed,
+    `subscribe` from the event loop serving a stream. Backends implement `publish` and
+    `subscribe`; one shared by several nodes (`PostgresBroker`, ...) also carries the
+    changes from `publish_changes` to the other nodes. Selected with the `EVENTS_BROKER` setting.
+    """
+
+    def has_subscribers(self, user_id):
+        """
+        Whether an event for `user_id` may reach anyone, lets publishers skip building it.
+        """
+        return True
+
+    def publish_changes(self, changes):
+        """
+        Pushes committed `(seq, user_id, kind, object_id)` change rows to the users' streams.
+        """
+        changes = [change for change in changes if self.has_subscribers(change[1])]
+        if not changes:
+            return
+        from core.models import Change
+
+        for user_id, token, event in build_events(changes, Change.horizon()):
+            self.publish(user_id, (token, event))
+
+    def publish(self, user_id, event):
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """
+        Async context manager yielding a `Subscription` for the events of `user_id`.
+        """
+        raise NotImplementedError
+
+
+class Subscription:
+    """
+    The events of one stream, buffered up to `maxsize`. A stream that falls further
+    behind is flagged `overflowed` and should tell its client to resync.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def lose(self):
+        """
+        Flags that events may have been lost, so the stream tells its client to resync.
+        """
+        self.overflowed = True
+
+    async def get(self, timeout):
+        """
+        Returns the next event, or None when none arrives within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Delivers events to the streams served by this process only, enough for a single node.
+    """
+    queue_size = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                # Publishers run in worker threads, the queue belongs to the stream's loop
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                pass  # The loop is closed, the stream is going away
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[user_id].discard(subscription)
+                if not self._subscriptions[user_id]:
+                    del self._subscriptions[user_id]
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Shares the changes between nodes through PostgreSQL LISTEN/NOTIFY.
+
+    Publishers send the committed change rows on `channel`, whoever streams them or not.
+    Each node listens from a background thread with its own connection, started with
+    its first stream, and builds the events of the users it serves. When that connection
+    drops, the node's streams are asked to resync once it is back.
+    """
+    channel = 'task_events'
+    # NOTIFY payloads are limited to 8000 bytes, a change row takes under 80
+    changes_per_notify = 100
+    reconnect_seconds = 5
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def publish_changes(self, changes):
+        payloads = [
+            json.dumps(changes[start:start + self.changes_per_notify])
+            for start in range(0, len(changes), self.changes_per_notify)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                           [self.channel, payloads])
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self.listen, name='events-listener', daemon=True)
+                self._listener.start()
+        async with super().subscribe(user_id) as subscription:
+            yield subscription
+
+    def listen(self):
+        reconnecting = False
+        while True:
+            listener = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                if reconnecting:
+                    self.lose_all()
+                for payload in self.notifications(listener.connection):
+                    self.deliver(payload)
+            except Exception:
+                logger.exception('Lost the connection listening to %s, reconnecting', self.channel)
+            finally:
+                listener.close()
+            reconnecting = True
+            time.sleep(self.reconnect_seconds)
+
+    @staticmethod
+    def notifications(raw):
+        """
+        The payloads of the notifications received on `raw`, a psycopg or psycopg2 connection.
+        """
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        while True:
+            if is_psycopg3:
+                yield from (notify.payload for notify in raw.notifies())
+            else:
+                select.select([raw], [], [])
+                raw.poll()
+                while raw.notifies:
+                    yield raw.notifies.pop(0).payload
+
+    def deliver(self, payload):
+        close_old_connections()
+        try:
+            super().publish_changes([tuple(change) for change in json.loads(payload)])
+        except Exception:
+            logger.exception('Could not deliver the changes of a notification')
+            self.lose_all()
+
+    def lose_all(self):
+        with self._lock:
+            subscriptions = [subscription for group in self._subscriptions.values() for subscription in group]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.lose)
+            except RuntimeError:
+                pass
+
+
+@cache
+def get_broker():
+    return import_string(getattr(settings, 'EVENTS_BROKER', 'core.events.InProcessBroker'))()
+
+
+def build_events(changes, horizon):
+    """
+    Turns `(seq, user_id, kind, object_id)` change rows into `(user_id, token, event)` triples.
+    Tasks and assignments carry their current status, or `deleted` once they are gone
+    (or, for tasks, no longer visible to the user).
+
+    `token` is the event's id on the stream, where a client resumes from: its `seq` capped
+    to the `Change.horizon()` read beforehand, as lower ids may still be in flight.
+    """
+    from core.models import Change, Task, TaskAssignment, TaskVisibility
+
+    ids = defaultdict(set)
+    for _, _, kind, object_id in changes:
+        ids[kind].add(object_id)
+    statuses = {}
+    for kind, model in ((Change.Kinds.TASK, Task), (Change.Kinds.ASSIGNMENT, TaskAssignment)):
+        if ids[kind]:
+            statuses[kind] = dict(model.objects.filter(id__in=ids[kind]).values_list('id', 'status'))
+    visible_tasks = set()
+    if ids[Change.Kinds.TASK]:
+        visible_tasks = set(TaskVisibility.objects.filter(
+            task_id__in=ids[Change.Kinds.TASK], user_id__in={change[1] for change in changes}
+        ).values_list('user_id', 'task_id'))
+
+    events = []
+    for seq, user_id, kind, object_id in changes:
+        event = {'seq': seq, 'kind': kind, 'id': object_id}
+        if kind in statuses:
+            status = statuses[kind].get(object_id)
+            if kind == Change.Kinds.TASK and (user_id, object_id) not in visible_tasks:
+                status = None
+            event.update({'status': status} if status is not None else {'deleted': True})
+        events.append((user_id, min(seq, horizon), event))
+    return events
+
+
+def publish_changes(changes):
+    """
+    Pushes committed `(seq, user_id, kind, object_id)` change rows to the users' streams.
+    Costs nothing when none of the users is listening, unless the broker is shared.
+    """
+    get_broker().publish_changes(changes)
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.benchmark import run_async, run_sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of the sync (WSGI) and async (ASGI) read endpoints under concurrent load, "
+        "in process, against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help="User the requests authenticate as.")
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="Sync endpoint to load, repeatable (default: /api/tasks/). "
+                                 "Its async twin is the same path under /api/async/.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once.")
+
+    def handle(self, *args, **options):
+        from core.asgi import application as asgi_application
+        from core.wsgi import application as wsgi_application
+
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        requests, concurrency = options['requests'], options['concurrency']
+
+        self.stdout.write(f"{requests} requests per endpoint, {concurrency} in flight.")
+        self.stdout.write(f"{'endpoint':<40} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for path in options['paths'] or ['/api/tasks/']:
+            if not path.startswith('/api/') or path.startswith('/api/async/'):
+                raise CommandError(f"{path!r} is not a sync API endpoint.")
+            async_path = '/api/async/' + path.removeprefix('/api/')
+            for label, run, application, target in (
+                ('sync', run_sync, wsgi_application, path),
+                ('async', run_async, asgi_application, async_path),
+            ):
+                run(application, target, 1, 1, headers)  # Warm up imports and caches
+                timings = run(application, target, requests, concurrency, headers)
+                self.stdout.write(
+                    f"{label + ' ' + target:<40} {timings.throughput:>9.1f} "
+                    f"{timings.percentile(50):>9.2f} {timings.percentile(95):>9.2f} {timings.errors:>7}"
+                )
@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from core.benchmark import BenchmarkError, ClientTransport, HTTPTransport, Scenarios, compare
+from core.models import Team
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'tests' / 'benchmark_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the API scenarios (login, task lists, bulk assign, status flips, team member CRUD) and report "
+        "p50/p95/p99 latency, throughput and SQL queries per request, compared against a stored baseline. "
+        "Runs in process against a throwaway test database seeded with seed_scale, or against --url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Benchmark a running server (e.g. http://localhost:8000) instead.")
+        parser.add_argument('--username', help="User to run as, must manage a team. Required with --url.")
+        parser.add_argument('--password', default='password')
+        parser.add_argument('--scenario', action='append', dest='scenarios', choices=Scenarios.names,
+                            help="Scenario to run, repeatable (default: all).")
+        parser.add_argument('--iterations', type=int, default=30, help="Iterations of each scenario.")
+        parser.add_argument('--warmup', type=int, default=3, help="Unmeasured iterations first.")
+        parser.add_argument('--users', type=int, default=200, help="Users seeded in process.")
+        parser.add_argument('--teams', type=int, default=20, help="Teams seeded in process.")
+        parser.add_argument('--tasks', type=int, default=2000, help="Tasks seeded in process.")
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Record this run as the baseline instead of comparing against it.")
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help="p95 slowdown tolerated before reporting a regression, as a fraction.")
+
+    def handle(self, *args, **options):
+        if options['url']:
+            if not options['username']:
+                raise CommandError("--username is required with --url.")
+            results = self.run(HTTPTransport(options['url']), options['username'], options)
+            key = 'http'
+        else:
+            results = self.run_in_process(options)
+            key = f'in-process/{connection.vendor}'
+
+        self.report(results)
+        baselines = json.loads(options['baseline'].read_text()) if options['baseline'].exists() else {}
+        if options['save_baseline']:
+            baselines[key] = results
+            options['baseline'].write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Saved the {key} baseline to {options['baseline']}."))
+        elif key not in baselines:
+            self.stdout.write(f"No {key} baseline in {options['baseline']}, record one with --save-baseline.")
+        else:
+            regressions = compare(results, baselines[key], options['tolerance'])
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n" + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS(f"No regression against the {key} baseline."))
+
+    def run_in_process(self, options):
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            call_command('seed_scale', users=options['users'], teams=options['teams'], tasks=options['tasks'],
+                         password=options['password'], verbosity=0)
+            # The owner of the largest team, seed_scale makes owners managers of their team
+            username = options['username'] or (
+                Team.objects.annotate(size=Count('teamroles')).order_by('-size', 'id')
+                .values_list('owner__username', flat=True).first()
+            )
+            return self.run(ClientTransport(), username, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, transport, username, options):
+        scenarios = Scenarios(transport, username, options['password'])
+        try:
+            scenarios.setup()
+        except BenchmarkError as exc:
+            raise CommandError(str(exc))
+        return scenarios.run(options['scenarios'] or Scenarios.names, options['iterations'], options['warmup'])
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'step':<28} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'errors':>7}"
+        )
+        for label, result in results.items():
+            queries = '-' if result['queries'] is None else f"{result['queries']:.2f}"
+            self.stdout.write(
+                f"{label:<28} {result['requests']:>8} {result['throughput']:>8.1f} {result['p50']:>8.2f} "
+                f"{result['p95']:>8.2f} {result['p99']:>8.2f} {queries:>8} {result['errors']:>7}"
+            )
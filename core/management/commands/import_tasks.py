@@ -0,0 +1,34 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import TaskImporter, User
+
+
+class Command(BaseCommand):
+    help = "Import tasks from an NDJSON file (one task per line, optional `assignees` usernames)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="NDJSON file to import, or - for stdin.")
+        parser.add_argument('--created-by', required=True, help="Username recorded as the creator of every task.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            created_by = User.objects.get(username=options['created_by'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['created_by']}")
+
+        importer = TaskImporter(created_by, batch_size=options['batch_size'], check_permissions=False)
+        if options['path'] == '-':
+            report = importer.run(sys.stdin)
+        else:
+            with open(options['path'], 'rb') as lines:
+                report = importer.run(lines)
+
+        for error in report['errors']:
+            self.stderr.write(json.dumps(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} task(s), {len(report['errors'])} line(s) rejected."
+        ))
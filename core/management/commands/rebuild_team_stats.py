@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.models import TeamTaskStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the TeamTaskStats rollup behind /api/teams/<id>/stats/ from TeamRoles and TaskAssignment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--team', type=int, action='append', dest='team_ids',
+                            help="Only rebuild this team, repeatable (default: every team).")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many rows have drifted.")
+
+    def handle(self, *args, **options):
+        team_ids = options['team_ids']
+        expected = TeamTaskStats.expected(team_ids)
+        current = TeamTaskStats.objects.all() if team_ids is None else TeamTaskStats.objects.filter(team__in=team_ids)
+        actual = {(team_id, user_id, status): count
+                  for team_id, user_id, status, count in current.values_list('team', 'user', 'status', 'count')}
+        drifted = sum(1 for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key))
+        self.stdout.write(f"{drifted} team stats row(s) drifted.")
+        if options['dry_run'] or not drifted:
+            return
+
+        written = TeamTaskStats.rebuild(team_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} team stats row(s)."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from core.models import Task
+from core.models.task.model import TaskStatus
+
+
+class Command(BaseCommand):
+    help = "Reconcile Task.assignments_total/assignments_completed (and the derived status) with TaskAssignment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many tasks have drifted.")
+
+    def handle(self, *args, **options):
+        drifted = (
+            Task.objects
+            .annotate(
+                actual_total=Count('assignments'),
+                actual_completed=Count('assignments', filter=Q(assignments__status=TaskStatus.COMPLETED)),
+            )
+            .exclude(assignments_total=F('actual_total'), assignments_completed=F('actual_completed'))
+            .values_list('id', flat=True)
+        )
+        drifted_ids = list(drifted)
+        self.stdout.write(f"{len(drifted_ids)} task(s) with drifted assignment counters.")
+        if options['dry_run'] or not drifted_ids:
+            return
+
+        with transaction.atomic():
+            updated = Task.recount_assignments(Task.objects.filter(id__in=drifted_ids))
+        self.stdout.write(self.style.SUCCESS(f"Repaired {updated.count()} task(s)."))
@@ -0,0 +1,286 @@
+import io
+import math
+import random
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from core.models import Task, TaskAssignment, TaskVisibility, Team, TeamRoles, TeamTaskStats, User
+from core.models.task.model import TaskStatus
+
+WORDS = (
+    'api', 'audit', 'backlog', 'billing', 'budget', 'cache', 'client', 'dashboard', 'database', 'deadline',
+    'deploy', 'design', 'docs', 'email', 'export', 'feedback', 'hiring', 'import', 'incident', 'invoice',
+    'launch', 'login', 'marketing', 'meeting', 'metrics', 'migration', 'mobile', 'onboarding', 'outage',
+    'partner', 'payment', 'planning', 'quarterly', 'release', 'report', 'review', 'roadmap', 'sales',
+    'search', 'security', 'server', 'signup', 'sprint', 'support', 'survey', 'testing', 'training',
+    'upgrade', 'vendor', 'website',
+)
+TASK_TYPES = ('meeting', 'issue', 'goal', 'other')
+TASK_TYPE_WEIGHTS = (20, 35, 25, 20)
+# Assignees per task, about 4 on average as in production (5M tasks, 20M assignments)
+ASSIGNEE_COUNTS = (0, 1, 2, 3, 4, 5, 6, 8, 10)
+ASSIGNEE_WEIGHTS = (5, 15, 15, 15, 15, 10, 10, 10, 5)
+PERSONAL_TASK_SHARE = 0.1  # Tasks created outside of any team
+MANAGER_SHARE = 0.1
+
+
+class RowWriter:
+    """
+    Inserts rows with explicit ids, through COPY on PostgreSQL and executemany elsewhere.
+    No save(), no signals: the caller writes the derived tables itself.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.copy = connection.vendor == 'postgresql'
+        self.counts = defaultdict(int)
+
+    def write(self, model, fields, rows):
+        if not rows:
+            return
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+        if self.copy:
+            self.copy_rows(f'COPY {table} ({columns}) FROM STDIN', rows)
+        else:
+            rows = self.adapt_datetimes(model, fields, rows)
+            placeholders = ', '.join(['%s'] * len(fields))
+            self.cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows)
+        self.counts[model] += len(rows)
+
+    def copy_rows(self, sql, rows):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(map(self.copy_value, row)))
+            buffer.write('\n')
+        buffer.seek(0)
+        raw = self.cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+    @staticmethod
+    def copy_value(value):
+        if value is None:
+            return r'\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, str):
+            return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+        return str(value)
+
+    @staticmethod
+    def adapt_datetimes(model, fields, rows):
+        positions = [index for index, name in enumerate(fields)
+                     if model._meta.get_field(name).get_internal_type() == 'DateTimeField']
+        if not positions:
+            return rows
+        adapt = connection.ops.adapt_datetimefield_value
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for index in positions:
+                row[index] = adapt(row[index])
+        return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset at production scale (users, teams, tasks, assignments) with realistic "
+        "team sizes, assignees per task and status mix. The same arguments always generate the same rows. "
+        "Bypasses save() and signals: counters, visibility and team stats are written directly, "
+        "nothing is added to the change feed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--teams', type=int, default=100)
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0, help="Seed of the random generator.")
+        parser.add_argument('--prefix', default='seed', help="Prefix of the generated usernames.")
+        parser.add_argument('--password', default='password', help="Password of every generated user.")
+        parser.add_argument('--end', type=date.fromisoformat, default=date(2026, 1, 1),
+                            help="Tasks are created over the --days before this date (YYYY-MM-DD).")
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=10000, help="Tasks generated and written at once.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['teams'] < 0 or options['tasks'] < 0:
+            raise CommandError("Expected at least 2 users and no negative counts.")
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Users named {options['prefix']}* already exist, pick another --prefix.")
+
+        self.verbosity = options['verbosity']
+        self.rng = random.Random(options['seed'])
+        self.end = datetime.combine(options['end'], time(), tzinfo=dt_timezone.utc)
+        self.span = timedelta(days=options['days'])
+        self.next_ids = {
+            model: (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+            for model in (User, Team, TeamRoles, Task, TaskAssignment, TaskVisibility, TeamTaskStats)
+        }
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.writer = RowWriter(cursor)
+            user_ids = self.seed_users(options['users'], options['prefix'], options['password'])
+            teams = self.seed_teams(options['teams'], user_ids)
+            status_counts = self.seed_tasks(options['tasks'], user_ids, teams, options['batch_size'])
+            self.seed_team_stats(teams, status_counts)
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(self.next_ids)):
+                cursor.execute(sql)
+            Task.update_search_vectors(Task.objects.filter(id__gte=self.first_task_id))
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for model in self.next_ids:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        if self.verbosity:
+            self.stdout.write(self.style.SUCCESS('Seeded ' + ', '.join(
+                f"{count} {model.__name__}" for model, count in self.writer.counts.items()
+            ) + ' rows.'))
+
+    def allocate(self, model, count):
+        first = self.next_ids[model]
+        self.next_ids[model] += count
+        return range(first, first + count)
+
+    def seed_users(self, count, prefix, password):
+        # Hashed once for everyone, User.save() would run the slow password hasher per row
+        password = make_password(password)
+        joined = self.end - self.span
+        ids = self.allocate(User, count)
+        for start in range(0, count, 10000):
+            self.writer.write(User, (
+                'id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+                'is_staff', 'is_active', 'date_joined',
+            ), [
+                (user_id, password, False, f'{prefix}{n:07d}', '', '', f'{prefix}{n:07d}@example.com',
+                 False, True, joined)
+                for n, user_id in enumerate(ids[start:start + 10000], start=start)
+            ])
+        return ids
+
+    def seed_teams(self, count, user_ids):
+        """
+        Team sizes are log-normal (median 8, a long tail of large teams). The first member
+        owns the team, about one in ten members is a manager. Returns the member ids of every team.
+        """
+        rng = self.rng
+        teams = {}
+        roles = []
+        created_at = self.end - self.span
+        for team_id in self.allocate(Team, count):
+            size = max(2, min(len(user_ids), 500, round(rng.lognormvariate(math.log(8), 0.8))))
+            members = rng.sample(user_ids, size)
+            teams[team_id] = members
+            for position, user_id in enumerate(members):
+                manager = position == 0 or rng.random() < MANAGER_SHARE
+                roles.append((team_id, user_id, TeamRoles.Roles.MANAGER if manager else TeamRoles.Roles.MEMBER))
+
+        self.writer.write(Team, ('id', 'name', 'created_at', 'updated_at', 'owner'), [
+            (team_id, f'Team {n}', created_at, created_at, members[0])
+            for n, (team_id, members) in enumerate(teams.items())
+        ])
+        self.writer.write(TeamRoles, ('id', 'team', 'user', 'role'), [
+            (role_id, *role) for role_id, role in zip(self.allocate(TeamRoles, len(roles)), roles)
+        ])
+        return teams
+
+    def seed_tasks(self, count, user_ids, teams, batch_size):
+        """
+        Most tasks belong to a team (picked by size) and go to its members. Tasks are created
+        evenly over the period, older assignments are more likely to be completed.
+        Returns how many assignments of each status every user has.
+        """
+        rng = self.rng
+        team_members = list(teams.values())
+        team_weights = list(accumulate(len(members) for members in team_members))
+        status_counts = defaultdict(lambda: dict.fromkeys(TaskStatus.values, 0))
+        self.first_task_id = self.next_ids[Task]
+
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            tasks, assignments, visibility = [], [], []
+            for n, task_id in enumerate(self.allocate(Task, size), start=start):
+                if team_members and rng.random() >= PERSONAL_TASK_SHARE:
+                    members = rng.choices(team_members, cum_weights=team_weights)[0]
+                else:
+                    members = user_ids
+                creator = rng.choice(members)
+                assignees = rng.sample(members, min(len(members), rng.choices(
+                    ASSIGNEE_COUNTS, weights=ASSIGNEE_WEIGHTS)[0]))
+
+                created_at = self.end - self.span + self.span * (n / max(count, 1))
+                age = (self.end - created_at) / self.span
+                completed_chance = 0.1 + 0.8 * age
+                completed = 0
+                last_assigned_at = created_at
+                for user_id in assignees:
+                    roll = rng.random()
+                    if roll < completed_chance:
+                        status = TaskStatus.COMPLETED
+                        completed += 1
+                    elif roll < completed_chance + (1 - completed_chance) / 2:
+                        status = TaskStatus.IN_PROGRESS
+                    else:
+                        status = TaskStatus.PENDING
+                    assigned_at = min(self.end, created_at + timedelta(minutes=rng.randrange(2 * 24 * 60)))
+                    last_assigned_at = max(last_assigned_at, assigned_at)
+                    assignments.append((user_id, task_id, status, assigned_at, assigned_at))
+                    status_counts[user_id][status] += 1
+                    visibility.append((user_id, task_id, TaskVisibility.Reasons.ASSIGNEE))
+                visibility.append((creator, task_id, TaskVisibility.Reasons.CREATOR))
+
+                if not assignees:
+                    status, completed_at = TaskStatus.PENDING, None
+                elif completed == len(assignees):
+                    status = TaskStatus.COMPLETED
+                    completed_at = min(self.end, last_assigned_at + timedelta(hours=rng.randrange(1, 72)))
+                else:
+                    status, completed_at = TaskStatus.IN_PROGRESS, None
+                task_type = rng.choices(TASK_TYPES, weights=TASK_TYPE_WEIGHTS)[0]
+                tasks.append((
+                    task_id,
+                    ' '.join(rng.choices(WORDS, k=rng.randint(3, 6))).capitalize(),
+                    ' '.join(rng.choices(WORDS, k=rng.randint(10, 30))).capitalize() + '.',
+                    created_at, completed_at or created_at, completed_at, creator,
+                    task_type, 'Misc' if task_type == 'other' else None,
+                    status, len(assignees), completed,
+                ))
+
+            self.writer.write(Task, (
+                'id', 'name', 'description', 'created_at', 'updated_at', 'completed_at', 'created_by',
+                'task_type', 'task_type_other', 'status', 'assignments_total', 'assignments_completed',
+            ), tasks)
+            self.writer.write(TaskAssignment, ('id', 'user', 'task', 'status', 'assigned_at', 'updated_at'), [
+                (assignment_id, *row) for assignment_id, row in
+                zip(self.allocate(TaskAssignment, len(assignments)), assignments)
+            ])
+            # A creator assigning themselves has both reasons, as with TaskVisibility.grant
+            self.writer.write(TaskVisibility, ('id', 'user', 'task', 'reason'), [
+                (visibility_id, *row) for visibility_id, row in
+                zip(self.allocate(TaskVisibility, len(visibility)), visibility)
+            ])
+            if self.verbosity > 1:
+                self.stdout.write(f"{start + size}/{count} tasks")
+        return status_counts
+
+    def seed_team_stats(self, teams, status_counts):
+        rows = [
+            (team_id, user_id, status, status_counts[user_id][status] if user_id in status_counts else 0)
+            for team_id, members in teams.items()
+            for user_id in members
+            for status in TaskStatus.values
+        ]
+        self.writer.write(TeamTaskStats, ('id', 'team', 'user', 'status', 'count'), [
+            (stats_id, *row) for stats_id, row in zip(self.allocate(TeamTaskStats, len(rows)), rows)
+        ])
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from core.models import Task, TaskAssignment, TaskVisibility
+
+
+class Command(BaseCommand):
+    help = "Rebuild the TaskVisibility index from tasks and assignments, or verify it with --verify."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help="Only report drift, do not modify the table.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            self.verify()
+        else:
+            self.rebuild(options['batch_size'])
+
+    def rebuild(self, batch_size):
+        with transaction.atomic():
+            TaskVisibility.objects.all().delete()
+            created = self.insert(
+                TaskVisibility.Reasons.CREATOR,
+                Task.objects.values_list('created_by_id', 'id'),
+                batch_size
+            )
+            assigned = self.insert(
+                TaskVisibility.Reasons.ASSIGNEE,
+                TaskAssignment.objects.values_list('user_id', 'task_id'),
+                batch_size
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt task visibility: {created} creator rows, {assigned} assignee rows."
+        ))
+
+    def insert(self, reason, pairs, batch_size):
+        count = 0
+        batch = []
+        for user_id, task_id in pairs.iterator(chunk_size=batch_size):
+            batch.append(TaskVisibility(user_id=user_id, task_id=task_id, reason=reason))
+            if len(batch) >= batch_size:
+                TaskVisibility.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            TaskVisibility.objects.bulk_create(batch)
+            count += len(batch)
+        return count
+
+    def verify(self):
+        creator_rows = TaskVisibility.objects.filter(reason=TaskVisibility.Reasons.CREATOR)
+        assignee_rows = TaskVisibility.objects.filter(reason=TaskVisibility.Reasons.ASSIGNEE)
+
+        drift = {
+            'missing creator rows': Task.objects.exclude(
+                Exists(creator_rows.filter(task=OuterRef('pk'), user=OuterRef('created_by')))
+            ).count(),
+            'missing assignee rows': TaskAssignment.objects.exclude(
+                Exists(assignee_rows.filter(task=OuterRef('task'), user=OuterRef('user')))
+            ).count(),
+            'stale creator rows': creator_rows.exclude(
+                Exists(Task.objects.filter(pk=OuterRef('task'), created_by=OuterRef('user')))
+            ).count(),
+            'stale assignee rows': assignee_rows.exclude(
+                Exists(TaskAssignment.objects.filter(task=OuterRef('task'), user=OuterRef('user')))
+            ).count(),
+        }
+
+        for label, count in drift.items():
+            self.stdout.write(f"{label}: {count}")
+        if any(drift.values()):
+            raise CommandError("Task visibility is out of date, run `manage.py task_visibility` to rebuild it.")
+        self.stdout.write(self.style.SUCCESS("Task visibility is up to date."))
@@ -0,0 +1,240 @@
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+# Fingerprints kept by the registry, past it new ones are folded into `OTHER_FINGERPRINT`
+MAX_FINGERPRINTS = 5000
+OTHER_FINGERPRINT = '<other>'
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+PLACEHOLDER_LISTS = re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)')
+REPEATED_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+# Django's savepoint ids embed the thread id
+SAVEPOINT_IDS = re.compile(r'"s\d+_x\d+"')
+WHITESPACE = re.compile(r'\s+')
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Frames of the instrumentation itself, never the source of a query
+INSTRUMENTATION = frozenset({__file__, os.path.join(APP_DIR, 'middleware.py')})
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """
+    `sql` with its literals and placeholders replaced by `?`, and lists of them (`IN (...)`,
+    multi-row `VALUES`) collapsed, so the queries a code path runs share one fingerprint.
+    """
+    sql = LITERALS.sub('?', SAVEPOINT_IDS.sub('"?"', sql))
+    sql = PLACEHOLDER_LISTS.sub('(...)', sql)
+    sql = REPEATED_LISTS.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestStats:
+    """
+    What the request being served has done so far, filled in by `record_queries`.
+    """
+    __slots__ = ('queries', 'db_time', 'fingerprints', 'timeline')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        # fingerprint: [count, total time, max time]
+        self.fingerprints = {}
+        # (start, duration, sql, source) of every query, only kept while profiling
+        self.timeline = None
+
+    def record_query(self, sql, started, duration):
+        self.queries += 1
+        self.db_time += duration
+        if self.timeline is not None:
+            self.timeline.append((started, duration, sql, query_source()))
+        entry = self.fingerprints.get(key := fingerprint(sql))
+        if entry is None:
+            self.fingerprints[key] = [1, duration, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+            if duration > entry[2]:
+                entry[2] = duration
+
+    def repeated(self, threshold):
+        """
+        The fingerprints run more than `threshold` times, most likely an N+1.
+        """
+        return [key for key, (count, _, _) in self.fingerprints.items() if count > threshold]
+
+    def slow(self, seconds):
+        """
+        The fingerprints of which a run took `seconds` or more.
+        """
+        return [key for key, (_, _, longest) in self.fingerprints.items() if longest >= seconds]
+
+
+current_request = ContextVar('current_request', default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper timing every query into the `RequestStats` of the current request, if any.
+
+    asgiref copies context variables into `sync_to_async` threads, so queries
+    run for async views are attributed to their request too.
+    """
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, started, time.perf_counter() - started)
+
+
+def query_source():
+    """
+    Where in the app the query being run comes from, as `path:line in function`.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename not in INSTRUMENTATION:
+            path = os.path.relpath(filename, os.path.dirname(APP_DIR))
+            return f'{path}:{frame.f_lineno} in {frame.f_code.co_qualname}'
+        frame = frame.f_back
+    return None
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # First in line, `connection.execute_wrapper()` blocks pop the last wrapper when they exit
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_queries)
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Request metrics of this process, by view name and method, rendered in the Prometheus text format.
+
+    Recording a request is a few dict lookups under a lock. Every process keeps its own
+    numbers, each worker has to be scraped (or run a single one, as `start.sh` does).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+        self.durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+        self.sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.n_plus_one = defaultdict(int)
+        # (view, fingerprint): [count, total time, max time, requests running it repeatedly]
+        self.fingerprints = {}
+
+    def observe(self, view, method, status, duration, stats, size=None, repeated=()):
+        key = (view, method if method in METHODS else 'other')
+        with self.lock:
+            self.requests[(*key, str(status))] += 1
+            self.durations[key].observe(duration)
+            self.queries[key].observe(stats.queries)
+            self.db_seconds[key] += stats.db_time
+            if size is not None:
+                self.sizes[key].observe(size)
+            if repeated:
+                self.n_plus_one[key] += 1
+            for sql, (count, total, longest) in stats.fingerprints.items():
+                entry = self.fingerprints.get((view, sql))
+                if entry is None:
+                    if len(self.fingerprints) >= MAX_FINGERPRINTS:
+                        sql = OTHER_FINGERPRINT
+                    entry = self.fingerprints.setdefault((view, sql), [0, 0.0, 0.0, 0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+                if sql in repeated:
+                    entry[3] += 1
+
+    def sql_summary(self, view=None, ordering='total'):
+        """
+        The aggregated fingerprints, of `view` or of all views, heaviest first by `ordering`:
+        `total` time, `count`, `max` time or `n_plus_one` requests.
+        """
+        with self.lock:
+            rows = [
+                {'view': name, 'fingerprint': sql, 'count': count, 'total_ms': round(total * 1000, 3),
+                 'mean_ms': round(total * 1000 / count, 3), 'max_ms': round(longest * 1000, 3),
+                 'n_plus_one': flagged}
+                for (name, sql), (count, total, longest, flagged) in self.fingerprints.items()
+                if view is None or name == view
+            ]
+        field = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms', 'n_plus_one': 'n_plus_one'}[ordering]
+        return sorted(rows, key=lambda row: row[field], reverse=True)
+
+    def render(self):
+        with self.lock:
+            lines = []
+            self.render_counter(lines, 'http_requests_total', "Requests served.",
+                                self.requests, ('view', 'method', 'status'))
+            self.render_histogram(lines, 'http_request_duration_seconds', "Time to the response headers.",
+                                  self.durations)
+            self.render_histogram(lines, 'http_request_db_queries', "SQL queries run per request.", self.queries)
+            self.render_counter(lines, 'http_request_db_seconds_total', "Time spent in SQL queries.",
+                                self.db_seconds, ('view', 'method'))
+            self.render_counter(lines, 'http_request_n_plus_one_total',
+                                "Requests running a query fingerprint more than SQL_N_PLUS_ONE_THRESHOLD times.",
+                                self.n_plus_one, ('view', 'method'))
+            self.render_histogram(lines, 'http_response_size_bytes', "Size of non-streaming response bodies.",
+                                  self.sizes)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def labels(names, values, **extra):
+        pairs = [*zip(names, values), *extra.items()]
+        return ','.join(f'{name}="{escape(value)}"' for name, value in pairs)
+
+    def render_counter(self, lines, name, help_text, values, label_names):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for key, value in sorted(values.items()):
+            lines.append(f'{name}{{{self.labels(label_names, key)}}} {value}')
+
+    def render_histogram(self, lines, name, help_text, histograms):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for key, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip((*histogram.bounds, '+Inf'), histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{self.labels(("view", "method"), key, le=bound)}}} {cumulative}')
+            lines.append(f'{name}_sum{{{self.labels(("view", "method"), key)}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{self.labels(("view", "method"), key)}}} {cumulative}')
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,116 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.apis.asynchronous import authenticate
+from core.metrics import RequestStats, current_request, registry
+from core.profiling import Profile, has_profile_token, is_staff, jwt_user, requested_profile
+
+sql_logger = logging.getLogger('core.sql')
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, SQL queries and time, response size and status of every request
+    into `core.metrics.registry`, by view name, for `/metrics`.
+
+    Queries are also aggregated by fingerprint, and the `core.sql` log gets a line for every
+    fingerprint a request runs more than `SQL_N_PLUS_ONE_THRESHOLD` times (an N+1) or that
+    takes `SQL_SLOW_QUERY_MS` or more.
+
+    Sync and async capable, so it adds no thread hop in front of async views under ASGI.
+    Streaming responses are timed up to their headers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.n_plus_one_threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+        self.slow_query_seconds = settings.SQL_SLOW_QUERY_MS / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def record(self, request, response, duration, stats):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unmatched'
+        if view == 'metrics':
+            return
+        size = None if response.streaming else len(response.content)
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        registry.observe(view, request.method, response.status_code, duration, stats, size, repeated)
+        for sql in repeated:
+            self.log_query(logging.WARNING, 'n+1', request, view, sql, stats.fingerprints[sql])
+        for sql in stats.slow(self.slow_query_seconds):
+            self.log_query(logging.INFO, 'slow', request, view, sql, stats.fingerprints[sql])
+
+    @staticmethod
+    def log_query(level, kind, request, view, sql, entry):
+        count, total, longest = entry
+        sql_logger.log(level, '%s view=%s method=%s path=%s count=%d total_ms=%.2f max_ms=%.2f sql=%s',
+                       kind, view, request.method, request.path, count, total * 1000, longest * 1000, sql)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the `/api/` requests asking for it with `?_profile=cpu` (stack samples, as a
+    flamegraph input) or `?_profile=sql` (the timeline of their queries), from staff users
+    or holders of `PROFILE_TOKEN` sent as `X-Profile-Token`. Any other request only pays
+    a substring test, and the middleware is not installed at all when `PROFILING` is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        kind = requested_profile(request)
+        if kind is None or not (has_profile_token(request) or is_staff(request.user) or is_staff(jwt_user(request))):
+            return self.get_response(request)
+        with Profile(request, kind) as profile:
+            profile.response = self.get_response(request)
+        return profile.result()
+
+    async def __acall__(self, request):
+        kind = requested_profile(request)
+        if kind is None or not (
+            has_profile_token(request) or is_staff(await request.auser()) or is_staff(await authenticate(request))
+        ):
+            return await self.get_response(request)
+        with Profile(request, kind) as profile:
+            profile.response = await self.get_response(request)
+        return profile.result()
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_visibility(apps, schema_editor):
+    Task = apps.get_model('core', 'Task')
+    TaskAssignment = apps.get_model('core', 'TaskAssignment')
+    TaskVisibility = apps.get_model('core', 'TaskVisibility')
+
+    TaskVisibility.objects.bulk_create(
+        (TaskVisibility(user_id=user_id, task_id=task_id, reason='creator')
+         for user_id, task_id in Task.objects.values_list('created_by_id', 'id').iterator()),
+        batch_size=5000, ignore_conflicts=True
+    )
+    TaskVisibility.objects.bulk_create(
+        (TaskVisibility(user_id=user_id, task_id=task_id, reason='assignee')
+         for user_id, task_id in TaskAssignment.objects.values_list('user_id', 'task_id').iterator()),
+        batch_size=5000, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_task_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('creator', 'Creator'), ('assignee', 'Assignee')], max_length=10)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='core.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_visibility', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'task', 'reason')},
+            },
+        ),
+        migrations.RunPython(backfill_visibility, migrations.RunPython.noop),
+    ]
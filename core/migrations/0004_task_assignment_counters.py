@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:27
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Task = apps.get_model('core', 'Task')
+    TaskAssignment = apps.get_model('core', 'TaskAssignment')
+
+    assignments = TaskAssignment.objects.filter(task=OuterRef('pk')).order_by().values('task')
+    total = assignments.annotate(count=Count('id')).values('count')
+    completed = assignments.filter(status='completed').annotate(count=Count('id')).values('count')
+    Task.objects.update(
+        assignments_total=Coalesce(Subquery(total), 0),
+        assignments_completed=Coalesce(Subquery(completed), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_task_visibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='assignments_completed',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='assignments_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_task_assignment_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['task_type', '-created_at', '-id'], name='task_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='task_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['completed_at'], name='task_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['user', 'status'], name='assignment_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamroles',
+            index=models.Index(fields=['user', 'role'], name='teamroles_user_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teamroles',
+            index=models.Index(fields=['team', 'user'], name='teamroles_team_user_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='task_search_vector_idx')
+
+
+def add_search_index(apps, schema_editor):
+    # GIN indexes and tsvector only exist on PostgreSQL, other databases search without them.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Task = apps.get_model('core', 'Task')
+    schema_editor.add_index(Task, SEARCH_INDEX)
+    Task.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english') +
+        SearchVector('description', weight='B', config='english')
+    ))
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('core', 'Task'), SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='task', index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_index, remove_search_index),
+            ],
+        ),
+    ]
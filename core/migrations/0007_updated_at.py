@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:52
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    apps.get_model('core', 'Task').objects.update(updated_at=F('created_at'))
+    apps.get_model('core', 'Team').objects.update(updated_at=F('created_at'))
+    apps.get_model('core', 'TaskAssignment').objects.update(updated_at=F('assigned_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_task_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='taskassignment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUSES = ('pending', 'in_progress', 'completed')
+
+
+def backfill_team_task_stats(apps, schema_editor):
+    TeamRoles = apps.get_model('core', 'TeamRoles')
+    TaskAssignment = apps.get_model('core', 'TaskAssignment')
+    TeamTaskStats = apps.get_model('core', 'TeamTaskStats')
+    counts = {
+        (team_id, user_id, status): 0
+        for team_id, user_id in TeamRoles.objects.values_list('team_id', 'user_id').distinct()
+        for status in STATUSES
+    }
+    counts.update({
+        (team_id, user_id, status): count for team_id, user_id, status, count in
+        TaskAssignment.objects.filter(user__teamroles__isnull=False).order_by()
+        .values_list('user__teamroles__team', 'user', 'status').annotate(count=Count('id', distinct=True))
+    })
+    TeamTaskStats.objects.bulk_create([
+        TeamTaskStats(team_id=team_id, user_id=user_id, status=status, count=count)
+        for (team_id, user_id, status), count in counts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamTaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to='core.team')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'status'], name='teamstats_user_status_idx')],
+                'unique_together': {('team', 'user', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_team_task_stats, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from .sync import *
 from .task import *
 from .team import *
 from .user import *
\ No newline at end of file
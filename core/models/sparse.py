@@ -0,0 +1,46 @@
+from rest_framework.exceptions import ValidationError
+
+
+def split_param(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin for sparse fieldsets.
+
+    - `?fields=id,name` renders only the listed fields
+    - `?expand=assigned_users` adds a nested field (one of `expandable_fields`)
+      to a `?fields=` selection, nested fields are left out otherwise
+
+    Without either parameter every field is rendered, as before. Unknown names are a 400.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, query_params):
+        """
+        Returns the field names requested by `query_params`, in declaration order,
+        or None when all of them should be rendered.
+        """
+        fields = split_param(query_params.get('fields'))
+        expand = split_param(query_params.get('expand'))
+        errors = {}
+        for param, names, allowed in (('fields', fields, cls.Meta.fields), ('expand', expand, cls.expandable_fields)):
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                errors[param] = [f'Unknown field(s): {", ".join(unknown)}, choose from: {", ".join(allowed)}.']
+        if errors:
+            raise ValidationError(errors)
+        if not fields:
+            return None
+        return [
+            name for name in cls.Meta.fields
+            if name in fields or (name in cls.expandable_fields and name in expand)
+        ]
@@ -0,0 +1,123 @@
+from functools import partial
+
+from django.db import connection, models, transaction
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils.translation import gettext_lazy as _
+
+from ..user import User
+
+BIGINT_MAX = 2 ** 63 - 1
+
+
+class Change(models.Model):
+    """
+    Append-only change feed behind delta sync and the event streams.
+
+    One row per change per user it is relevant to, so a client catching up
+    reads only its own rows after its last seen `id` (the sequence), however
+    large the dataset is. Rows only say what changed, the current state (or
+    a tombstone when the object is gone or no longer visible) is read at sync time.
+
+    Ids are allocated when rows are inserted, not when they commit: a transaction
+    still in flight may commit rows with lower ids than some already read. Readers
+    therefore never go past the `horizon`, below which every change is committed.
+    """
+    id = models.BigAutoField(primary_key=True)
+    # No constraint: deleting a user cascades to rows (assignments, roles) that record their own removal.
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+
+    class Kinds(models.TextChoices):
+        TASK = 'task', _('Task')
+        ASSIGNMENT = 'assignment', _('Assignment')
+        TEAM_ROLE = 'team_role', _('Team role')
+
+    kind = models.CharField(max_length=20, choices=Kinds)
+    object_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='change_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.user_id} - {self.kind} {self.object_id}"
+
+    @classmethod
+    def record(cls, kind, pairs):
+        """
+        Append a `kind` change of `object_id` to the feed of `user_id`, for each `(user_id, object_id)` pair,
+        and push them to the users' event streams once committed.
+        """
+        pairs = set(pairs)
+        if not pairs:
+            return
+        with transaction.atomic(savepoint=False):
+            cls.hold_horizon()
+            changes = cls.objects.bulk_create([
+                cls(user_id=user_id, kind=kind, object_id=object_id) for user_id, object_id in pairs
+            ])
+        from core.events import publish_changes
+        transaction.on_commit(partial(publish_changes, [
+            (change.id, change.user_id, change.kind, change.object_id) for change in changes
+        ]))
+
+    @classmethod
+    def hold_horizon(cls):
+        """
+        Keeps the horizon below the ids the current transaction is about to allocate, until it ends.
+
+        On PostgreSQL, takes a shared transaction-level advisory lock keyed by the last id handed out
+        so far, which every session can see in `pg_locks`. It is released on commit or rollback (of
+        the savepoint too), even if the process dies. SQLite serializes write transactions, so ids
+        commit in order there and nothing needs holding.
+        """
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT pg_advisory_xact_lock_shared(last_value) FROM {cls.sequence_name()}')
+
+    @classmethod
+    def sequence_name(cls):
+        if not hasattr(cls, '_sequence_name'):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [cls._meta.db_table, 'id'])
+                cls._sequence_name = cursor.fetchone()[0]
+        return cls._sequence_name
+
+    @classmethod
+    def lowest_in_flight(cls):
+        """
+        An expression of the lowest key held by `hold_horizon`, NULL when no transaction recording
+        changes is in flight, or None when ids always commit in order.
+        """
+        if connection.vendor != 'postgresql':
+            return None
+        # A bigint advisory key is split into `classid` (high half) and `objid` (low half)
+        return RawSQL(
+            "SELECT min((classid::bigint << 32) | objid::bigint) FROM pg_locks "
+            "WHERE locktype = 'advisory' AND objsubid = 1 "
+            "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())",
+            [], output_field=models.BigIntegerField(),
+        )
+
+    @classmethod
+    def committed(cls):
+        """
+        The changes below the horizon, under which every change is committed. Ids are strictly below
+        the lowest key held, as a sequence never used yet hands out its `last_value` first.
+        """
+        in_flight = cls.lowest_in_flight()
+        if in_flight is None:
+            return cls.objects.all()
+        return cls.objects.filter(id__lt=Coalesce(in_flight, models.Value(BIGINT_MAX)))
+
+    @classmethod
+    def horizon(cls):
+        """
+        The highest id up to which every change is committed: the latest one, unless a transaction
+        recording changes is still in flight. Serving only ids up to it never skips a change that
+        commits late, so it is also the token to sync from after a full fetch.
+        """
+        return cls.committed().aggregate(head=models.Max('id'))['head'] or 0
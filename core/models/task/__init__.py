@@ -1,3 +1,8 @@
-from .model import Task, TaskAssignment
+from .deferred import coalesce_status_updates, defer_status_update
+from .importer import TaskImporter
+from .model import Task, TaskAssignment, TaskVisibility, TeamTaskStats
 from .permission import IsManagerOrOwnerOrSelf
-from .serializer import TaskSerializer, TaskAssignmentSerializer
\ No newline at end of file
+from .serializer import (
+    TaskSerializer, TaskAssignmentSerializer, TaskAssignmentBulkSerializer,
+    TaskAssignmentStatusSerializer
+)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from django.db import transaction
+
+_state = threading.local()
+
+
+def recount_tasks(task_ids):
+    """
+    Re-derive counters and status for `task_ids` in a single UPDATE, and record those that changed.
+    """
+    if not task_ids:
+        return
+    from .model import Task
+    Task.record_changes(Task.recount_assignments(Task.objects.filter(id__in=task_ids)).values('pk'))
+
+
+def _pending(alias):
+    """
+    Task IDs deferred in this thread's transaction on `alias`, recounted when it commits.
+    """
+    pending = getattr(_state, 'pending', None)
+    if pending is None:
+        pending = _state.pending = {}
+    return pending.setdefault(alias, set())
+
+
+def _flush(alias):
+    task_ids = _pending(alias)
+    if task_ids:
+        _state.pending[alias] = set()
+        recount_tasks(task_ids)
+
+
+def status_updates_deferred():
+    """
+    Whether assignment writes should only record their task for a later recount.
+    """
+    return getattr(_state, 'scope_ids', None) is not None or transaction.get_connection().in_atomic_block
+
+
+def defer_status_update(task_id):
+    """
+    Record that `task_id` needs its status recomputed at the end of the current scope or transaction.
+    """
+    scope_ids = getattr(_state, 'scope_ids', None)
+    if scope_ids is not None:
+        scope_ids.add(task_id)
+        return
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        recount_tasks({task_id})
+        return
+
+    _pending(connection.alias).add(task_id)
+    # Django drops the callbacks of rolled back savepoints, so every call registers one: whichever
+    # runs first recounts the whole set, the others find it empty. IDs left over by a rolled back
+    # transaction are recounted with the next one, which is harmless as recounts start from scratch.
+    transaction.on_commit(partial(_flush, connection.alias), using=connection.alias)
+
+
+@contextmanager
+def coalesce_status_updates():
+    """
+    Recompute the status of every task whose assignments change inside the block
+    exactly once, when the block exits (or when the enclosing transaction commits).
+
+    Useful for scripts and admin forms that save many assignments in a loop:
+
+        with coalesce_status_updates():
+            for assignment in assignments:
+                assignment.status = TaskStatus.COMPLETED
+                assignment.save()
+    """
+    if getattr(_state, 'scope_ids', None) is not None:
+        # Nested scope, the outermost one flushes.
+        yield
+        return
+
+    _state.scope_ids = set()
+    try:
+        yield
+    finally:
+        task_ids, _state.scope_ids = _state.scope_ids, None
+        if task_ids:
+            # Runs immediately in autocommit mode, after commit otherwise.
+            transaction.on_commit(lambda: recount_tasks(task_ids))
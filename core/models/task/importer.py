@@ -0,0 +1,113 @@
+import json
+
+from django.db import transaction
+
+from ..sync import Change
+from ..user import User
+from .model import Task, TaskAssignment, TaskStatus, TaskVisibility, TeamTaskStats
+from .permission import IsManagerOrOwnerOrSelf
+from .serializer import TaskSerializer
+
+
+class TaskImporter:
+    """
+    Imports tasks from NDJSON, one task object per line, in fixed-size batches.
+
+    Each line is validated with `TaskSerializer` and may carry an optional
+    `"assignees": ["username", ...]` list. Only one batch is held in memory
+    at a time, so the input can be arbitrarily large.
+    """
+
+    def __init__(self, created_by, batch_size=500, check_permissions=True):
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self.check_permissions = check_permissions
+        self.created = 0
+        self.errors = []
+        self._batch = []
+
+    def run(self, lines):
+        """
+        Consumes an iterable of NDJSON lines (bytes or str) and returns the import report.
+        """
+        for line_number, line in enumerate(lines, start=1):
+            self.add_line(line_number, line)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+        self.flush()
+        self.errors.sort(key=lambda error: error['line'])
+        return {'created': self.created, 'errors': self.errors}
+
+    def add_line(self, line_number, line):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            return
+        try:
+            item = json.loads(line)
+        except ValueError as exc:
+            self.errors.append({'line': line_number, 'errors': {'non_field_errors': [f"Invalid JSON: {exc}"]}})
+            return
+        if not isinstance(item, dict):
+            self.errors.append({'line': line_number, 'errors': {'non_field_errors': ["Expected a JSON object."]}})
+            return
+
+        assignees = item.pop('assignees', None) or []
+        if not isinstance(assignees, list) or not all(isinstance(name, str) for name in assignees):
+            self.errors.append({'line': line_number, 'errors': {'assignees': ["Expected a list of usernames."]}})
+            return
+
+        serializer = TaskSerializer(data=item)
+        if not serializer.is_valid():
+            self.errors.append({'line': line_number, 'errors': serializer.errors})
+            return
+        self._batch.append((line_number, serializer.validated_data, list(dict.fromkeys(assignees))))
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+
+        usernames = {name for _, _, assignees in batch for name in assignees}
+        user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+        if self.check_permissions and user_ids:
+            allowed_ids = IsManagerOrOwnerOrSelf.manageable_user_ids(self.created_by, list(user_ids.values()))
+        else:
+            allowed_ids = set(user_ids.values())
+
+        tasks = []
+        task_assignees = []
+        for line_number, data, assignees in batch:
+            unknown = [name for name in assignees if name not in user_ids]
+            forbidden = [name for name in assignees if name in user_ids and user_ids[name] not in allowed_ids]
+            if unknown or forbidden:
+                messages = [f"Unknown user: {name}" for name in unknown]
+                messages += [f"Not allowed to assign: {name}" for name in forbidden]
+                self.errors.append({'line': line_number, 'errors': {'assignees': messages}})
+                continue
+            # New assignments start PENDING, so the counters and status are known upfront
+            tasks.append(Task(
+                **data, created_by=self.created_by,
+                assignments_total=len(assignees),
+                status=TaskStatus.IN_PROGRESS if assignees else TaskStatus.PENDING,
+            ))
+            task_assignees.append([user_ids[name] for name in assignees])
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            Task.update_search_vectors(Task.objects.filter(id__in=[task.id for task in tasks]))
+            assignments = TaskAssignment.objects.bulk_create([
+                TaskAssignment(task=task, user_id=user_id)
+                for task, assignee_ids in zip(tasks, task_assignees)
+                for user_id in assignee_ids
+            ])
+            TaskVisibility.grant(TaskVisibility.Reasons.CREATOR, [(self.created_by.id, task.id) for task in tasks])
+            TaskVisibility.grant(TaskVisibility.Reasons.ASSIGNEE, [
+                (user_id, task.id)
+                for task, assignee_ids in zip(tasks, task_assignees)
+                for user_id in assignee_ids
+            ])
+            TeamTaskStats.shift([(assignment.user_id, TaskStatus.PENDING, 1) for assignment in assignments])
+            Task.record_changes([task.id for task in tasks])
+            Change.record(Change.Kinds.ASSIGNMENT, [(assignment.user_id, assignment.id) for assignment in assignments])
+        self.created += len(tasks)
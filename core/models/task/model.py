@@ -1,10 +1,18 @@
+from collections import defaultdict
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Count, Q
-from django.utils.translation import gettext_lazy as _
+from django.db import connections, models, transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Now
+from django.db.models.lookups import Exact, GreaterThan
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
+from ..sync import Change
 from ..user import User
+from .deferred import defer_status_update, status_updates_deferred
 
 
 class TaskStatus(models.TextChoices):
@@ -17,6 +25,7 @@ class Task(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     assigned_users = models.ManyToManyField(User, through='TaskAssignment', related_name='tasks')
@@ -30,6 +39,19 @@ class Task(models.Model):
     task_type = models.CharField(max_length=10, choices=TaskTypes, default=TaskTypes.OTHER)
     task_type_other = models.CharField(max_length=50, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination walks tasks newest first on (created_at, id).
+            models.Index(fields=['-created_at', '-id'], name='task_created_id_idx'),
+            # List filters, each followed by the default keyset so a filtered page is still a range scan.
+            models.Index(fields=['status', '-created_at', '-id'], name='task_status_created_idx'),
+            models.Index(fields=['task_type', '-created_at', '-id'], name='task_type_created_idx'),
+            models.Index(fields=['created_by', '-created_at', '-id'], name='task_creator_created_idx'),
+            models.Index(fields=['completed_at'], name='task_completed_idx'),
+            # Only created on PostgreSQL, see migration 0006.
+            GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -38,28 +60,146 @@ class Task(models.Model):
         choices=TaskStatus,
         default=TaskStatus.PENDING
     )
+    assignments_total = models.PositiveIntegerField(default=0, editable=False)
+    assignments_completed = models.PositiveIntegerField(default=0, editable=False)
+    # Full-text index of name (weight A) and description (weight B), only maintained on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_config = 'english'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._indexed_text = instance.indexed_text()
+        return instance
+
+    def indexed_text(self):
+        # From __dict__, so deferred fields are not fetched
+        return self.__dict__.get('name'), self.__dict__.get('description')
+
+    def save(self, *args, **kwargs):
+        """
+        Reindexes the task for search when its name or description changed since it was loaded.
+        """
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            reindex = self.indexed_text() != getattr(self, '_indexed_text', None)
+        else:
+            reindex = bool({'name', 'description'} & set(update_fields))
+        if reindex:
+            Task.update_search_vectors(Task.objects.filter(pk=self.pk))
+        self._indexed_text = self.indexed_text()
 
     def update_status(self):
         """
-        Compute task status dynamically:
-        - If all `TaskAssignment` statuses are COMPLETED, the Task is COMPLETED.
-        - If at least one is IN_PROGRESS, the Task is IN_PROGRESS.
-        - Otherwise, the Task remains PENDING.
+        Recount this task's assignments and re-derive its status from scratch.
+
+        Normal writes keep the counters up to date incrementally, this is only
+        needed to repair drift.
+        """
+        Task.recount_assignments(Task.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['assignments_total', 'assignments_completed', 'status', 'completed_at'])
+
+    @staticmethod
+    def status_from_counters(total, completed):
+        """
+        Build update expressions deriving `status` and `completed_at` from the assignment counters:
+        - If there are no assignments, the Task is PENDING.
+        - If every assignment is COMPLETED, the Task is COMPLETED.
+        - Otherwise, the Task is IN_PROGRESS.
+        """
+        is_completed = GreaterThan(total, 0) & Exact(total, completed)
+        return {
+            'status': Case(
+                When(Exact(total, 0), then=Value(TaskStatus.PENDING)),
+                When(is_completed, then=Value(TaskStatus.COMPLETED)),
+                default=Value(TaskStatus.IN_PROGRESS),
+            ),
+            'completed_at': Case(
+                When(is_completed, then=Coalesce(F('completed_at'), Now())),
+                default=None,
+            ),
+        }
+
+    @classmethod
+    def apply_assignment_delta(cls, task_id, total=0, completed=0):
         """
-        task_statuses = self.assignments.aggregate(
-            total=Count('id'),
-            completed=Count('id', filter=Q(status=TaskStatus.COMPLETED))
+        Atomically shift a task's assignment counters and re-derive its status in a single UPDATE.
+        """
+        new_total = F('assignments_total') + total
+        new_completed = F('assignments_completed') + completed
+        cls.objects.filter(pk=task_id).update(
+            updated_at=timezone.now(),
+            assignments_total=new_total,
+            assignments_completed=new_completed,
+            **cls.status_from_counters(new_total, new_completed)
         )
+        cls.record_changes([task_id])
 
-        if task_statuses["total"] == 0:
-            self.status = TaskStatus.PENDING  # No assignments exist yet
-        elif task_statuses["total"] == task_statuses["completed"]:
-            self.status = TaskStatus.COMPLETED
-            self.completed_at = timezone.now()  # Mark as completed
-        else:
-            self.status = TaskStatus.IN_PROGRESS
+    @classmethod
+    def record_changes(cls, task_ids):
+        """
+        Append `task_ids` to the sync feed of every user who can see them.
+        """
+        Change.record(Change.Kinds.TASK, TaskVisibility.objects.filter(task_id__in=task_ids)
+                      .values_list('user_id', 'task_id'))
 
-        self.save(update_fields=['status', 'completed_at'])
+    @classmethod
+    def recount_assignments(cls, queryset):
+        """
+        Recompute the assignment counters and status of the tasks in `queryset` whose counters
+        are off from `TaskAssignment` in a single UPDATE; the others keep their `updated_at`, and
+        so their ETags. Returns the tasks updated, matched on their new `updated_at`.
+        """
+        assignments = TaskAssignment.objects.filter(task=OuterRef('pk')).order_by().values('task')
+        total = Coalesce(Subquery(assignments.annotate(count=Count('id')).values('count')), 0)
+        completed = Coalesce(Subquery(assignments.filter(status=TaskStatus.COMPLETED)
+                                      .annotate(count=Count('id')).values('count')), 0)
+        now = timezone.now()
+        updated = queryset.filter(~Q(assignments_total=total) | ~Q(assignments_completed=completed)).update(
+            updated_at=now,
+            assignments_total=total,
+            assignments_completed=completed,
+            **cls.status_from_counters(total, completed)
+        )
+        return queryset.filter(updated_at=now) if updated else queryset.none()
+
+    @classmethod
+    def update_search_vectors(cls, queryset):
+        """
+        Recompute `search_vector` for every task in `queryset` in a single UPDATE.
+        A no-op off PostgreSQL, where `search` does not use it.
+        """
+        if connections[queryset.db].vendor != 'postgresql':
+            return 0
+        return queryset.update(search_vector=(
+            SearchVector('name', weight='A', config=cls.search_config) +
+            SearchVector('description', weight='B', config=cls.search_config)
+        ))
+
+    @classmethod
+    def search(cls, queryset, text):
+        """
+        Narrow `queryset` to the tasks matching `text`, annotated with a `search_rank` (higher is better).
+
+        On PostgreSQL this is a web-search style query against the GIN indexed `search_vector`.
+        Elsewhere every word must appear in the name or description, and name matches rank first.
+        """
+        if connections[queryset.db].vendor == 'postgresql':
+            query = SearchQuery(text, search_type='websearch', config=cls.search_config)
+            # `ts_rank` is a float4, which does not survive the trip through a JSON cursor: compared
+            # to the float read back, equal ranks would not be equal. A float8 round-trips exactly.
+            rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+            return queryset.filter(search_vector=query).annotate(search_rank=rank)
+
+        in_name = Q()
+        for word in text.split():
+            queryset = queryset.filter(Q(name__icontains=word) | Q(description__icontains=word))
+            in_name &= Q(name__icontains=word)
+        return queryset.annotate(search_rank=Case(
+            When(in_name, then=Value(1.0)), default=Value(0.0), output_field=FloatField()
+        ))
 
 
 class TaskAssignment(models.Model):
@@ -67,16 +207,207 @@ class TaskAssignment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='assignments')
     status = models.CharField(max_length=50, choices=TaskStatus, default=TaskStatus.PENDING)
     assigned_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'task')
+        indexes = [
+            models.Index(fields=['user', '-assigned_at', '-id'], name='assignment_user_assigned_idx'),
+            # `?assignee=&assignment_status=` on task lists.
+            models.Index(fields=['user', 'status'], name='assignment_user_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.task.name} - {self.status}"
 
     def save(self, *args, **kwargs):
         """
-        Automatically update Task completion time when all users complete their tasks.
+        Keep the task's assignment counters (and so its status) and the team stats in step with this assignment,
+        moving it from its previous task's counters when the assignment moved.
+
+        Inside a transaction or a `coalesce_status_updates()` block the task is only
+        recorded and recounted once at the end, instead of once per save.
         """
-        super().save(*args, **kwargs)
-        self.task.update_status()  # Automatically update task's status
\ No newline at end of file
+        deferred = status_updates_deferred()
+        with transaction.atomic(savepoint=False):
+            previous = None
+            if not self._state.adding:
+                previous = (TaskAssignment.objects.select_for_update()
+                            .filter(pk=self.pk).values_list('task_id', 'user_id', 'status').first())
+            # Read by the post_save handler, which moves the task's visibility along
+            self._previous_assignment = previous
+            super().save(*args, **kwargs)
+
+            deltas = [(self.user_id, self.status, 1)]
+            if previous is not None:
+                deltas.append((previous[1], previous[2], -1))
+            TeamTaskStats.shift(deltas)
+
+            moved = previous is not None and previous[0] != self.task_id
+            if deferred:
+                defer_status_update(self.task_id)
+                if moved:
+                    defer_status_update(previous[0])
+                return
+            is_completed = self.status == TaskStatus.COMPLETED
+            was_completed = previous is not None and previous[2] == TaskStatus.COMPLETED
+            if previous is None:
+                Task.apply_assignment_delta(self.task_id, total=1, completed=int(is_completed))
+            elif moved:
+                Task.apply_assignment_delta(previous[0], total=-1, completed=-int(was_completed))
+                Task.apply_assignment_delta(self.task_id, total=1, completed=int(is_completed))
+            elif was_completed != is_completed:
+                Task.apply_assignment_delta(self.task_id, completed=1 if is_completed else -1)
+
+
+class TaskVisibility(models.Model):
+    """
+    Denormalized "who can see which task" index.
+
+    One row per reason a user can see a task, so listing a user's tasks is a
+    single lookup on `(user, task)` instead of an OR across `Task` and
+    `TaskAssignment` followed by a DISTINCT.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_visibility')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='visibility')
+
+    class Reasons(models.TextChoices):
+        CREATOR = 'creator', _('Creator')
+        ASSIGNEE = 'assignee', _('Assignee')
+
+    reason = models.CharField(max_length=10, choices=Reasons)
+
+    class Meta:
+        unique_together = ('user', 'task', 'reason')
+
+    def __str__(self):
+        return f"{self.user_id} - {self.task_id} - {self.reason}"
+
+    @classmethod
+    def grant(cls, reason, pairs):
+        """
+        Record that each `(user_id, task_id)` pair is visible for `reason`.
+        """
+        cls.objects.bulk_create(
+            [cls(user_id=user_id, task_id=task_id, reason=reason) for user_id, task_id in pairs],
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def revoke(cls, reason, pairs):
+        """
+        Drop the `reason` rows for each `(user_id, task_id)` pair.
+        """
+        condition = Q()
+        for user_id, task_id in pairs:
+            condition |= Q(user_id=user_id, task_id=task_id)
+        if condition:
+            cls.objects.filter(condition, reason=reason).delete()
+
+
+class TeamTaskStats(models.Model):
+    """
+    Denormalized count of the assignments of every team member by status, behind the team dashboard.
+
+    One row per `(team, member, status)`, zeros included, kept in step by assignment
+    and membership writes in their own transaction, so reading a team's stats costs
+    the same however many tasks it has. `manage.py rebuild_team_stats` recomputes it.
+    """
+    team = models.ForeignKey("Team", on_delete=models.CASCADE, related_name='task_stats')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=TaskStatus)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('team', 'user', 'status')
+        indexes = [
+            # `shift` updates a user's rows in all their teams at once.
+            models.Index(fields=['user', 'status'], name='teamstats_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} - {self.user_id} - {self.status}: {self.count}"
+
+    @classmethod
+    def shift(cls, deltas):
+        """
+        Apply `(user_id, status, delta)` assignment count changes to every team of each user,
+        in one UPDATE per distinct delta. A user's rows exist exactly for the teams they are in.
+        """
+        totals = defaultdict(int)
+        for user_id, status, delta in deltas:
+            totals[user_id, status] += delta
+        conditions = defaultdict(Q)
+        for (user_id, status), delta in totals.items():
+            if delta:
+                conditions[delta] |= Q(user_id=user_id, status=status)
+        for delta, condition in conditions.items():
+            cls.objects.filter(condition).update(count=F('count') + delta)
+
+    @classmethod
+    def uncount(cls, assignments):
+        """
+        Shift the `assignments` queryset out of the counts in one call, by their stored status.
+        They are locked first, so that no status change slips in before they are deleted.
+        """
+        list(assignments.select_for_update().values_list('pk', flat=True))
+        cls.shift([
+            (row['user_id'], row['status'], -row['count'])
+            for row in assignments.order_by().values('user_id', 'status').annotate(count=Count('id'))
+        ])
+
+    @classmethod
+    def sync_members(cls, pairs):
+        """
+        Start counting each `(team_id, user_id)` pair that became a membership,
+        and drop the rows of those that no longer are.
+        """
+        with transaction.atomic():
+            for team_id, user_id in set(pairs):
+                if not User.objects.filter(pk=user_id, teamroles__team=team_id).exists():
+                    cls.objects.filter(team=team_id, user=user_id).delete()
+                elif not cls.objects.filter(team=team_id, user=user_id).exists():
+                    counts = dict(TaskAssignment.objects.filter(user=user_id).order_by()
+                                  .values_list('status').annotate(count=Count('id')))
+                    cls.objects.bulk_create([
+                        cls(team_id=team_id, user_id=user_id, status=status, count=counts.get(status, 0))
+                        for status in TaskStatus.values
+                    ], ignore_conflicts=True)
+
+    @classmethod
+    def expected(cls, team_ids=None):
+        """
+        Returns `{(team_id, user_id, status): count}` computed from scratch for `team_ids` (all teams when None).
+        """
+        # A single filter() per queryset, so values_list() reads the team from the same join
+        lookup, value = ('teamroles__isnull', False) if team_ids is None else ('teamroles__team__in', team_ids)
+        members = User.objects.filter(**{lookup: value})
+        assignments = TaskAssignment.objects.filter(**{f'user__{lookup}': value})
+
+        counts = {
+            (team_id, user_id, status): 0
+            for team_id, user_id in members.values_list('teamroles__team', 'id').distinct()
+            for status in TaskStatus.values
+        }
+        # A user holding two roles in a team still counts their assignments once
+        counts.update({
+            (team_id, user_id, status): count for team_id, user_id, status, count in
+            assignments.order_by().values_list('user__teamroles__team', 'user', 'status')
+            .annotate(count=Count('id', distinct=True))
+        })
+        return counts
+
+    @classmethod
+    def rebuild(cls, team_ids=None):
+        """
+        Replace the rows of `team_ids` (all teams when None) with freshly computed ones.
+        Returns the number of rows written.
+        """
+        counts = cls.expected(team_ids)
+        with transaction.atomic():
+            (cls.objects.all() if team_ids is None else cls.objects.filter(team__in=team_ids)).delete()
+            cls.objects.bulk_create([
+                cls(team_id=team_id, user_id=user_id, status=status, count=count)
+                for (team_id, user_id, status), count in counts.items()
+            ], batch_size=1000)
+        return len(counts)
@@ -1,17 +1,30 @@
 from rest_framework.permissions import BasePermission
-from ..team import Team, TeamRoles
+from ..team.cache import manageable_user_ids
 
 class IsManagerOrOwnerOrSelf(BasePermission):
     def has_permission(self, request, view):
+        action = getattr(view, 'action', None)
+        if action in ('bulk_assign', 'bulk_update_status', 'import_tasks'):
+            # Bulk actions check every item themselves
+            return bool(request.user and request.user.is_authenticated)
+
         if request.method in ['POST', 'PUT', 'PATCH']:
             task_user_id = request.data.get('user_id')
             if task_user_id == request.user.id:
                 return True
 
-            team_ids = Team.objects.filter(owner=request.user).values_list('id', flat=True)
-            manager_team_ids = TeamRoles.objects.filter(user=request.user, role=TeamRoles.Roles.MANAGER).values_list('team_id', flat=True)
-            allowed_team_ids = set(team_ids).union(set(manager_team_ids))
+            try:
+                task_user_id = int(task_user_id)
+            except (TypeError, ValueError):
+                return False
+            return task_user_id in manageable_user_ids(request.user.id, request)
+        return True
 
-            user_team_ids = TeamRoles.objects.filter(user_id=task_user_id).values_list('team_id', flat=True)
-            return any(team_id in allowed_team_ids for team_id in user_team_ids)
-        return True
\ No newline at end of file
+    @staticmethod
+    def manageable_user_ids(user, user_ids, request=None):
+        """
+        Returns the subset of `user_ids` that `user` may assign tasks to:
+        themselves, plus members of any team they own or manage.
+        """
+        manageable = manageable_user_ids(user.id, request)
+        return {user_id for user_id in user_ids if user_id == user.id or user_id in manageable}
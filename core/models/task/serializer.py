@@ -1,10 +1,12 @@
 from rest_framework import serializers
-from .model import Task, TaskAssignment
+from .model import Task, TaskAssignment, TaskStatus, TaskVisibility
+from ..sparse import SparseFieldsetMixin
 from ..user import UserSerializer
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     assigned_users = UserSerializer(many=True, read_only=True)
+    expandable_fields = ('assigned_users',)
 
     class Meta:
         model = Task
@@ -19,11 +21,37 @@ class TaskSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        if data['task_type'] == 'other' and not data.get('task_type_other'):
+        # Fall back to the instance (partial updates) or the model default (omitted field)
+        task_type = data.get('task_type', getattr(self.instance, 'task_type', Task.TaskTypes.OTHER))
+        task_type_other = data.get('task_type_other', getattr(self.instance, 'task_type_other', None))
+        if task_type == 'other' and not task_type_other:
             raise serializers.ValidationError({"task_type_other": "This field is required."})
         return data
 
-class TaskAssignmentSerializer(serializers.ModelSerializer):
+class VisibleTaskField(serializers.PrimaryKeyRelatedField):
+    """
+    A task the requesting user can see, so nobody assigns anyone to (and so reveals) a task hidden from them.
+    Needs the request in the serializer context.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        user_id = request.user.id if request is not None else None
+        return Task.objects.filter(id__in=TaskVisibility.objects.filter(user=user_id).values('task_id'))
+
+
+class TaskAssignmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    task = VisibleTaskField()
+
     class Meta:
         model = TaskAssignment
-        fields = ['id', 'user', 'task', 'status', 'assigned_at']
\ No newline at end of file
+        fields = ['id', 'user', 'task', 'status', 'assigned_at']
+
+class TaskAssignmentBulkSerializer(serializers.Serializer):
+    task = VisibleTaskField()
+    users = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+
+
+class TaskAssignmentStatusSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=TaskStatus.choices)
@@ -0,0 +1,83 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from ..sync import Change
+from .deferred import defer_status_update
+from .model import Task, TaskAssignment, TaskVisibility, TeamTaskStats
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    """
+    The creator of a task can always see it.
+    """
+    if created:
+        TaskVisibility.grant(TaskVisibility.Reasons.CREATOR, [(instance.created_by_id, instance.pk)])
+    Task.record_changes([instance.pk])
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance, **kwargs):
+    """
+    Record the deletion while the visibility rows still say who saw the task, and handle its
+    assignments in bulk: the per-assignment handlers skip those of a task being deleted.
+    Their visibility rows go with the task, and there is nothing left to recount.
+    """
+    assignments = TaskAssignment.objects.filter(task=instance)
+    TeamTaskStats.uncount(assignments)
+    Task.record_changes([instance.pk])
+    Change.record(Change.Kinds.ASSIGNMENT, assignments.values_list('user_id', 'pk'))
+
+
+def deleting_task(origin):
+    """
+    Whether a delete started from `origin` is deleting tasks, cascading to their assignments.
+    """
+    return isinstance(origin, Task) or getattr(origin, 'model', None) is Task
+
+
+@receiver(post_save, sender=TaskAssignment)
+def assignment_saved(sender, instance, created, **kwargs):
+    """
+    Assigned users can see the task they are assigned to, and stop seeing
+    it when the assignment moves to another task or user.
+    The task itself is recorded as changed when its counters are.
+    """
+    previous = getattr(instance, '_previous_assignment', None)
+    pair = (instance.user_id, instance.task_id)
+    if created:
+        TaskVisibility.grant(TaskVisibility.Reasons.ASSIGNEE, [pair])
+    elif previous is not None and (previous[1], previous[0]) != pair:
+        task_id, user_id, _ = previous
+        TaskVisibility.revoke(TaskVisibility.Reasons.ASSIGNEE, [(user_id, task_id)])
+        TaskVisibility.grant(TaskVisibility.Reasons.ASSIGNEE, [pair])
+        # The recount of the previous task only reaches users who can still see it
+        Change.record(Change.Kinds.TASK, [(user_id, task_id)])
+        if user_id != instance.user_id:
+            Change.record(Change.Kinds.ASSIGNMENT, [(user_id, instance.pk)])
+    Change.record(Change.Kinds.ASSIGNMENT, [(instance.user_id, instance.pk)])
+
+
+@receiver(pre_delete, sender=TaskAssignment)
+def assignment_deleting(sender, instance, origin=None, **kwargs):
+    """
+    Uncount the assignment from its user's team stats, by the stored status as the instance may be stale.
+    """
+    if deleting_task(origin):
+        return
+    TeamTaskStats.uncount(TaskAssignment.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=TaskAssignment)
+def assignment_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Removing an assignment hides the task from that user and shrinks the task's counters.
+    Deletes always run inside a transaction, so the task is recounted once on commit.
+    """
+    if deleting_task(origin):
+        return
+    TaskVisibility.revoke(TaskVisibility.Reasons.ASSIGNEE, [(instance.user_id, instance.task_id)])
+    defer_status_update(instance.task_id)
+    # The recount only reaches users who can still see the task
+    Change.record(Change.Kinds.ASSIGNMENT, [(instance.user_id, instance.pk)])
+    Change.record(Change.Kinds.TASK, [(instance.user_id, instance.task_id)])
@@ -1,3 +1,4 @@
+from .cache import MANAGING_ROLES, NO_ROLE, resolve_team_role
 from .model import Team, TeamRoles
 from .permission import IsTeamOwnerOrManager
-from .serializer import TeamSerializer, TeamRolesSerializer
\ No newline at end of file
+from .serializer import TeamSerializer, TeamRolesSerializer, TeamRolesSyncSerializer
\ No newline at end of file
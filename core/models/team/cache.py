@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from .model import Team, TeamRoles
+
+MANAGEABLE_KEY = 'team:manageable-users:{}'
+ROLE_KEY = 'team:role:{}:{}'
+
+# Roles returned by `resolve_team_role`, on top of `TeamRoles.Roles`
+OWNER = 'owner'
+NO_ROLE = ''
+MANAGING_ROLES = (OWNER, TeamRoles.Roles.MANAGER)
+
+
+def _timeout():
+    return getattr(settings, 'TEAM_CACHE_TIMEOUT', 300)
+
+
+def manageable_user_ids(user_id, request=None):
+    """
+    Returns the IDs of every member of a team that `user_id` owns or manages.
+
+    Memoized on `request` (if given) and shared across requests through the
+    default cache. Entries are dropped by the team signal handlers whenever
+    a membership that could change them is written.
+    """
+    memo = getattr(request, '_manageable_user_ids', None) if request is not None else None
+    if memo is not None and user_id in memo:
+        return memo[user_id]
+
+    key = MANAGEABLE_KEY.format(user_id)
+    user_ids = cache.get(key)
+    if user_ids is None:
+        allowed_team_ids = Team.objects.filter(
+            Q(owner=user_id) | Q(teamroles__user=user_id, teamroles__role=TeamRoles.Roles.MANAGER)
+        ).values('id')
+        user_ids = frozenset(
+            TeamRoles.objects.filter(team_id__in=allowed_team_ids).values_list('user_id', flat=True)
+        )
+        cache.set(key, user_ids, _timeout())
+
+    if request is not None:
+        if memo is None:
+            memo = request._manageable_user_ids = {}
+        memo[user_id] = user_ids
+    return user_ids
+
+
+def resolve_team_role(user_id, team, request=None):
+    """
+    Returns the role of `user_id` in `team` (a Team or its ID): `OWNER`,
+    `TeamRoles.Roles.MANAGER`, `TeamRoles.Roles.MEMBER` or `NO_ROLE`.
+
+    Costs at most one query, and none when memoized on `request`, cached,
+    or when `team` is an instance owned by the user.
+    """
+    if isinstance(team, Team):
+        if team.owner_id == user_id:
+            return OWNER
+        team_id = team.pk
+    else:
+        try:
+            team_id = int(team)
+        except (TypeError, ValueError):
+            return NO_ROLE
+
+    memo = getattr(request, '_team_roles', None) if request is not None else None
+    if memo is not None and (user_id, team_id) in memo:
+        return memo[user_id, team_id]
+
+    key = ROLE_KEY.format(team_id, user_id)
+    role = cache.get(key)
+    if role is None:
+        row = (
+            Team.objects.filter(pk=team_id)
+            .annotate(role=Subquery(
+                TeamRoles.objects.filter(team=OuterRef('pk'), user=user_id).values('role')[:1]
+            ))
+            .values_list('owner_id', 'role')
+            .first()
+        )
+        if row is None:
+            role = NO_ROLE
+        else:
+            owner_id, member_role = row
+            role = OWNER if owner_id == user_id else (member_role or NO_ROLE)
+        cache.set(key, role, _timeout())
+
+    if request is not None:
+        if memo is None:
+            memo = request._team_roles = {}
+        memo[user_id, team_id] = role
+    return role
+
+
+def invalidate_team(team_id, *user_ids):
+    """
+    Drops the cached entries of everyone whose manageable set depends on `team_id`
+    (its owner and managers), plus any extra `user_ids`.
+    """
+    affected = set(user_ids)
+    affected.update(Team.objects.filter(pk=team_id).values_list('owner_id', flat=True))
+    affected.update(
+        TeamRoles.objects.filter(team_id=team_id, role=TeamRoles.Roles.MANAGER).values_list('user_id', flat=True)
+    )
+    invalidate_users(affected)
+    invalidate_roles(team_id, user_ids)
+
+
+def invalidate_users(user_ids):
+    delete_on_commit([MANAGEABLE_KEY.format(user_id) for user_id in user_ids if user_id is not None])
+
+
+def invalidate_roles(team_id, user_ids):
+    delete_on_commit([ROLE_KEY.format(team_id, user_id) for user_id in user_ids if user_id is not None])
+
+
+def delete_on_commit(keys):
+    """
+    Drops `keys` once the current transaction commits (right away outside of one), so a
+    concurrent request cannot cache again what it read before the write was visible.
+    """
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from ..user import User
@@ -7,12 +8,20 @@ from ..user import User
 class Team(models.Model):
     name = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey("User", on_delete=models.RESTRICT, related_name="owned_teams")
     members = models.ManyToManyField("User", through='TeamRoles', related_name="teams")
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def touch(cls, team_id):
+        """
+        Bump `updated_at` of a team whose members changed, so cached copies are revalidated.
+        """
+        cls.objects.filter(pk=team_id).update(updated_at=timezone.now())
+
 class TeamRoles(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     team = models.ForeignKey("Team", on_delete=models.CASCADE)
@@ -23,5 +32,12 @@ class TeamRoles(models.Model):
 
     role = models.CharField(max_length=10, choices=Roles, default=Roles.MEMBER)
 
+    class Meta:
+        indexes = [
+            # A user's roles (permission checks) and a team's members (`?team=` on task lists).
+            models.Index(fields=['user', 'role'], name='teamroles_user_role_idx'),
+            models.Index(fields=['team', 'user'], name='teamroles_team_user_idx'),
+        ]
+
     def __str__(self):
         return f"{self.team.name} - {self.role} - {self.user.username}"
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission
+from .cache import OWNER, NO_ROLE, resolve_team_role
 from .model import TeamRoles
 
 
@@ -14,25 +15,22 @@ class IsTeamOwnerOrManager(BasePermission):
         """
         Check user permissions based on request method and role in the team.
         """
-        user = request.user
+        role = resolve_team_role(request.user.id, obj, request)
 
         # Owners can do everything (GET, DELETE, PATCH, etc.)
-        if obj.owner == user:
+        if role == OWNER:
             return True
 
-        # Get user's role in the team
-        team_role = TeamRoles.objects.filter(team=obj, user=user).first()
-
         # Allow GET (view access) for all members
         if request.method in ["GET", "HEAD", "OPTIONS"]:
-            return team_role is not None  # All members can view
+            return role != NO_ROLE  # All members can view
 
         # Allow DELETE only for team owners
         if request.method == "DELETE":
-            return obj.owner == user
+            return False
 
         # Allow adding/removing members only for managers
-        if request.method in ["POST", "PATCH"] and team_role:
-            return team_role.role == TeamRoles.Roles.MANAGER
+        if request.method in ["POST", "PATCH"]:
+            return role == TeamRoles.Roles.MANAGER
 
         return False
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ..sparse import SparseFieldsetMixin
 from .model import Team, TeamRoles
 
 
@@ -7,8 +8,16 @@ class TeamRolesSerializer(serializers.ModelSerializer):
         model = TeamRoles
         fields = ['role', 'user', 'team']
 
-class TeamSerializer(serializers.ModelSerializer):
-    members = TeamRolesSerializer(many=True, read_only=True)
+class TeamRolesSyncSerializer(TeamRolesSerializer):
+    """
+    Team roles in delta sync, with the id tombstones refer to.
+    """
+    class Meta(TeamRolesSerializer.Meta):
+        fields = ['id', *TeamRolesSerializer.Meta.fields]
+
+class TeamSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    members = TeamRolesSerializer(source='teamroles_set', many=True, read_only=True)
+    expandable_fields = ('members',)
     class Meta:
         model = Team
         fields = ['name', 'created_at', 'owner', 'members']
\ No newline at end of file
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from ..sync import Change
+from ..task import TeamTaskStats
+from .cache import invalidate_roles, invalidate_team, invalidate_users
+from .model import Team, TeamRoles
+
+
+@receiver(pre_save, sender=Team)
+def team_pre_save(sender, instance, **kwargs):
+    """
+    Remember the previous owner, whose cached permissions go stale if ownership moves.
+    """
+    if instance.pk is not None:
+        instance._previous_owner_id = (Team.objects.filter(pk=instance.pk)
+                                       .values_list('owner_id', flat=True).first())
+
+
+@receiver(post_save, sender=Team)
+def team_saved(sender, instance, created, **kwargs):
+    previous_owner_id = getattr(instance, '_previous_owner_id', None)
+    if created or previous_owner_id != instance.owner_id:
+        invalidate_users([instance.owner_id, previous_owner_id])
+        invalidate_roles(instance.pk, [instance.owner_id, previous_owner_id])
+
+
+@receiver(post_delete, sender=Team)
+def team_deleted(sender, instance, **kwargs):
+    invalidate_users([instance.owner_id])
+    invalidate_roles(instance.pk, [instance.owner_id])
+
+
+@receiver(pre_save, sender=TeamRoles)
+def team_role_pre_save(sender, instance, **kwargs):
+    """
+    Remember the previous membership, whose team stats go stale if the role moves.
+    """
+    if instance.pk is not None:
+        instance._previous_membership = (TeamRoles.objects.filter(pk=instance.pk)
+                                         .values_list('team_id', 'user_id').first())
+
+
+@receiver(post_save, sender=TeamRoles)
+@receiver(post_delete, sender=TeamRoles)
+def team_role_changed(sender, instance, **kwargs):
+    """
+    A membership change affects the team's owner and managers, and the member
+    themselves if they are (or were) a manager. The team's member list and stats change too,
+    and those of the previous team when the role moved.
+    """
+    invalidate_team(instance.team_id, instance.user_id)
+    memberships = [(instance.team_id, instance.user_id)]
+    previous = getattr(instance, '_previous_membership', None)
+    if previous is not None:
+        memberships.append(previous)
+        if previous != (instance.team_id, instance.user_id):
+            invalidate_team(*previous)
+        if previous[0] != instance.team_id:
+            Team.touch(previous[0])
+    TeamTaskStats.sync_members(memberships)
+    Team.touch(instance.team_id)
+    Change.record(Change.Kinds.TEAM_ROLE, [(instance.user_id, instance.pk)])
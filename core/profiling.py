@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from core.metrics import APP_DIR, RequestStats, current_request
+
+PROFILE_KINDS = ('cpu', 'sql')
+SAMPLE_INTERVAL = 0.001
+UNSAFE_FILENAME = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def requested_profile(request):
+    """
+    The profile asked for with `?_profile=`, on `/api/` routes. A substring test first, so
+    requests not asking for one do not even parse their query string.
+    """
+    if '_profile=' not in request.META.get('QUERY_STRING', '') or not request.path.startswith('/api/'):
+        return None
+    kind = request.GET.get('_profile')
+    return kind if kind in PROFILE_KINDS else None
+
+
+def has_profile_token(request):
+    token = settings.PROFILE_TOKEN
+    return bool(token) and constant_time_compare(request.headers.get('X-Profile-Token', ''), token)
+
+
+def is_staff(user):
+    return user is not None and user.is_authenticated and user.is_staff
+
+
+def jwt_user(request):
+    """
+    The user of the request's JWT, if valid. The sync counterpart of `core.apis.asynchronous.authenticate`.
+    """
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return authenticated[0] if authenticated else None
+
+
+class StackSampler:
+    """
+    Samples, every `interval` seconds from a background thread, the Python stacks of the
+    threads serving `request` and counts identical ones.
+
+    A thread serves the request while a frame on its stack has it as its `request` local,
+    which follows it from the event loop into the `sync_to_async` thread running a sync view
+    and leaves out the other requests served concurrently.
+    """
+
+    def __init__(self, request, interval=SAMPLE_INTERVAL):
+        self.request = request
+        self.interval = interval
+        self.stacks = Counter()
+        self.names = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def sample(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            if self.stopped.is_set():
+                break  # The request is done, its thread is waiting for this one
+            for thread_id, frame in frames.items():
+                if thread_id != own and self.serving(frame):
+                    self.stacks[self.collapse(frame)] += 1
+
+    def serving(self, frame):
+        while frame is not None:
+            if frame.f_locals.get('request') is self.request:
+                return True
+            frame = frame.f_back
+        return False
+
+    def collapse(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            name = self.names.get(code)
+            if name is None:
+                name = self.names[code] = f'{code.co_qualname} ({short_path(code.co_filename)}:{code.co_firstlineno})'
+            names.append(name)
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def render(self):
+        """
+        The samples in the collapsed stack format of flamegraph.pl, speedscope and inferno.
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def short_path(filename):
+    """
+    `filename` relative to the project or to its `site-packages`, without the characters the collapsed format splits on.
+    """
+    if filename.startswith(APP_DIR):
+        filename = os.path.relpath(filename, os.path.dirname(APP_DIR))
+    else:
+        filename = filename.rpartition('site-packages' + os.sep)[2]
+    return filename.replace(';', ':').replace(' ', '_')
+
+
+class Profile:
+    """
+    Profiles what runs inside the `with` block for `request`, which sets `response` to what it answered.
+    `cpu` samples its stacks, `sql` keeps the timeline of its queries.
+    """
+
+    def __init__(self, request, kind):
+        self.request = request
+        self.kind = kind
+        self.response = None
+        self.sampler = StackSampler(request) if kind == 'cpu' else None
+        self.timeline = []
+
+    def __enter__(self):
+        # Reuses the stats MetricsMiddleware set for the request, if it runs
+        self.stats = current_request.get()
+        self.token = None
+        if self.stats is None:
+            self.stats = RequestStats()
+            self.token = current_request.set(self.stats)
+        if self.kind == 'sql':
+            self.stats.timeline = self.timeline
+        if self.sampler is not None:
+            self.sampler.start()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.started
+        if self.sampler is not None:
+            self.sampler.stop()
+        self.stats.timeline = None
+        if self.token is not None:
+            current_request.reset(self.token)
+
+    def result(self):
+        """
+        Saves the profile to `PROFILE_DIR` and returns the request's own response with an
+        `X-Profile` header naming the file, or returns the profile instead when no directory is set.
+        """
+        if self.kind == 'cpu':
+            body, content_type, extension = self.sampler.render(), 'text/plain; charset=utf-8', 'folded'
+        else:
+            body, content_type, extension = json.dumps(self.sql_timeline(), indent=2), 'application/json', 'json'
+
+        if not settings.PROFILE_DIR:
+            profile = HttpResponse(body, content_type=content_type)
+            profile['X-Profile-Status'] = str(self.response.status_code)
+            return profile
+
+        name = UNSAFE_FILENAME.sub('_', self.request.path.strip('/'))
+        filename = f'{datetime.now():%Y%m%dT%H%M%S%f}-{self.request.method}-{name}-{self.kind}.{extension}'
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(settings.PROFILE_DIR, filename), 'w') as file:
+            file.write(body)
+        self.response['X-Profile'] = filename
+        return self.response
+
+    def sql_timeline(self):
+        return {
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'status': self.response.status_code,
+            'duration_ms': round(self.duration * 1000, 3),
+            'db_ms': round(sum(took for _, took, _, _ in self.timeline) * 1000, 3),
+            'count': len(self.timeline),
+            'queries': [
+                {'offset_ms': round((start - self.started) * 1000, 3), 'duration_ms': round(took * 1000, 3),
+                 'sql': sql, 'source': source}
+                for start, took, sql, source in self.timeline
+            ],
+        }
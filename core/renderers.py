@@ -0,0 +1,56 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional, the stdlib encoder is used without it
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` backed by orjson when it is installed.
+
+    Produces the same bytes as the stock renderer for compact, non-ASCII-escaped
+    output (the defaults) and defers to it for anything else (`indent=`, the
+    browsable API, `STRICT_JSON` off, ...).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or self.ensure_ascii or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Datetimes go through the DRF encoder too, it formats UTC offsets as `Z`
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:  # e.g. non-string dict keys, which json.dumps coerces
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict javascript subset escaping as JSONRenderer
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Lets `?format=ndjson` through content negotiation. Streaming views write
+    the body themselves; this only renders error responses.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (json.dumps(data) + '\n').encode(self.charset)
+
+
+class CSVRenderer(NDJSONRenderer):
+    """
+    Lets `?format=csv` through content negotiation, see `NDJSONRenderer`.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
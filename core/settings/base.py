@@ -58,9 +58,23 @@ REST_FRAMEWORK = {
     # "DEFAULT_PERMISSION_CLASSES": (
     #     "rest_framework.permissions.IsAuthenticated",
     # ),
+    "DEFAULT_RENDERER_CLASSES": (
+        # The fast-read viewsets switch to `core.renderers.FastJSONRenderer` with `API_FAST_READS`
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
+# Default page size for the keyset-paginated list endpoints (`?page_size=` overrides it)
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 50))
+
+# Serve list/detail reads of tasks, assignments, teams and users from `.values()`
+# rows instead of the DRF serializers (same output, less CPU per row)
+API_FAST_READS = int(os.environ.get("API_FAST_READS", 0)) == 1
+
 MIDDLEWARE = [
+    # First, so it times the whole stack
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -68,6 +82,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Last, so it profiles the view only, and sees the session user
+    "core.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -89,6 +105,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "core.wsgi.application"
+ASGI_APPLICATION = "core.asgi.application"
 
 
 # Database
@@ -106,6 +123,63 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory is per process; point this at a shared backend (Redis, Memcached)
+# when running several workers so that invalidations reach all of them.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Upper bound (seconds) on how long cached team permission data can live
+TEAM_CACHE_TIMEOUT = int(os.environ.get("TEAM_CACHE_TIMEOUT", 300))
+
+# Pub/sub behind `/api/tasks/events/`. The default only reaches streams served by the same
+# process, `core.events.PostgresBroker` (the production default) those of every worker and node.
+EVENTS_BROKER = os.environ.get("EVENTS_BROKER", "core.events.InProcessBroker")
+
+# Bearer token scrapers send to read `/metrics`. Otherwise only staff users may, even when empty
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Requests running one query fingerprint more than this many times are logged as N+1s,
+# queries taking SQL_SLOW_QUERY_MS or more as slow, both to the rotating SQL_LOG_FILE
+SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", 10))
+SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", 200))
+SQL_LOG_FILE = os.environ.get("SQL_LOG_FILE") or os.path.join(BASE_DIR, "logs", "sql.log")
+os.makedirs(os.path.dirname(SQL_LOG_FILE), exist_ok=True)
+
+# `?_profile=cpu|sql` on /api/ routes, for staff users and holders of PROFILE_TOKEN (sent as
+# X-Profile-Token). Profiles are returned instead of the response, or saved to PROFILE_DIR if set.
+PROFILING = int(os.environ.get("PROFILING", 1)) == 1
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "timestamped": {"format": "%(asctime)s %(levelname)s %(message)s"},
+    },
+    "handlers": {
+        "sql_file": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SQL_LOG_FILE,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "delay": True,
+            "formatter": "timestamped",
+        },
+    },
+    "loggers": {
+        "core.sql": {"handlers": ["sql_file"], "level": "INFO", "propagate": False},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
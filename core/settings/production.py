@@ -4,4 +4,7 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
 SECURE_SSL_REDIRECT = True
-CSRF_TRUSTED_ORIGINS = os.environ.get('CSRF_TRUSTED_ORIGINS', '').split(',')
\ No newline at end of file
+CSRF_TRUSTED_ORIGINS = os.environ.get('CSRF_TRUSTED_ORIGINS', '').split(',')
+
+# uvicorn may run several workers (and several nodes), whose event streams only share changes through PostgreSQL
+EVENTS_BROKER = os.environ.get('EVENTS_BROKER', 'core.events.PostgresBroker')
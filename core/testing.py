@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def assert_query_budget(budget, using=connection):
+    """
+    Fails if the block runs more than `budget` SQL queries.
+
+        with assert_query_budget(3):
+            client.get('/api/tasks/')
+    """
+    with CaptureQueriesContext(using) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > budget:
+        queries = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1))
+        raise AssertionError(f"{executed} queries executed, budget is {budget}:\n{queries}")
+
+
+def assert_queries_do_not_scale(fetch, grow, sizes=(1, 5, 25), using=connection):
+    """
+    Fails if the number of queries run by `fetch()` changes with the size of the result.
+
+    `grow(n)` must make the dataset hold `n` rows for the endpoint under test
+    (it is called with every value of `sizes`, in increasing order), and
+    `fetch()` must run the request. This is how N+1 queries in nested
+    serializers show up: one extra query per listed row.
+    """
+    counts = {}
+    for size in sizes:
+        grow(size)
+        with CaptureQueriesContext(using) as context:
+            fetch()
+        counts[size] = context.captured_queries
+
+    if len({len(queries) for queries in counts.values()}) > 1:
+        summary = ', '.join(f"{size} rows: {len(queries)} queries" for size, queries in counts.items())
+        largest = counts[max(counts)]
+        queries = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(largest, start=1))
+        raise AssertionError(f"Query count grows with result size ({summary}):\n{queries}")
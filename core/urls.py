@@ -21,7 +21,8 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from core.apis import (
     TaskViewSet, TaskAssignmentViewSet,
-    UserViewSet, TeamViewSet, TeamRolesViewSet
+    UserViewSet, TeamViewSet, TeamRolesViewSet, task_events,
+    TaskReadView, TaskAssignmentReadView, TeamReadView, metrics, SQLStatsView
 )
 
 router = DefaultRouter()
@@ -34,9 +35,24 @@ router.register(r'tasks', TaskViewSet, basename='task')
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # Prometheus scrape endpoint
+    path('metrics', metrics, name='metrics'),
+    path('api/sql-stats/', SQLStatsView.as_view(), name='sql-stats'),
+
     # JWT Token Views
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 
+    # Server-Sent Events, needs an ASGI server. Before the router, which would take it for a task id.
+    path('api/tasks/events/', task_events, name='task-events'),
+
+    # Async ORM reads for ASGI deployments, same output as their router counterparts
+    path('api/async/tasks/', TaskReadView.as_view(), name='task-async-list'),
+    path('api/async/tasks/assign/', TaskAssignmentReadView.as_view(), name='task-assign-async-list'),
+    path('api/async/tasks/assign/<str:pk>/', TaskAssignmentReadView.as_view(), name='task-assign-async-detail'),
+    path('api/async/tasks/<str:pk>/', TaskReadView.as_view(), name='task-async-detail'),
+    path('api/async/teams/', TeamReadView.as_view(), name='team-async-list'),
+    path('api/async/teams/<str:pk>/', TeamReadView.as_view(), name='team-async-detail'),
+
     path('api/', include(router.urls)),
 ]
@@ -2,7 +2,9 @@
 
 /app/scripts/setup.sh
 if [ \"$${IS_IN_PRODUCTION}\" = '1' ]; then
-  gunicorn core.wsgi:application --bind :"${DJANGO_PORT}";
+  # ASGI, so the event stream holds an idle socket instead of a worker. Workers share events through
+  # PostgresBroker, the production default: with EVENTS_BROKER=core.events.InProcessBroker, keep a single process.
+  uvicorn core.asgi:application --host 0.0.0.0 --port "${DJANGO_PORT}" --timeout-graceful-shutdown 10;
 else
   python manage.py runserver 0.0.0.0:"${DJANGO_PORT}";
 fi
\ No newline at end of file
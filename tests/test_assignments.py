@@ -0,0 +1,374 @@
+import threading
+from unittest import mock, skipUnless
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Change, Task, TaskAssignment, TaskVisibility, Team, TeamRoles, TeamTaskStats, User
+from core.models.task.model import TaskStatus
+
+
+class AssignmentCountersTests(TransactionTestCase):
+    """
+    Task counters and status follow assignment writes, in autocommit and inside transactions.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.first = Task.objects.create(name='First', description='d', created_by=self.alice, task_type='goal')
+        # Bob's own, as nobody can move an assignment to a task they cannot see
+        self.second = Task.objects.create(name='Second', description='d', created_by=self.bob, task_type='goal')
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def assertCounters(self, task, total, completed, status):
+        task.refresh_from_db()
+        self.assertEqual((task.assignments_total, task.assignments_completed, task.status),
+                         (total, completed, status))
+
+    def test_assign_and_complete(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.bob)
+        self.assertCounters(self.first, 1, 0, TaskStatus.IN_PROGRESS)
+        assignment.status = TaskStatus.COMPLETED
+        assignment.save()
+        self.assertCounters(self.first, 1, 1, TaskStatus.COMPLETED)
+        assignment.delete()
+        self.assertCounters(self.first, 0, 0, TaskStatus.PENDING)
+
+    def test_moving_an_assignment_moves_its_counts(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.bob, status=TaskStatus.COMPLETED)
+        response = self.client.patch(f'/api/tasks/assign/{assignment.id}/',
+                                     {'task': self.second.id, 'user_id': self.bob.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(self.first, 0, 0, TaskStatus.PENDING)
+        self.assertCounters(self.second, 1, 1, TaskStatus.COMPLETED)
+
+    def test_moving_an_assignment_in_a_transaction(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.bob)
+        with transaction.atomic():
+            assignment.task = self.second
+            assignment.save()
+        self.assertCounters(self.first, 0, 0, TaskStatus.PENDING)
+        self.assertCounters(self.second, 1, 0, TaskStatus.IN_PROGRESS)
+
+
+class AssignmentVisibilityTests(TransactionTestCase):
+    """
+    `TaskVisibility` follows assignments, so task lists show exactly the tasks a user created or is assigned to.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.first = Task.objects.create(name='First', description='d', created_by=self.alice, task_type='goal')
+        self.second = Task.objects.create(name='Second', description='d', created_by=self.alice, task_type='goal')
+
+    def visible_ids(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        return {task['id'] for task in response.json()['results']}
+
+    def assertVisibility(self, user, task, reasons):
+        self.assertEqual(set(TaskVisibility.objects.filter(user=user, task=task).values_list('reason', flat=True)),
+                         set(reasons))
+
+    def test_assign_and_unassign(self):
+        self.assertEqual(self.visible_ids(self.bob), set())
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.bob)
+        self.assertEqual(self.visible_ids(self.bob), {self.first.id})
+        self.assertEqual(self.visible_ids(self.alice), {self.first.id, self.second.id})
+        assignment.delete()
+        self.assertEqual(self.visible_ids(self.bob), set())
+
+    def test_moving_to_another_task(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.bob)
+        assignment.task = self.second
+        assignment.save()
+        self.assertVisibility(self.bob, self.first, [])
+        self.assertVisibility(self.bob, self.second, [TaskVisibility.Reasons.ASSIGNEE])
+        self.assertEqual(self.visible_ids(self.bob), {self.second.id})
+
+    def test_moving_to_another_user(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.bob)
+        assignment.user = self.carol
+        assignment.save()
+        self.assertEqual(self.visible_ids(self.bob), set())
+        self.assertEqual(self.visible_ids(self.carol), {self.first.id})
+
+    def test_creator_keeps_seeing_a_task_they_are_unassigned_from(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.alice)
+        assignment.task = self.second
+        assignment.save()
+        self.assertVisibility(self.alice, self.first, [TaskVisibility.Reasons.CREATOR])
+        self.assertEqual(self.visible_ids(self.alice), {self.first.id, self.second.id})
+
+
+class DeferredRecountTests(TransactionTestCase):
+    """
+    Inside a transaction, tasks are recounted once when it commits, and never missed after a rollback.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.users = [User.objects.create_user(username=f'user{i}', password='password') for i in range(3)]
+        self.first = Task.objects.create(name='First', description='d', created_by=self.alice, task_type='goal')
+        self.second = Task.objects.create(name='Second', description='d', created_by=self.alice, task_type='goal')
+
+    def assertTotal(self, task, total):
+        task.refresh_from_db()
+        self.assertEqual(task.assignments_total, total)
+
+    def test_recounted_once_per_transaction(self):
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic():
+                for user in self.users:
+                    TaskAssignment.objects.create(task=self.first, user=user)
+        recounts = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "core_task"')]
+        self.assertEqual(len(recounts), 1)
+        self.assertTotal(self.first, 3)
+
+    def test_unchanged_counters(self):
+        assignment = TaskAssignment.objects.create(task=self.first, user=self.users[0])
+        self.first.refresh_from_db()
+        last_change = Change.objects.latest('id').id
+        with transaction.atomic():
+            assignment.status = TaskStatus.COMPLETED
+            assignment.save()
+            assignment.status = TaskStatus.PENDING
+            assignment.save()
+        self.assertEqual(Task.objects.get(pk=self.first.pk).updated_at, self.first.updated_at)
+        self.assertFalse(Change.objects.filter(id__gt=last_change, kind=Change.Kinds.TASK).exists())
+
+    def test_rolled_back_savepoint(self):
+        with transaction.atomic():
+            TaskAssignment.objects.create(task=self.first, user=self.users[0])
+            try:
+                with transaction.atomic():
+                    TaskAssignment.objects.create(task=self.second, user=self.users[1])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            TaskAssignment.objects.create(task=self.second, user=self.users[2])
+        self.assertTotal(self.first, 1)
+        self.assertTotal(self.second, 1)
+
+    def test_first_write_in_a_rolled_back_savepoint(self):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    TaskAssignment.objects.create(task=self.first, user=self.users[0])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            TaskAssignment.objects.create(task=self.second, user=self.users[1])
+        self.assertTotal(self.first, 0)
+        self.assertTotal(self.second, 1)
+
+    def test_after_a_rolled_back_transaction(self):
+        try:
+            with transaction.atomic():
+                TaskAssignment.objects.create(task=self.first, user=self.users[0])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with transaction.atomic():
+            TaskAssignment.objects.create(task=self.second, user=self.users[1])
+        self.assertTotal(self.first, 0)
+        self.assertTotal(self.second, 1)
+
+
+class AssignmentAccessTests(TestCase):
+    """
+    Nobody can assign anyone, themselves included, to a task they cannot see.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.private = Task.objects.create(name='Private', description='d', created_by=self.alice, task_type='goal')
+        self.own = Task.objects.create(name='Own', description='d', created_by=self.bob, task_type='goal')
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def test_bulk_assign_to_a_hidden_task(self):
+        response = self.client.post('/api/tasks/assign/bulk/',
+                                    {'task': self.private.id, 'users': [self.bob.id]}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(TaskAssignment.objects.filter(task=self.private).exists())
+        self.assertEqual(self.client.get(f'/api/tasks/{self.private.id}/').status_code, 404)
+
+    def test_bulk_assign_to_a_visible_task(self):
+        response = self.client.post('/api/tasks/assign/bulk/',
+                                    {'task': self.own.id, 'users': [self.bob.id, self.alice.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'user': self.bob.id, 'status': 'assigned'},
+            {'user': self.alice.id, 'status': 'forbidden'},
+        ])
+
+    def test_assign_to_a_hidden_task(self):
+        response = self.client.post('/api/tasks/assign/',
+                                    {'task': self.private.id, 'user': self.bob.id, 'user_id': self.bob.id},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(TaskAssignment.objects.filter(task=self.private).exists())
+
+    def test_move_an_assignment_to_a_hidden_task(self):
+        assignment = TaskAssignment.objects.create(task=self.own, user=self.bob)
+        response = self.client.patch(f'/api/tasks/assign/{assignment.id}/',
+                                     {'task': self.private.id, 'user_id': self.bob.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.task_id, self.own.id)
+
+    def test_bulk_endpoints_require_authentication(self):
+        client = APIClient()
+        response = client.post('/api/tasks/assign/bulk/', {'task': self.own.id, 'users': [self.bob.id]}, format='json')
+        self.assertEqual(response.status_code, 401)
+        response = client.patch('/api/tasks/assign/bulk/', [{'id': 1, 'status': 'completed'}], format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'SQLite serializes the requests')
+class ConcurrentBulkAssignTests(TransactionTestCase):
+    """
+    Concurrent bulk assigns of the same users report and count each assignment once.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.users = [User.objects.create_user(username=f'user{i}', password='password') for i in range(8)]
+        team = Team.objects.create(name='Team', owner=self.alice)
+        for user in self.users:
+            TeamRoles.objects.create(team=team, user=user, role=TeamRoles.Roles.MEMBER)
+
+    def bulk_assign(self, task, results):
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        response = client.post('/api/tasks/assign/bulk/', {'task': task.id, 'users': [user.id for user in self.users]},
+                               format='json')
+        results += [result['status'] for result in response.json()['results']]
+        connection.close()
+
+    def test_concurrent_bulk_assign(self):
+        for _ in range(5):
+            task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+            results = []
+            threads = [threading.Thread(target=self.bulk_assign, args=(task, results)) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(results.count('assigned'), len(self.users))
+        self.assertEqual(TeamTaskStats.objects.aggregate(count=Sum('count'))['count'],
+                         TaskAssignment.objects.count())
+
+
+class TaskDeleteTests(TransactionTestCase):
+    """
+    Deleting a task handles its assignments in bulk, in a number of queries that does not grow with them.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.users = [User.objects.create_user(username=f'user{i}', password='password') for i in range(25)]
+        team = Team.objects.create(name='Team', owner=self.alice)
+        for user in self.users:
+            TeamRoles.objects.create(team=team, user=user, role=TeamRoles.Roles.MEMBER)
+
+    def delete_task(self, assignees):
+        task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        with transaction.atomic():
+            for i, user in enumerate(assignees):
+                TaskAssignment.objects.create(task=task, user=user,
+                                              status=TaskStatus.COMPLETED if i % 2 else TaskStatus.PENDING)
+        assignments = set(task.assignments.values_list('user_id', 'id'))
+        head = Change.horizon()
+        with CaptureQueriesContext(connection) as context:
+            task.delete()
+        recorded = set(Change.objects.filter(id__gt=head, kind=Change.Kinds.ASSIGNMENT)
+                       .values_list('user_id', 'object_id'))
+        # Every assignee's feed tells them their assignment is gone
+        self.assertEqual(recorded, assignments)
+        return len(context.captured_queries)
+
+    def test_delete(self):
+        self.assertEqual(self.delete_task(self.users), self.delete_task(self.users[:1]))
+        self.assertFalse(TeamTaskStats.objects.exclude(count=0).exists())
+        self.assertFalse(TaskVisibility.objects.exists())
+
+
+class BulkStatusUpdateTests(TransactionTestCase):
+    """
+    `PATCH /api/tasks/assign/bulk/` updates the caller's assignments in one transaction and
+    reports on every item, in a number of queries that does not grow with them.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        team = Team.objects.create(name='Team', owner=self.alice)
+        TeamRoles.objects.create(team=team, user=self.alice, role=TeamRoles.Roles.MEMBER)
+        self.tasks = [
+            Task.objects.create(name=f'Task {i}', description='d', created_by=self.alice, task_type='goal')
+            for i in range(10)
+        ]
+        self.assignments = [TaskAssignment.objects.create(task=task, user=self.alice) for task in self.tasks]
+        self.foreign = TaskAssignment.objects.create(task=self.tasks[0], user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def patch(self, items, status=200):
+        response = self.client.patch('/api/tasks/assign/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_results(self):
+        first, second = self.assignments[:2]
+        data = self.patch([
+            {'id': first.id, 'status': 'completed'},
+            {'id': second.id, 'status': 'pending'},
+            {'id': self.foreign.id, 'status': 'completed'},
+            {'id': 0, 'status': 'completed'},
+            {'id': first.id, 'status': 'in_progress'},
+            {'id': second.id, 'status': 'bogus'},
+        ])
+        self.assertEqual([(result['id'], result['status']) for result in data['results']], [
+            (first.id, 'updated'), (second.id, 'unchanged'), (self.foreign.id, 'not_found'),
+            (0, 'not_found'), (first.id, 'invalid'), (second.id, 'invalid'),
+        ])
+        self.assertEqual(set(data['results'][5]['errors']), {'status'})
+
+        first.refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertEqual((first.status, self.foreign.status), (TaskStatus.COMPLETED, TaskStatus.PENDING))
+        # The task is recounted, the stats shifted and the change recorded
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].assignments_completed, 1)
+        self.assertEqual(TeamTaskStats.objects.get(user=self.alice, status=TaskStatus.COMPLETED).count, 1)
+        self.assertTrue(Change.objects.filter(kind=Change.Kinds.ASSIGNMENT, user=self.alice,
+                                              object_id=first.id).exists())
+
+    def test_queries_do_not_scale(self):
+        def patch(assignments, status):
+            with CaptureQueriesContext(connection) as context:
+                data = self.patch([{'id': assignment.id, 'status': status} for assignment in assignments])
+            self.assertEqual({result['status'] for result in data['results']}, {'updated'})
+            return len(context.captured_queries)
+
+        self.assertEqual(patch(self.assignments[:1], 'in_progress'), patch(self.assignments[1:], 'in_progress'))
+        self.assertEqual(TaskAssignment.objects.filter(user=self.alice, status=TaskStatus.IN_PROGRESS).count(), 10)
+
+    def test_invalid_body(self):
+        self.patch({'id': self.assignments[0].id, 'status': 'completed'}, status=400)
+        with mock.patch('core.apis.task.view.TaskAssignmentViewSet.bulk_max_items', 1):
+            self.patch([{'id': assignment.id, 'status': 'completed'} for assignment in self.assignments[:2]],
+                       status=400)
+        self.assertFalse(TaskAssignment.objects.filter(status=TaskStatus.COMPLETED).exists())
@@ -0,0 +1,79 @@
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import sync_to_async
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Task, TaskAssignment, Team, TeamRoles, User
+from core.models.task.model import TaskStatus
+
+
+@override_settings(API_FAST_READS=True)
+class AsyncReadTests(TransactionTestCase):
+    """
+    `/api/async/...` reads answer as their sync counterparts do: same bodies, pages, errors and conditional GETs.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.team = Team.objects.create(name='Team', owner=self.alice)
+        TeamRoles.objects.create(team=self.team, user=self.bob, role=TeamRoles.Roles.MEMBER)
+        self.tasks = [
+            Task.objects.create(name=f'Task {i}', description='d', created_by=self.alice, task_type='goal')
+            for i in range(3)
+        ]
+        self.assignment = TaskAssignment.objects.create(task=self.tasks[0], user=self.alice,
+                                                        status=TaskStatus.COMPLETED)
+        TaskAssignment.objects.create(task=self.tasks[1], user=self.alice)
+        self.hidden = Task.objects.create(name='Hidden', description='d', created_by=self.bob, task_type='goal')
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.alice)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.alice)}'}
+
+    async def get(self, path, params=None, headers=None):
+        headers = {**self.headers, **(headers or {})}
+        return await self.async_client.get(f'/api/async{path}', params or {}, headers=headers)
+
+    async def assertSameResponse(self, path, params=None):
+        response = await self.get(path, params)
+        expected = await sync_to_async(self.sync_client.get)(f'/api{path}', params or {})
+        self.assertEqual(response.status_code, expected.status_code)
+        # Page links point back to the endpoint that served them
+        self.assertEqual(response.content.replace(b'/api/async/', b'/api/'), expected.content)
+        return response
+
+    async def test_same_responses(self):
+        paths = [
+            '/tasks/', f'/tasks/{self.tasks[0].id}/', '/tasks/assign/', f'/tasks/assign/{self.assignment.id}/',
+            '/teams/', f'/teams/{self.team.id}/',
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                await self.assertSameResponse(path)
+        for params in ({'fields': 'id,name'}, {'status': 'completed'}, {'ordering': 'name'}, {'page_size': 'x'}):
+            with self.subTest(params=params):
+                await self.assertSameResponse('/tasks/', params)
+
+    async def test_pages(self):
+        response = await self.assertSameResponse('/tasks/', {'page_size': 2})
+        cursor = parse_qs(urlsplit(response.json()['next']).query)['cursor'][0]
+        response = await self.assertSameResponse('/tasks/', {'page_size': 2, 'cursor': cursor})
+        self.assertEqual([task['id'] for task in response.json()['results']], [self.tasks[0].id])
+        await self.assertSameResponse('/tasks/', {'cursor': 'garbage'})
+
+    async def test_errors(self):
+        self.assertEqual((await self.async_client.get('/api/async/tasks/')).status_code, 401)
+        self.assertEqual((await self.get('/tasks/', headers={'Authorization': 'Bearer wrong'})).status_code, 401)
+        for path in (f'/tasks/{self.hidden.id}/', '/tasks/0/', '/tasks/abc/', '/teams/0/'):
+            with self.subTest(path=path):
+                self.assertEqual((await self.assertSameResponse(path)).status_code, 404)
+        self.assertEqual((await self.assertSameResponse('/tasks/', {'status': 'done'})).status_code, 400)
+
+    async def test_not_modified(self):
+        for path in ('/tasks/', f'/tasks/{self.tasks[0].id}/', f'/teams/{self.team.id}/'):
+            with self.subTest(path=path):
+                etag = (await self.get(path))['ETag']
+                self.assertEqual((await self.get(path, headers={'If-None-Match': etag})).status_code, 304)
+                self.assertEqual((await self.get(path, headers={'If-None-Match': '"stale"'})).status_code, 200)
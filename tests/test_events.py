@@ -0,0 +1,116 @@
+import asyncio
+import json
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.apis.task import events as task_events
+from core.events import InProcessBroker, PostgresBroker
+from core.models import Task, TaskAssignment, User
+from core.models.task.model import TaskStatus
+
+
+class TaskEventStreamTests(TransactionTestCase):
+    """
+    `GET /api/tasks/events/` replays the changes after `Last-Event-ID`, then streams those committed while connected.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        self.assignment = TaskAssignment.objects.create(task=self.task, user=self.bob)
+        # A broker of its own, whatever `EVENTS_BROKER` the suite runs with
+        self.broker = InProcessBroker()
+        for target in ('core.events.get_broker', 'core.apis.task.events.get_broker'):
+            patcher = mock.patch(target, return_value=self.broker)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def connect(self, last_event_id=None):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.bob)}'}
+        if last_event_id is not None:
+            headers['Last-Event-ID'] = str(last_event_id)
+        streams, view_stream = [], task_events.stream
+
+        def stream(*args):
+            streams.append(view_stream(*args))
+            return streams[-1]
+
+        with mock.patch.object(task_events, 'stream', stream):
+            response = await self.async_client.get('/api/tasks/events/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        # The view's generator, read and closed directly: the test client keeps the response alive,
+        # where a server drops it on disconnect and so closes the generator
+        self.stream, = streams
+
+    async def receive(self):
+        chunk = await asyncio.wait_for(anext(self.stream), 5)
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+        if 'data' in fields:
+            fields['data'] = json.loads(fields['data'])
+        return fields
+
+    async def disconnect(self):
+        await self.stream.aclose()
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get('/api/tasks/events/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_replay_and_live_events(self):
+        await self.connect(last_event_id=0)
+        self.assertEqual(await self.receive(), {'retry': '3000'})
+        replayed = [await self.receive() for _ in range(2)]
+        self.assertCountEqual([(event['event'], event['data']['id'], event['data']['status']) for event in replayed],
+                              [('task', self.task.id, 'in_progress'), ('assignment', self.assignment.id, 'pending')])
+        self.assertEqual([event['id'] for event in replayed], [str(event['data']['seq']) for event in replayed])
+
+        # Subscribed once the replay is read, the next change comes live
+        live = asyncio.ensure_future(self.receive())
+        while not self.broker.has_subscribers(self.bob.id):
+            await asyncio.sleep(0.01)
+        self.assignment.status = TaskStatus.COMPLETED
+        await sync_to_async(self.assignment.save)()
+        events = [await live, await self.receive()]
+        self.assertCountEqual([(event['event'], event['data']['id'], event['data']['status']) for event in events],
+                              [('task', self.task.id, 'completed'), ('assignment', self.assignment.id, 'completed')])
+        self.assertTrue(all(int(event['id']) > int(replayed[-1]['id']) for event in events))
+        await self.disconnect()
+        self.assertFalse(self.broker.has_subscribers(self.bob.id))
+
+    async def test_resync_when_too_far_behind(self):
+        with mock.patch('core.apis.task.events.REPLAY_LIMIT', 1):
+            await self.connect(last_event_id=0)
+            await self.receive()
+            self.assertEqual(await self.receive(), {'event': 'resync', 'data': {}})
+        await self.disconnect()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'LISTEN/NOTIFY needs PostgreSQL')
+class PostgresBrokerTests(TransactionTestCase):
+    """
+    `PostgresBroker` hands the committed change rows to the listeners of every node, in payloads NOTIFY accepts.
+    """
+
+    def setUp(self):
+        self.broker = PostgresBroker()
+        self.listener = connections.create_connection(DEFAULT_DB_ALIAS)
+        with self.listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.broker.channel}')
+        self.addCleanup(self.listener.close)
+
+    def received(self, count):
+        notifications = self.broker.notifications(self.listener.connection)
+        return [json.loads(next(notifications)) for _ in range(count)]
+
+    def test_publish_changes(self):
+        changes = [(2 ** 62 + seq, 2 ** 62, 'assignment', 2 ** 62) for seq in range(250)]
+        self.broker.publish_changes(changes)
+        payloads = self.received(3)
+        self.assertEqual([len(payload) for payload in payloads], [100, 100, 50])
+        self.assertEqual([tuple(change) for payload in payloads for change in payload], changes)
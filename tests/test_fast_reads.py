@@ -0,0 +1,58 @@
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskAssignment, Team, TeamRoles, User
+from core.models.task.model import TaskStatus
+from core.renderers import FastJSONRenderer
+
+
+class FastReadOutputTests(TestCase):
+    """
+    With `API_FAST_READS`, reads are rendered by the fast readers and `FastJSONRenderer`, byte for byte
+    as the serializers and `JSONRenderer` render them.
+    """
+    paths = [
+        '/api/tasks/',
+        '/api/tasks/?fields=id,name,assigned_users',
+        '/api/tasks/?fields=name&expand=assigned_users',
+        '/api/tasks/assign/',
+        '/api/teams/',
+        '/api/users/',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='password', first_name='Ålice')
+        cls.bob = User.objects.create_user(username='bob', password='password', last_name='Bø b')
+        cls.team = Team.objects.create(name='Téam ☃', owner=cls.alice)
+        TeamRoles.objects.create(team=cls.team, user=cls.bob, role=TeamRoles.Roles.MEMBER)
+        cls.task = Task.objects.create(name='Tâsk "1"\u2029', description='d', created_by=cls.alice,
+                                       task_type='other', task_type_other='ñ')
+        TaskAssignment.objects.create(task=cls.task, user=cls.bob, status=TaskStatus.COMPLETED)
+        cls.assignment = TaskAssignment.objects.create(task=cls.task, user=cls.alice)
+        Task.objects.create(name='Task 2', description='d', created_by=cls.alice, task_type='goal')
+        cls.paths = cls.paths + [
+            f'/api/tasks/{cls.task.id}/',
+            f'/api/tasks/assign/{cls.assignment.id}/',
+            f'/api/teams/{cls.team.id}/',
+            f'/api/users/{cls.bob.id}/',
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def get(self, path, renderer_class):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(type(response.accepted_renderer), renderer_class)
+        return response.content
+
+    def test_same_output(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                with override_settings(API_FAST_READS=False):
+                    expected = self.get(path, JSONRenderer)
+                with override_settings(API_FAST_READS=True):
+                    self.assertEqual(self.get(path, FastJSONRenderer), expected)
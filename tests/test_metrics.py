@@ -0,0 +1,136 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.metrics import OTHER_FINGERPRINT, MetricsRegistry, RequestStats, fingerprint
+from core.models import Task, User
+
+
+class MetricsAccessTests(TestCase):
+    """
+    `/metrics` is for staff users and scrapers sending `METRICS_TOKEN`, never open to anyone.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.admin = User.objects.create_user(username='admin', password='password', is_staff=True)
+
+    def get(self, authorization=None):
+        headers = {'Authorization': authorization} if authorization else {}
+        return self.client.get('/metrics', headers=headers).status_code
+
+    def test_without_a_token(self):
+        self.assertEqual(self.get(), 401)
+        self.assertEqual(self.get(f'Bearer {AccessToken.for_user(self.alice)}'), 403)
+        self.assertEqual(self.get(f'Bearer {AccessToken.for_user(self.admin)}'), 200)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.get(), 200)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_with_a_token(self):
+        self.assertEqual(self.get(), 401)
+        self.assertEqual(self.get('Bearer wrong'), 401)
+        self.assertEqual(self.get('Bearer s3cret'), 200)
+        self.assertEqual(self.get(f'Bearer {AccessToken.for_user(self.admin)}'), 200)
+
+
+class FingerprintTests(SimpleTestCase):
+    """
+    Queries differing only by their literals, placeholders or list lengths share a fingerprint.
+    """
+
+    def test_literals(self):
+        self.assertEqual(fingerprint("SELECT * FROM t1 WHERE id = 5 AND name = 'it''s' AND x > 1.5"),
+                         'SELECT * FROM t1 WHERE id = ? AND name = ? AND x > ?')
+        self.assertEqual(fingerprint('SELECT  a\n  FROM t WHERE id = %s'), 'SELECT a FROM t WHERE id = ?')
+
+    def test_lists(self):
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+                         fingerprint('SELECT * FROM t WHERE id IN (%s)'))
+        self.assertEqual(fingerprint('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)'),
+                         'INSERT INTO t (a, b) VALUES (...)')
+
+    def test_savepoints(self):
+        self.assertEqual(fingerprint('SAVEPOINT "s1403_x2"'), fingerprint('SAVEPOINT "s998_x17"'))
+
+
+class SQLStatsTests(TestCase):
+    """
+    Queries are aggregated by view and fingerprint, those a request runs more than
+    `SQL_N_PLUS_ONE_THRESHOLD` times are flagged, and `/api/sql-stats/` shows them to staff users.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.admin = User.objects.create_user(username='admin', password='password', is_staff=True)
+        self.task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        self.registry = MetricsRegistry()
+        for target in ('core.middleware.registry', 'core.apis.metrics.registry'):
+            patcher = mock.patch(target, self.registry)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def stats(self, *queries):
+        stats = RequestStats()
+        for sql, duration in queries:
+            stats.record_query(sql, 0, duration)
+        return stats
+
+    def test_aggregation(self):
+        stats = self.stats(*[(f'SELECT * FROM t WHERE id = {i}', 0.001) for i in range(3)],
+                           ('SELECT * FROM u', 0.004))
+        self.assertEqual(stats.queries, 4)
+        self.assertEqual(stats.fingerprints['SELECT * FROM t WHERE id = ?'], [3, 0.003, 0.001])
+        self.assertEqual(stats.repeated(2), ['SELECT * FROM t WHERE id = ?'])
+        self.assertEqual(stats.repeated(3), [])
+        self.assertEqual(stats.slow(0.004), ['SELECT * FROM u'])
+
+        for view in ('a', 'a', 'b'):
+            self.registry.observe(view, 'GET', 200, 0.01, stats, repeated=stats.repeated(2))
+        rows = self.registry.sql_summary('a', 'count')
+        self.assertEqual([(row['fingerprint'], row['count'], row['n_plus_one']) for row in rows],
+                         [('SELECT * FROM t WHERE id = ?', 6, 2), ('SELECT * FROM u', 2, 0)])
+        self.assertEqual(rows[0]['max_ms'], 1.0)
+        self.assertEqual(self.registry.sql_summary('a')[0]['fingerprint'], 'SELECT * FROM u')
+        self.assertEqual({row['view'] for row in self.registry.sql_summary()}, {'a', 'b'})
+
+    def test_fingerprint_cap(self):
+        with mock.patch('core.metrics.MAX_FINGERPRINTS', 1):
+            self.registry.observe('a', 'GET', 200, 0.01, self.stats(('SELECT 1', 0.001)))
+            self.registry.observe('a', 'GET', 200, 0.01, self.stats(('SELECT * FROM t', 0.001)))
+        self.assertEqual({row['fingerprint'] for row in self.registry.sql_summary()},
+                         {'SELECT ?', OTHER_FINGERPRINT})
+
+    @override_settings(SQL_N_PLUS_ONE_THRESHOLD=0)
+    def test_requests(self):
+        self.client.force_authenticate(self.alice)
+        with self.assertLogs('core.sql', 'WARNING') as logs:
+            self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+        self.assertTrue(all(' view=task-list method=GET path=/api/tasks/ ' in line for line in logs.output))
+        rows = self.registry.sql_summary('task-list')
+        self.assertTrue(rows)
+        self.assertTrue(all(row['n_plus_one'] == 1 for row in rows))
+
+    def test_view(self):
+        self.registry.observe('a', 'GET', 200, 0.01, self.stats(('SELECT 1', 0.002), ('SELECT 1', 0.002)))
+        self.registry.observe('b', 'GET', 200, 0.01, self.stats(*[('SELECT * FROM t', 0.001)] * 3))
+        self.assertEqual(self.client.get('/api/sql-stats/').status_code, 401)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get('/api/sql-stats/').status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        data = self.client.get('/api/sql-stats/').json()
+        self.assertEqual(data['n_plus_one_threshold'], 10)
+        self.assertEqual([row['view'] for row in data['results']], ['a', 'b'])
+        data = self.client.get('/api/sql-stats/', {'ordering': 'count', 'limit': 1}).json()
+        self.assertEqual((data['count'], [row['view'] for row in data['results']]), (2, ['b']))
+        data = self.client.get('/api/sql-stats/', {'view': 'a'}).json()
+        self.assertEqual([row['fingerprint'] for row in data['results']], ['SELECT ?'])
+        for params in ({'ordering': 'name'}, {'limit': 'all'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/sql-stats/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), list(params))
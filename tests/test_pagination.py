@@ -0,0 +1,102 @@
+import base64
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskAssignment, User
+
+
+def cursor(token):
+    return base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Task and assignment lists page forward and back over the same pages, ties included,
+    and a cursor that does not decode to a position of the requested keyset is a 404.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='password')
+        cls.tasks = []
+        for i in range(7):
+            task = Task.objects.create(name=f'Task {i % 3}', description='d', created_by=cls.alice, task_type='goal')
+            # Pairs of rows share their keyset value, `id` breaks the tie
+            created_at = datetime(2026, 1, 1 + i // 2, tzinfo=dt_timezone.utc)
+            Task.objects.filter(pk=task.pk).update(created_at=created_at)
+            TaskAssignment.objects.create(task=task, user=cls.alice)
+            TaskAssignment.objects.filter(task=task).update(assigned_at=created_at)
+            cls.tasks.append(task)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def get(self, url, params=None, status=200):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def ids(self, page):
+        return [row['id'] for row in page['results']]
+
+    def walk(self, path, params):
+        """
+        The pages of `path` following `next` links, then those following `previous` links back from the last one.
+        """
+        pages = [self.get(path, {'page_size': 3, **params})]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        back = [pages[-1]]
+        while back[-1]['previous']:
+            back.append(self.get(back[-1]['previous']))
+        return [self.ids(page) for page in pages], [self.ids(page) for page in reversed(back)]
+
+    def assertRoundTrip(self, path, params, expected):
+        forward, backward = self.walk(path, params)
+        self.assertEqual([row for page in forward for row in page], expected)
+        self.assertEqual([len(page) for page in forward], [3, 3, 1])
+        self.assertEqual(backward, forward)
+
+    def test_round_trip(self):
+        newest_first = [task.id for task in reversed(self.tasks)]
+        self.assertRoundTrip('/api/tasks/', {}, newest_first)
+        by_name = sorted(self.tasks, key=lambda task: (task.name, task.id))
+        self.assertRoundTrip('/api/tasks/', {'ordering': 'name'}, [task.id for task in by_name])
+        self.assertRoundTrip('/api/tasks/', {'ordering': '-name'}, [task.id for task in reversed(by_name)])
+        assignments = TaskAssignment.objects.order_by('-assigned_at', '-id').values_list('id', flat=True)
+        self.assertRoundTrip('/api/tasks/assign/', {}, list(assignments))
+
+    @override_settings(API_FAST_READS=True)
+    def test_round_trip_on_fast_reads(self):
+        self.assertRoundTrip('/api/tasks/', {}, [task.id for task in reversed(self.tasks)])
+
+    def test_edges(self):
+        page = self.get('/api/tasks/', {'page_size': 7})
+        self.assertEqual((len(page['results']), page['next'], page['previous']), (7, None, None))
+        # Past the last row
+        first = Task.objects.get(pk=self.tasks[0].pk)
+        page = self.get('/api/tasks/', {'cursor': cursor([0, 'created_at', first.created_at.isoformat(), first.id])})
+        self.assertEqual((page['results'], page['next']), ([], None))
+
+    def test_invalid_cursors(self):
+        task = Task.objects.get(pk=self.tasks[3].pk)
+        created_at = task.created_at.isoformat()
+        for path, params in (
+            ('/api/tasks/', {'cursor': 'garbage'}),
+            ('/api/tasks/', {'cursor': cursor({'created_at': created_at})}),
+            ('/api/tasks/', {'cursor': cursor(5)}),
+            ('/api/tasks/', {'cursor': cursor([0, 'created_at', created_at, 'x'])}),
+            ('/api/tasks/', {'cursor': cursor([0, 'created_at', 'yesterday', task.id])}),
+            ('/api/tasks/', {'cursor': cursor([0, 'created_at', created_at])}),
+            # A cursor of another ordering or list
+            ('/api/tasks/', {'cursor': cursor([0, 'name', task.name, task.id])}),
+            ('/api/tasks/', {'cursor': cursor([0, 'created_at', created_at, task.id]), 'ordering': 'name'}),
+            ('/api/tasks/assign/', {'cursor': cursor([0, 'created_at', created_at, task.id])}),
+        ):
+            with self.subTest(path=path, params=params):
+                self.assertEqual(self.get(path, params, status=404), {'detail': 'Invalid cursor'})
+        self.get('/api/tasks/', {'cursor': cursor([0, 'created_at', created_at, task.id])})
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+
+from django.test import TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Task, User
+
+
+class ProfilingAccessTests(TransactionTestCase):
+    """
+    `?_profile=` profiles `/api/` requests of staff users and holders of `PROFILE_TOKEN`,
+    any other request is served as if it had not asked.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.admin = User.objects.create_user(username='admin', password='password', is_staff=True)
+        Task.objects.create(name='Task', description='d', created_by=self.admin, task_type='goal')
+
+    def bearer(self, user):
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    def get(self, path='/api/tasks/', kind='sql', headers=None):
+        return self.client.get(path, {'_profile': kind}, headers=headers or {})
+
+    def assertProfiled(self, response, status=200):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Profile-Status'], str(status))
+        profile = json.loads(response.content)
+        self.assertEqual(profile['status'], status)
+        self.assertEqual(profile['count'], len(profile['queries']))
+        return profile
+
+    def assertNotProfiled(self, response, status=200):
+        self.assertEqual(response.status_code, status)
+        self.assertNotIn('X-Profile-Status', response)
+        self.assertNotIn('X-Profile', response)
+
+    def test_staff(self):
+        profile = self.assertProfiled(self.get(headers=self.bearer(self.admin)))
+        self.assertTrue(profile['queries'])
+        self.assertTrue(any(query['source'] for query in profile['queries']))
+        self.client.force_login(self.admin)
+        # Profiled whatever the view answers
+        self.assertProfiled(self.get('/api/tasks/0/'), status=404)
+        response = self.get(kind='cpu')
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'text/plain; charset=utf-8'))
+        self.assertEqual(response['X-Profile-Status'], '200')
+
+    def test_others(self):
+        self.assertNotProfiled(self.get())
+        self.assertNotProfiled(self.get(headers={'Authorization': 'Bearer wrong'}), status=401)
+        self.assertNotProfiled(self.get(headers=self.bearer(self.alice)))
+        self.assertNotProfiled(self.get(headers={**self.bearer(self.alice), 'X-Profile-Token': ''}))
+        self.client.force_login(self.alice)
+        self.assertNotProfiled(self.get(kind='cpu'))
+
+    def test_not_asked(self):
+        headers = self.bearer(self.admin)
+        self.assertNotProfiled(self.get(kind='memory', headers=headers))
+        self.assertNotProfiled(self.client.get('/api/tasks/', {'x_profile': 'sql'}, headers=headers))
+        self.client.force_login(self.admin)
+        # Only /api/ routes
+        self.assertNotProfiled(self.get('/admin/', headers=headers), status=200)
+
+    @override_settings(PROFILE_TOKEN='s3cret')
+    def test_token(self):
+        self.assertProfiled(self.get(headers={'X-Profile-Token': 's3cret'}))
+        response = self.get(headers={'X-Profile-Token': 's3cret', 'Authorization': 'Bearer wrong'})
+        self.assertProfiled(response, status=401)
+        self.assertNotProfiled(self.get(headers={'X-Profile-Token': 'wrong'}))
+        self.assertProfiled(self.get(headers={**self.bearer(self.alice), 'X-Profile-Token': 's3cret'}))
+
+    @override_settings(PROFILING=False)
+    def test_disabled(self):
+        self.assertNotProfiled(self.get(headers=self.bearer(self.admin)))
+
+    def test_profile_dir(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILE_DIR=directory):
+            response = self.get(headers=self.bearer(self.admin))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('results', response.json())
+            self.assertEqual(os.listdir(directory), [response['X-Profile']])
+            self.assertTrue(response['X-Profile'].endswith('-GET-api_tasks-sql.json'))
+            with open(os.path.join(directory, response['X-Profile'])) as file:
+                self.assertEqual(json.load(file)['status'], 200)
+
+    async def test_async_views(self):
+        async def get(user):
+            return await self.async_client.get('/api/async/tasks/', {'_profile': 'sql'}, headers=self.bearer(user))
+
+        self.assertTrue(self.assertProfiled(await get(self.admin))['queries'])
+        self.assertNotProfiled(await get(self.alice))
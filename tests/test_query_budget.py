@@ -0,0 +1,84 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskAssignment, Team, TeamRoles, User
+from core.testing import assert_queries_do_not_scale, assert_query_budget
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Task, assignment and team reads run a fixed number of queries, however many rows they return.
+    """
+    budgets = {
+        'task-list': 3,
+        'task-detail': 3,
+        'assignment-list': 2,
+        'assignment-detail': 2,
+        'team-list': 3,
+        'team-detail': 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='password')
+        cls.others = [User.objects.create_user(username=f'user{i}', password='password') for i in range(25)]
+        cls.team = Team.objects.create(name='Team', owner=cls.alice)
+        cls.task = Task.objects.create(name='Task', description='d', created_by=cls.alice, task_type='goal')
+        cls.assignment = TaskAssignment.objects.create(task=cls.task, user=cls.alice)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def grow_tasks(self, size):
+        # Every task assigned to the caller and to another user, so nested assignees show N+1s
+        for i in range(Task.objects.count(), size):
+            task = Task.objects.create(name=f'Task {i}', description='d', created_by=self.alice, task_type='goal')
+            TaskAssignment.objects.create(task=task, user=self.alice)
+            TaskAssignment.objects.create(task=task, user=self.others[i])
+
+    def grow_members(self, size):
+        for user in self.others[TeamRoles.objects.filter(team=self.team).count():size]:
+            TeamRoles.objects.create(team=self.team, user=user, role=TeamRoles.Roles.MEMBER)
+
+    def test_task_list(self):
+        assert_queries_do_not_scale(lambda: self.get('/api/tasks/'), self.grow_tasks)
+        with assert_query_budget(self.budgets['task-list']):
+            self.get('/api/tasks/')
+
+    def test_task_detail(self):
+        self.grow_members(25)
+        self.grow_tasks(25)
+        with assert_query_budget(self.budgets['task-detail']):
+            self.get(f'/api/tasks/{self.task.id}/')
+
+    def test_assignment_list(self):
+        assert_queries_do_not_scale(lambda: self.get('/api/tasks/assign/'), self.grow_tasks)
+        with assert_query_budget(self.budgets['assignment-list']):
+            self.get('/api/tasks/assign/')
+
+    def test_assignment_detail(self):
+        with assert_query_budget(self.budgets['assignment-detail']):
+            self.get(f'/api/tasks/assign/{self.assignment.id}/')
+
+    def test_team_list(self):
+        assert_queries_do_not_scale(lambda: self.get('/api/teams/'), self.grow_members)
+        with assert_query_budget(self.budgets['team-list']):
+            self.get('/api/teams/')
+
+    def test_team_detail(self):
+        assert_queries_do_not_scale(lambda: self.get(f'/api/teams/{self.team.id}/'), self.grow_members)
+        with assert_query_budget(self.budgets['team-detail']):
+            self.get(f'/api/teams/{self.team.id}/')
+
+
+@override_settings(API_FAST_READS=True)
+class FastReadQueryBudgetTests(QueryBudgetTests):
+    """
+    The same budgets hold on the fast read path.
+    """
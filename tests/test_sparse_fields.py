@@ -0,0 +1,58 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskAssignment, Team, User
+
+
+class SparseFieldsetTests(TestCase):
+    """
+    `?fields=` renders only the listed fields, `?expand=` adds nested ones to them, and unknown names are a 400.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username='alice', password='password')
+        cls.team = Team.objects.create(name='Team', owner=cls.alice)
+        cls.task = Task.objects.create(name='Task', description='d', created_by=cls.alice, task_type='goal')
+        cls.assignment = TaskAssignment.objects.create(task=cls.task, user=cls.alice)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def get(self, path, params, status=200):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_fields(self):
+        self.assertEqual(self.get(f'/api/tasks/{self.task.id}/', {'fields': 'name,id'}),
+                         {'id': self.task.id, 'name': 'Task'})
+        self.assertEqual(self.get('/api/tasks/', {'fields': 'id'})['results'], [{'id': self.task.id}])
+        self.assertEqual(self.get('/api/tasks/assign/', {'fields': 'id,status'})['results'],
+                         [{'id': self.assignment.id, 'status': 'pending'}])
+
+    def test_expand(self):
+        task = self.get(f'/api/tasks/{self.task.id}/', {'fields': 'id', 'expand': 'assigned_users'})
+        self.assertEqual(list(task), ['id', 'assigned_users'])
+        self.assertEqual([user['username'] for user in task['assigned_users']], ['alice'])
+        self.assertEqual(list(self.get(f'/api/teams/{self.team.id}/', {'fields': 'name', 'expand': 'members'})),
+                         ['name', 'members'])
+        # Without `?fields=` every field is rendered, nested ones included
+        self.assertIn('assigned_users', self.get(f'/api/tasks/{self.task.id}/', {'expand': 'assigned_users'}))
+
+    def test_unknown_names(self):
+        for path, field in (('/api/tasks/', 'id'), (f'/api/tasks/{self.task.id}/', 'id'),
+                            ('/api/tasks/assign/', 'id'), ('/api/teams/', 'name')):
+            with self.subTest(path=path):
+                errors = self.get(path, {'fields': f'{field},nonexistent'}, status=400)
+                self.assertEqual(list(errors), ['fields'])
+                self.assertIn('nonexistent', errors['fields'][0])
+                errors = self.get(path, {'fields': field, 'expand': 'created_by'}, status=400)
+                self.assertEqual(list(errors), ['expand'])
+
+    @override_settings(API_FAST_READS=True)
+    def test_unknown_names_on_fast_reads(self):
+        self.assertEqual(list(self.get('/api/tasks/', {'fields': 'nonexistent'}, status=400)), ['fields'])
+        self.assertEqual(list(self.get(f'/api/teams/{self.team.id}/', {'fields': 'nonexistent'}, status=400)),
+                         ['fields'])
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.db.models import Value
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from core.models import Change, Task, TaskAssignment, User
+
+
+class ChangeFeedTests(TransactionTestCase):
+    """
+    `GET /api/tasks/changes/` returns every change after the token exactly once, even those committing late.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def sync(self, since):
+        response = self.client.get('/api/tasks/changes/', {'since': since} if since is not None else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_sync_from_the_token_of_a_full_fetch(self):
+        token = self.sync(None)['next']
+        assignment = TaskAssignment.objects.create(task=self.task, user=self.bob)
+
+        data = self.sync(token)
+        self.assertEqual([task['id'] for task in data['tasks']], [self.task.id])
+        self.assertEqual([obj['id'] for obj in data['assignments']], [assignment.id])
+        self.assertEqual(self.sync(data['next'])['tasks'], [])
+
+        assignment_id = assignment.id
+        assignment.delete()
+        data = self.sync(data['next'])
+        self.assertEqual((data['tasks'], data['deleted']['tasks']), ([], [self.task.id]))
+        self.assertEqual(data['deleted']['assignments'], [assignment_id])
+
+    def test_pages(self):
+        token = self.sync(None)['next']
+        TaskAssignment.objects.create(task=self.task, user=self.bob)
+        with mock.patch('core.apis.task.view.TaskViewSet.sync_page_size', 1):
+            data = self.sync(token)
+            self.assertTrue(data['has_more'])
+            data = self.sync(data['next'])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(self.sync(data['next'])['tasks'], [])
+
+    def test_changes_in_flight_are_not_skipped(self):
+        token = self.sync(None)['next']
+        TaskAssignment.objects.create(task=self.task, user=self.bob)
+        # A transaction that started recording before the assignment is still in flight
+        in_flight = Value(int(token) + 1)
+        with mock.patch.object(Change, 'lowest_in_flight', return_value=in_flight):
+            self.assertEqual(self.sync(None)['next'], token)
+            data = self.sync(token)
+            self.assertEqual((data['next'], data['tasks'], data['assignments']), (token, [], []))
+
+        data = self.sync(token)
+        self.assertEqual([task['id'] for task in data['tasks']], [self.task.id])
+        self.assertEqual(self.sync(data['next'])['tasks'], [])
@@ -0,0 +1,329 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.db import transaction
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Task, TaskAssignment, TaskVisibility, Team, TeamRoles, User
+from core.models.task.model import TaskStatus
+
+
+class TaskCreateTests(TransactionTestCase):
+    """
+    `POST /api/tasks/` creates the task as the caller, who can then see it.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_create(self):
+        response = self.client.post('/api/tasks/', {
+            'name': 'Task', 'description': 'd', 'task_type': 'goal',
+            'user_id': self.alice.id, 'created_by': self.bob.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        task = Task.objects.get(pk=response.json()['id'])
+        self.assertEqual(task.created_by, self.alice)
+        self.assertEqual(self.client.get(f'/api/tasks/{task.id}/').status_code, 200)
+
+    def test_invalid(self):
+        response = self.client.post('/api/tasks/', {
+            'name': 'Task', 'description': 'd', 'task_type': 'other', 'user_id': self.alice.id,
+        }, format='json')
+        self.assertEqual((response.status_code, list(response.json())), (400, ['task_type_other']))
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskDeleteResponseTests(TransactionTestCase):
+    """
+    Task and assignment DELETEs answer an empty 204, which ASGI servers require.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        self.assignment = TaskAssignment.objects.create(task=self.task, user=self.alice)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def assertDeleted(self, path):
+        response = self.client.delete(path)
+        # The test client drops the body of a 204, its length still shows what a server would send
+        self.assertEqual((response.status_code, response['Content-Length']), (204, '0'))
+
+    def test_delete(self):
+        self.assertDeleted(f'/api/tasks/assign/{self.assignment.id}/')
+        self.assertDeleted(f'/api/tasks/{self.task.id}/')
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskFilterTests(TransactionTestCase):
+    """
+    Task lists narrow down with the `TaskFilter` parameters, and order by the whitelisted keysets only.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.team = Team.objects.create(name='Team', owner=self.bob)
+        TeamRoles.objects.create(team=self.team, user=self.carol, role=TeamRoles.Roles.MEMBER)
+
+        def create(name, created_by, task_type, day):
+            task = Task.objects.create(name=name, description='d', created_by=created_by, task_type=task_type)
+            Task.objects.filter(pk=task.pk).update(created_at=datetime(2026, 1, day, 10, tzinfo=dt_timezone.utc))
+            return task
+
+        self.goal = create('Bravo', self.alice, 'goal', 1)
+        self.meeting = create('Delta', self.alice, 'meeting', 2)
+        self.issue = create('Alpha', self.bob, 'issue', 3)
+        self.unassigned = create('Charlie', self.alice, 'goal', 4)
+        TaskAssignment.objects.create(task=self.goal, user=self.bob)
+        TaskAssignment.objects.create(task=self.goal, user=self.carol)
+        TaskAssignment.objects.create(task=self.meeting, user=self.bob, status=TaskStatus.COMPLETED)
+        TaskAssignment.objects.create(task=self.issue, user=self.alice, status=TaskStatus.IN_PROGRESS)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def get(self, params, status=200):
+        response = self.client.get('/api/tasks/', {'page_size': 100, **params})
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def ids(self, params):
+        return [task['id'] for task in self.get(params)['results']]
+
+    def assertFound(self, params, *tasks):
+        self.assertCountEqual(self.ids(params), [task.id for task in tasks])
+
+    def test_filters(self):
+        self.assertFound({}, self.goal, self.meeting, self.issue, self.unassigned)
+        self.assertFound({'status': 'completed'}, self.meeting)
+        self.assertFound({'status': 'pending,completed'}, self.meeting, self.unassigned)
+        self.assertFound({'task_type': 'goal,meeting'}, self.goal, self.meeting, self.unassigned)
+        self.assertFound({'created_by': str(self.bob.id)}, self.issue)
+        self.assertFound({'assignee': f'{self.bob.id},{self.alice.id}'}, self.goal, self.meeting, self.issue)
+        self.assertFound({'assignee': self.bob.id, 'assignment_status': 'completed'}, self.meeting)
+        self.assertFound({'team': self.team.id}, self.goal)
+        self.assertFound({'task_type': 'goal', 'status': 'in_progress'}, self.goal)
+
+    def test_ranges(self):
+        self.assertFound({'created_after': '2026-01-02'}, self.meeting, self.issue, self.unassigned)
+        self.assertFound({'created_before': '2026-01-03'}, self.goal, self.meeting)
+        # `after` is inclusive, `before` exclusive
+        self.assertFound({'created_after': '2026-01-02T10:00:00Z', 'created_before': '2026-01-03T10:00:00Z'},
+                         self.meeting)
+        self.assertFound({'completed_after': '2026-01-01'}, self.meeting)
+        self.assertFound({'completed_before': '2026-01-01'})
+
+    def test_invalid_filters(self):
+        errors = self.get({
+            'status': 'done,completed', 'created_after': 'yesterday', 'created_by': 'alice',
+            'assignment_status': 'completed',
+        }, status=400)
+        self.assertEqual(errors, {
+            'status': ['Invalid choice: done.'],
+            'created_after': ['Expected an ISO 8601 date or datetime.'],
+            'created_by': ['Expected a comma separated list of ids.'],
+            'assignment_status': ['Only valid together with assignee.'],
+        })
+        self.assertEqual(list(self.get({'assignee': self.bob.id, 'assignment_status': 'done'}, status=400)),
+                         ['assignment_status'])
+
+    def test_ordering(self):
+        by_name = [self.issue.id, self.goal.id, self.unassigned.id, self.meeting.id]
+        self.assertEqual(self.ids({'ordering': 'name'}), by_name)
+        self.assertEqual(self.ids({'ordering': '-name'}), by_name[::-1])
+        self.assertEqual(self.ids({}), [self.unassigned.id, self.issue.id, self.meeting.id, self.goal.id])
+
+        # Ties on the keyset are broken by id, across pages too
+        pages, params = [], {'ordering': 'status', 'page_size': 1}
+        while True:
+            response = self.client.get('/api/tasks/', params).json()
+            pages += [task['id'] for task in response['results']]
+            if not response['next'] or len(pages) > 4:
+                break
+            params['cursor'] = parse_qs(urlparse(response['next']).query)['cursor'][0]
+        tasks = Task.objects.order_by('status', 'id')
+        self.assertEqual(pages, [task.id for task in tasks])
+
+    def test_ordering_whitelist(self):
+        for ordering in ('description', '-completed_at', 'created_by__username'):
+            with self.subTest(ordering=ordering):
+                errors = self.get({'ordering': ordering}, status=400)
+                self.assertIn('choose one of: created_at, name, status, task_type', errors['ordering'][0])
+
+
+class TaskImportTests(TransactionTestCase):
+    """
+    `POST /api/tasks/import/` creates the tasks of an NDJSON body as the caller.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.client = APIClient()
+
+    def post(self, body):
+        return self.client.post('/api/tasks/import/', body, content_type='application/x-ndjson')
+
+    def test_requires_authentication(self):
+        response = self.post(b'{"name": "Imported", "description": "d", "task_type": "goal"}\n')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Task.objects.exists())
+
+    def test_import(self):
+        self.client.force_authenticate(self.alice)
+        response = self.post(
+            b'{"name": "Imported", "description": "d", "task_type": "goal", "assignees": ["alice"]}\n'
+            b'{"name": "Broken"}\n'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual([error['line'] for error in response.json()['errors']], [2])
+
+        task = Task.objects.get()
+        self.assertEqual((task.created_by, task.assignments_total, task.status),
+                         (self.alice, 1, TaskStatus.IN_PROGRESS))
+        self.assertEqual(set(TaskVisibility.objects.filter(task=task).values_list('user', 'reason')),
+                         {(self.alice.id, 'creator'), (self.alice.id, 'assignee')})
+
+
+class TaskSearchIndexTests(TransactionTestCase):
+    """
+    Saving a task only recomputes its search vector when its name or description changed.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+
+    def reindexes(self, save):
+        with mock.patch.object(Task, 'update_search_vectors') as update_search_vectors:
+            save()
+        return update_search_vectors.call_count
+
+    def test_reindexes_on_text_changes_only(self):
+        task = Task(name='Task', description='d', created_by=self.alice, task_type='goal')
+        self.assertEqual(self.reindexes(task.save), 1)
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = TaskStatus.COMPLETED
+        self.assertEqual(self.reindexes(task.save), 0)
+        task.name = 'Renamed'
+        self.assertEqual(self.reindexes(task.save), 1)
+        self.assertEqual(self.reindexes(task.save), 0)
+        task.description = 'Described'
+        self.assertEqual(self.reindexes(lambda: task.save(update_fields=['description'])), 1)
+        self.assertEqual(self.reindexes(lambda: task.save(update_fields=['status'])), 0)
+
+    def test_deferred_text_is_not_fetched(self):
+        task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        task = Task.objects.only('id', 'status').get(pk=task.pk)
+        task.status = TaskStatus.COMPLETED
+        self.assertEqual(self.reindexes(task.save), 0)
+
+
+class TaskSearchPaginationTests(TransactionTestCase):
+    """
+    Paging through search results, ordered by rank, returns every match once, ties at page boundaries included.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_tied_ranks(self):
+        # Same text, so the same rank; the other task ranks differently
+        tasks = [Task.objects.create(name='Quarterly report', description='numbers', created_by=self.alice,
+                                     task_type='goal') for _ in range(5)]
+        tasks.append(Task.objects.create(name='Numbers', description='quarterly report draft',
+                                         created_by=self.alice, task_type='goal'))
+        ids = []
+        url = '/api/tasks/?search=quarterly report&page_size=2'
+        for _ in range(len(tasks)):
+            if url is None:
+                break
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [task['id'] for task in response.json()['results']]
+            url = response.json()['next']
+        self.assertEqual(sorted(ids), sorted(task.id for task in tasks))
+
+
+class TaskExportTests(TransactionTestCase):
+    """
+    `GET /api/tasks/export/` streams the caller's tasks, from a sync iterator under WSGI and an async one under ASGI.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.tasks = [
+            Task.objects.create(name=f'Task {i}', description='d', created_by=self.alice, task_type='goal')
+            for i in range(3)
+        ]
+
+    def assertExported(self, body):
+        self.assertEqual([json.loads(line)['id'] for line in body.decode().splitlines()],
+                         [task.id for task in self.tasks])
+
+    def test_wsgi(self):
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        response = client.get('/api/tasks/export/', {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        self.assertExported(b''.join(response.streaming_content))
+
+    async def test_asgi(self):
+        token = str(AccessToken.for_user(self.alice))
+        response = await self.async_client.get('/api/tasks/export/', {'format': 'ndjson'},
+                                               headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        # Django reads a sync iterator whole before sending it under ASGI
+        self.assertTrue(response.is_async)
+        self.assertExported(b''.join([chunk async for chunk in response.streaming_content]))
+
+
+class TaskConditionalGetTests(TransactionTestCase):
+    """
+    Task reads answer `If-None-Match` with 304 until the task actually changes.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.task = Task.objects.create(name='Task', description='d', created_by=self.alice, task_type='goal')
+        self.assignment = TaskAssignment.objects.create(task=self.task, user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def get(self, path, etag=None):
+        return self.client.get(path, headers={'If-None-Match': etag} if etag else {})
+
+    def test_not_modified(self):
+        for path in (f'/api/tasks/{self.task.id}/', '/api/tasks/'):
+            response = self.get(path)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertEqual(self.get(path, etag).status_code, 304)
+
+            # Completing and reopening the assignment leaves the task's counters as they were
+            with transaction.atomic():
+                self.assignment.status = TaskStatus.COMPLETED
+                self.assignment.save()
+                self.assignment.status = TaskStatus.PENDING
+                self.assignment.save()
+            self.assertEqual(self.get(path, etag).status_code, 304)
+
+            self.assignment.status = TaskStatus.COMPLETED
+            self.assignment.save()
+            self.assertEqual(self.get(path, etag).status_code, 200)
+            self.assignment.status = TaskStatus.PENDING
+            self.assignment.save()
@@ -0,0 +1,267 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Task, TaskAssignment, Team, TeamRoles, TeamTaskStats, User
+from core.models.task.model import TaskStatus
+from core.models.team.cache import (
+    MANAGEABLE_KEY, NO_ROLE, OWNER, ROLE_KEY, manageable_user_ids, resolve_team_role
+)
+
+
+class ManageableUsersCacheTests(TransactionTestCase):
+    """
+    Cached manageable user sets are dropped by every membership change that affects them.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.first = Team.objects.create(name='First', owner=self.alice)
+        self.second = Team.objects.create(name='Second', owner=self.carol)
+        self.role = TeamRoles.objects.create(team=self.first, user=self.bob, role=TeamRoles.Roles.MEMBER)
+
+    def test_joining_and_leaving(self):
+        self.assertEqual(manageable_user_ids(self.alice.id), {self.bob.id})
+        self.role.delete()
+        self.assertEqual(manageable_user_ids(self.alice.id), set())
+
+    def test_moving_a_role_to_another_team(self):
+        self.assertEqual(manageable_user_ids(self.alice.id), {self.bob.id})
+        self.assertEqual(manageable_user_ids(self.carol.id), set())
+        self.role.team = self.second
+        self.role.save()
+        self.assertEqual(manageable_user_ids(self.alice.id), set())
+        self.assertEqual(manageable_user_ids(self.carol.id), {self.bob.id})
+
+    def test_dropped_after_commit(self):
+        key = MANAGEABLE_KEY.format(self.alice.id)
+        with transaction.atomic():
+            self.role.delete()
+            # A concurrent request reading the committed state caches it before the commit
+            cache.set(key, frozenset({self.bob.id}))
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(manageable_user_ids(self.alice.id), set())
+
+
+class TeamRoleCacheTests(TransactionTestCase):
+    """
+    A user's role in a team costs at most one query, then comes from the request or the cache
+    until a membership or ownership change drops it.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.team = Team.objects.create(name='Team', owner=self.alice)
+        self.role = TeamRoles.objects.create(team=self.team, user=self.bob, role=TeamRoles.Roles.MANAGER)
+
+    def resolve(self, user, queries, request=None):
+        with self.assertNumQueries(queries):
+            return resolve_team_role(user.id, self.team.id, request)
+
+    def test_hits(self):
+        self.assertEqual(self.resolve(self.bob, 1), TeamRoles.Roles.MANAGER)
+        self.assertEqual(self.resolve(self.bob, 0), TeamRoles.Roles.MANAGER)
+        self.assertEqual(self.resolve(self.carol, 1), NO_ROLE)
+        self.assertEqual(self.resolve(self.carol, 0), NO_ROLE)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_team_role(self.alice.id, self.team), OWNER)
+
+        request = type('Request', (), {})()
+        cache.clear()
+        self.assertEqual(self.resolve(self.alice, 1, request), OWNER)
+        cache.clear()
+        self.assertEqual(self.resolve(self.alice, 0, request), OWNER)
+
+    def test_role_changes(self):
+        self.assertEqual(self.resolve(self.bob, 1), TeamRoles.Roles.MANAGER)
+        self.role.role = TeamRoles.Roles.MEMBER
+        self.role.save()
+        self.assertEqual(self.resolve(self.bob, 1), TeamRoles.Roles.MEMBER)
+        self.role.delete()
+        self.assertEqual(self.resolve(self.bob, 1), NO_ROLE)
+        TeamRoles.objects.create(team=self.team, user=self.carol, role=TeamRoles.Roles.MEMBER)
+        self.assertEqual(self.resolve(self.carol, 1), TeamRoles.Roles.MEMBER)
+
+    def test_ownership_changes(self):
+        self.assertEqual(self.resolve(self.alice, 1), OWNER)
+        self.assertEqual(self.resolve(self.carol, 1), NO_ROLE)
+        self.team.owner = self.carol
+        self.team.save()
+        self.assertEqual(self.resolve(self.alice, 1), NO_ROLE)
+        self.assertEqual(self.resolve(self.carol, 1), OWNER)
+
+    def test_dropped_after_commit(self):
+        with transaction.atomic():
+            self.role.delete()
+            # A concurrent request reading the committed state caches it before the commit
+            cache.set(ROLE_KEY.format(self.team.id, self.bob.id), TeamRoles.Roles.MANAGER)
+        self.assertEqual(self.resolve(self.bob, 1), NO_ROLE)
+
+    def test_role_gated_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.bob)
+
+        def stats():
+            with CaptureQueriesContext(connection) as context:
+                status_code = client.get(f'/api/teams/{self.team.id}/stats/').status_code
+            return status_code, len(context.captured_queries)
+
+        (status_code, queries), (cached_status_code, cached_queries) = stats(), stats()
+        self.assertEqual((status_code, cached_status_code), (200, 200))
+        self.assertEqual(cached_queries, queries - 1)
+        self.role.role = TeamRoles.Roles.MEMBER
+        self.role.save()
+        self.assertEqual(stats()[0], 403)
+        self.role.delete()
+        self.assertEqual(stats()[0], 404)
+
+
+class TeamDeleteResponseTests(TransactionTestCase):
+    """
+    Team and team role DELETEs answer an empty 204, which ASGI servers require.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.team = Team.objects.create(name='Team', owner=self.alice)
+        self.other = Team.objects.create(name='Other', owner=self.carol)
+        self.role = TeamRoles.objects.create(team=self.other, user=self.alice, role=TeamRoles.Roles.MANAGER)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def assertDeleted(self, path):
+        response = self.client.delete(path)
+        # The test client drops the body of a 204, its length still shows what a server would send
+        self.assertEqual((response.status_code, response['Content-Length']), (204, '0'))
+
+    def test_delete(self):
+        self.assertDeleted(f'/api/teams/members/{self.role.id}/')
+        self.assertDeleted(f'/api/teams/{self.team.id}/')
+        self.assertEqual(list(Team.objects.all()), [self.other])
+        self.assertFalse(TeamRoles.objects.filter(user=self.alice).exists())
+
+
+class TeamTaskStatsTests(TransactionTestCase):
+    """
+    The `TeamTaskStats` rollup stays equal to what `manage.py rebuild_team_stats` computes from scratch,
+    through assignment, status and membership changes.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='password')
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.first = Team.objects.create(name='First', owner=self.owner)
+        self.second = Team.objects.create(name='Second', owner=self.owner)
+        TeamRoles.objects.create(team=self.first, user=self.alice, role=TeamRoles.Roles.MEMBER)
+        TeamRoles.objects.create(team=self.second, user=self.alice, role=TeamRoles.Roles.MEMBER)
+        self.bob_role = TeamRoles.objects.create(team=self.first, user=self.bob, role=TeamRoles.Roles.MEMBER)
+        self.tasks = [
+            Task.objects.create(name=f'Task {i}', description='d', created_by=self.owner, task_type='goal')
+            for i in range(3)
+        ]
+        self.client = APIClient()
+
+    def rebuild(self, *args):
+        out = StringIO()
+        call_command('rebuild_team_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def assertInSync(self):
+        self.assertEqual(self.rebuild('--dry-run'), '0 team stats row(s) drifted.\n')
+        self.assertEqual(
+            {(stats.team_id, stats.user_id, stats.status): stats.count for stats in TeamTaskStats.objects.all()},
+            TeamTaskStats.expected(),
+        )
+
+    def test_assignment_changes(self):
+        assignment = TaskAssignment.objects.create(task=self.tasks[0], user=self.alice)
+        TaskAssignment.objects.create(task=self.tasks[0], user=self.carol)
+        self.assertInSync()
+        assignment.status = TaskStatus.IN_PROGRESS
+        assignment.save()
+        self.assertInSync()
+        # Moved to another user, in another team
+        assignment.user = self.bob
+        assignment.save()
+        self.assertInSync()
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.post('/api/tasks/assign/bulk/',
+                                    {'task': self.tasks[1].id, 'users': [self.alice.id, self.bob.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertInSync()
+
+        self.client.force_authenticate(self.alice)
+        ids = TaskAssignment.objects.filter(user=self.alice).values_list('id', flat=True)
+        response = self.client.patch('/api/tasks/assign/bulk/', [{'id': pk, 'status': 'completed'} for pk in ids],
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertInSync()
+        response = self.client.patch(f'/api/tasks/assign/{ids[0]}/', {'user_id': self.alice.id, 'status': 'pending'},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertInSync()
+        self.assertTrue(TeamTaskStats.objects.filter(user=self.alice, status=TaskStatus.PENDING, count=1).exists())
+
+        TaskAssignment.objects.get(pk=ids[0]).delete()
+        self.assertInSync()
+        self.tasks[1].delete()
+        self.assertInSync()
+        self.assertTrue(TeamTaskStats.objects.filter(count__gt=0).exists())
+
+    def test_membership_changes(self):
+        TaskAssignment.objects.create(task=self.tasks[0], user=self.carol, status=TaskStatus.COMPLETED)
+        TaskAssignment.objects.create(task=self.tasks[1], user=self.bob)
+        # Joining counts the assignments made before
+        carol_role = TeamRoles.objects.create(team=self.first, user=self.carol, role=TeamRoles.Roles.MEMBER)
+        self.assertInSync()
+        self.assertEqual(TeamTaskStats.objects.get(team=self.first, user=self.carol, status='completed').count, 1)
+        # A second role in the same team counts the assignments once
+        second_role = TeamRoles.objects.create(team=self.first, user=self.bob, role=TeamRoles.Roles.MANAGER)
+        self.assertInSync()
+        second_role.delete()
+        self.assertInSync()
+        self.assertTrue(TeamTaskStats.objects.filter(team=self.first, user=self.bob).exists())
+
+        self.bob_role.team = self.second
+        self.bob_role.save()
+        self.assertInSync()
+        carol_role.delete()
+        self.assertInSync()
+        self.assertFalse(TeamTaskStats.objects.filter(user=self.carol).exists())
+        self.second.delete()
+        self.assertInSync()
+
+    def test_endpoint(self):
+        TaskAssignment.objects.create(task=self.tasks[0], user=self.alice, status=TaskStatus.COMPLETED)
+        TaskAssignment.objects.create(task=self.tasks[1], user=self.alice)
+        TaskAssignment.objects.create(task=self.tasks[1], user=self.bob)
+        self.client.force_authenticate(self.owner)
+        data = self.client.get(f'/api/teams/{self.first.id}/stats/').json()
+        self.assertEqual((data['total'], data['counts']['completed'], data['counts']['pending']), (3, 1, 2))
+        self.assertEqual([(member['username'], member['total']) for member in data['members']],
+                         [('alice', 2), ('bob', 1)])
+
+    def test_drift(self):
+        TaskAssignment.objects.create(task=self.tasks[0], user=self.alice)
+        TeamTaskStats.objects.filter(team=self.first, user=self.alice, status='pending').update(count=5)
+        TeamTaskStats.objects.filter(team=self.second, user=self.alice).delete()
+        self.assertEqual(self.rebuild('--dry-run'), '4 team stats row(s) drifted.\n')
+        self.assertEqual(self.rebuild('--dry-run', '--team', str(self.second.id)),
+                         '3 team stats row(s) drifted.\n')
+        self.assertIn('Rebuilt', self.rebuild())
+        self.assertInSync()